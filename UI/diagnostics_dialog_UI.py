@@ -0,0 +1,116 @@
+import json
+
+from PySide6.QtWidgets import (
+    QDialog,
+    QVBoxLayout,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QTabWidget,
+    QPlainTextEdit,
+    QFileDialog,
+    QHeaderView,
+)
+from PySide6.QtCore import Qt
+
+from instrumentation import get_instrumentation
+
+
+class DiagnosticsDialog(QDialog):
+    def __init__(self, parent: object = None) -> None:
+        """This function creates the Help -> Diagnostics dialog which shows
+        where the app has spent its time so far. (See instrumentation.py)
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Task Man - Diagnostics")
+        self.resize(700, 450)
+
+        self.main_v_layout = QVBoxLayout()
+
+        # A one line summary above the tables.
+        self.summary_label = QLabel()
+
+        # One table for the SQL statements and one for the timed UI work.
+        # The raw JSON (including cache and memory counters) is shown as well.
+        self.statements_table = self.create_table(["Statement"])
+        self.operations_table = self.create_table(["Operation"])
+        self.json_text = QPlainTextEdit()
+        self.json_text.setReadOnly(True)
+
+        self.diagnostics_tab_widget = QTabWidget()
+        self.diagnostics_tab_widget.addTab(self.statements_table, "SQL")
+        self.diagnostics_tab_widget.addTab(self.operations_table, "UI")
+        self.diagnostics_tab_widget.addTab(self.json_text, "JSON")
+
+        # Refresh the counters, save them as JSON or close the dialog.
+        self.refresh_button = QPushButton("Refresh")
+        self.refresh_button.clicked.connect(self.refresh)
+        self.save_button = QPushButton("Save as JSON...")
+        self.save_button.clicked.connect(self.save_as_JSON)
+        self.close_button = QPushButton("Close")
+        self.close_button.clicked.connect(self.accept)
+
+        self.buttons_h_layout = QHBoxLayout()
+        self.buttons_h_layout.addWidget(self.refresh_button)
+        self.buttons_h_layout.addWidget(self.save_button)
+        self.buttons_h_layout.addStretch()
+        self.buttons_h_layout.addWidget(self.close_button)
+
+        self.main_v_layout.addWidget(self.summary_label)
+        self.main_v_layout.addWidget(self.diagnostics_tab_widget)
+        self.main_v_layout.addLayout(self.buttons_h_layout)
+        self.setLayout(self.main_v_layout)
+
+        self.refresh()
+
+    def create_table(self, first_columns: list[str]) -> QTableWidget:
+        """This function will create a read-only table for timings."""
+
+        columns = first_columns + ["Count", "Total ms", "Average ms", "Max ms"]
+        table = QTableWidget(0, len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.setEditTriggers(QTableWidget.NoEditTriggers)
+        table.verticalHeader().hide()
+        table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        return table
+
+    def fill_table(self, table: QTableWidget, rows: list[dict], name_key: str) -> None:
+        """This function will put timings into one of the tables."""
+
+        table.setRowCount(len(rows))
+        for row, timing in enumerate(rows):
+            name_item = QTableWidgetItem(timing[name_key])
+            name_item.setToolTip(timing[name_key])
+            table.setItem(row, 0, name_item)
+            for column, key in enumerate(("count", "total_ms", "average_ms", "max_ms"), 1):
+                item = QTableWidgetItem(f"{timing[key]:g}")
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                table.setItem(row, column, item)
+
+    def refresh(self) -> None:
+        """This function will show the latest counters."""
+
+        self.snapshot = get_instrumentation().snapshot()
+
+        statements = self.snapshot["statements"]
+        self.summary_label.setText(
+            f"{sum(statement['count'] for statement in statements)} statements, "
+            f"{self.snapshot['slow_queries']} slower than "
+            f"{self.snapshot['slow_query_ms']:g} ms, "
+            f"running for {self.snapshot['uptime_s']:g} s"
+        )
+        self.fill_table(self.statements_table, statements, "sql")
+        self.fill_table(self.operations_table, self.snapshot["operations"], "name")
+        self.json_text.setPlainText(json.dumps(self.snapshot, indent=2))
+
+    def save_as_JSON(self) -> None:
+        """This function will save the counters shown to a JSON file."""
+
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Save Diagnostics", "taskman_diagnostics.json", "JSON (*.json)"
+        )
+        if path:
+            with open(path, "w", encoding="utf-8") as diagnostics_file:
+                json.dump(self.snapshot, diagnostics_file, indent=2)
@@ -1,3 +1,4 @@
+from typing import Callable
 from typing_extensions import override
 from PySide6.QtWidgets import (
     QMainWindow,
@@ -9,10 +10,11 @@ from PySide6.QtWidgets import (
     QTabWidget,
     QApplication,
 )
-from PySide6.QtCore import Qt, QEvent
+from PySide6.QtCore import Qt, QEvent, QDate
 
 from UI.task_input_section_UI import TaskInputSection
-from UI.weight_input_section_UI import WeightInputSection
+from instrumentation import timing
+from write_queue import get_write_queue
 
 
 class TaskManUI(QMainWindow):
@@ -33,6 +35,9 @@ class TaskManUI(QMainWindow):
         self.file_menu_bar = self.app_menu_bar.addMenu("&File")
         self.file_menu_bar_exit_action = self.file_menu_bar.addAction("Exit")
         self.file_menu_bar_exit_action.triggered.connect(lambda: self.APP.quit())
+        self.help_menu_bar = self.app_menu_bar.addMenu("&Help")
+        self.help_menu_bar_diagnostics_action = self.help_menu_bar.addAction("Diagnostics")
+        self.help_menu_bar_diagnostics_action.triggered.connect(self.show_diagnostics)
 
         # This is the parent vertical layout of the program.
         self.main_v_layout = QVBoxLayout()
@@ -50,14 +55,26 @@ class TaskManUI(QMainWindow):
         self.body_v_layout = QVBoxLayout()
 
         # This is the app's main tab widget.
-        # It includes a "Tasks" and a "Weight" section
+        # It includes a "Tasks", a "Calendar", an "Agenda", a "Weight" and -
+        # a "History" section.
+        # Only the first tab is built right away. Every other tab gets an -
+        # empty placeholder and is built the first time the user opens it.
         self.main_tab_widget = QTabWidget()
+        self.deferred_tabs = {}
+        self.main_tab_widget.currentChanged.connect(self.build_deferred_tab)
 
-        self.tasks_tab_widget = TaskInputSection()  # Custom class
-        self.weight_tab_widget = WeightInputSection()  # Custom class
+        with timing("tab.build.Tasks"):
+            self.tasks_tab_widget = TaskInputSection()  # Custom class
+        self.calendar_tab_widget = None  # Custom class, built on first use
+        self.agenda_tab_widget = None  # Custom class, built on first use
+        self.weight_tab_widget = None  # Custom class, built on first use
+        self.history_tab_widget = None  # Custom class, built on first use
 
         self.main_tab_widget.addTab(self.tasks_tab_widget, "Tasks")
-        self.main_tab_widget.addTab(self.weight_tab_widget, "Weight")
+        self.add_deferred_tab("Calendar", self.build_calendar_tab)
+        self.add_deferred_tab("Agenda", self.build_agenda_tab)
+        self.add_deferred_tab("Weight", self.build_weight_tab)
+        self.add_deferred_tab("History", self.build_history_tab)
 
         # Adding the different section layouts (Header & Body) -
         # to the main vertical layout of the app.
@@ -65,12 +82,102 @@ class TaskManUI(QMainWindow):
         self.body_v_layout.addWidget(self.main_tab_widget)
         self.main_v_layout.addLayout(self.body_v_layout)
 
+    def add_deferred_tab(self, title: str, build_tab: Callable[[], QWidget]) -> None:
+        """This function will add a tab whose widget is only built (by calling
+        build_tab) the first time the user switches to it.
+        """
+
+        placeholder = QWidget()
+        self.main_tab_widget.addTab(placeholder, title)
+        self.deferred_tabs[placeholder] = build_tab
+
+    def build_deferred_tab(self, index: int) -> None:
+        """This function will run whenever the current tab changes and swap
+        the placeholder of a deferred tab for the real widget.
+        """
+
+        placeholder = self.main_tab_widget.widget(index)
+        build_tab = self.deferred_tabs.pop(placeholder, None)
+        if build_tab is None:
+            return
+
+        title = self.main_tab_widget.tabText(index)
+        with timing(f"tab.build.{title}"):
+            tab_widget = build_tab()
+
+        # Swapping the widgets would change the current tab again.
+        self.main_tab_widget.blockSignals(True)
+        self.main_tab_widget.removeTab(index)
+        self.main_tab_widget.insertTab(index, tab_widget, title)
+        self.main_tab_widget.setCurrentIndex(index)
+        self.main_tab_widget.blockSignals(False)
+        placeholder.deleteLater()
+
+    def build_calendar_tab(self) -> QWidget:
+        """This function will build the "Calendar" tab, a month overview of
+        how many tasks there are on every day.
+        """
+
+        from UI.task_calendar_UI import TaskCalendarSection
+
+        self.calendar_tab_widget = TaskCalendarSection(
+            self.tasks_tab_widget.task_counts
+        )  # Custom class
+        self.calendar_tab_widget.date_chosen.connect(self.show_tasks_of_date)
+        return self.calendar_tab_widget
+
+    def build_agenda_tab(self) -> QWidget:
+        """This function will build the "Agenda" tab, the tasks of a week or
+        of many days in a row.
+        """
+
+        from UI.task_agenda_UI import TaskAgendaSection
+
+        self.agenda_tab_widget = TaskAgendaSection(
+            self.tasks_tab_widget.task_counts
+        )  # Custom class
+        self.agenda_tab_widget.date_chosen.connect(self.show_tasks_of_date)
+        return self.agenda_tab_widget
+
+    def show_tasks_of_date(self, date: QDate) -> None:
+        """This function will switch to the "Tasks" tab showing a date."""
+
+        self.tasks_tab_widget.active_tasks_date.setDate(date)
+        self.main_tab_widget.setCurrentWidget(self.tasks_tab_widget)
+
+    def build_weight_tab(self) -> QWidget:
+        """This function will build the "Weight" tab."""
+
+        # Imported here so the weight modules (models, chart...) aren't -
+        # loaded at all until the user opens the tab.
+        from UI.weight_input_section_UI import WeightInputSection
+
+        self.weight_tab_widget = WeightInputSection()  # Custom class
+        return self.weight_tab_widget
+
+    def build_history_tab(self) -> QWidget:
+        """This function will build the "History" tab."""
+
+        from UI.task_history_section_UI import TaskHistorySection
+
+        self.history_tab_widget = TaskHistorySection()  # Custom class
+        return self.history_tab_widget
+
+    def show_diagnostics(self) -> None:
+        """This function will show where the app has spent its time."""
+
+        # Imported here, like the Weight tab, because it's rarely needed.
+        from UI.diagnostics_dialog_UI import DiagnosticsDialog
+
+        DiagnosticsDialog(self).exec()
+
     @override
     def closeEvent(self, event: QEvent) -> None:
         """This funtion is an override of the closeEvent function
         in QMainApplication.
 
         This function asks the user for confirmation before quiting
+        and writes whatever is still in the write queue before the window closes.
 
         It is run generally when the OS tries to terminate the app; for example:
         - User presses ALT + F4
@@ -87,6 +194,9 @@ class TaskManUI(QMainWindow):
             QMessageBox.No,
         )
         if exit_confirmation == QMessageBox.Yes:
+            # Completed tasks are written in the background, so make -
+            # sure none of them are lost.
+            get_write_queue().close()
             event.accept()
         else:
             event.ignore()
@@ -0,0 +1,110 @@
+from PySide6.QtWidgets import (
+    QPushButton,
+    QWidget,
+    QLabel,
+    QVBoxLayout,
+    QHBoxLayout,
+    QDateEdit,
+    QComboBox,
+    QSizePolicy,
+    QListView,
+)
+from PySide6.QtCore import Qt, QDate, QModelIndex, Signal
+from PySide6.QtGui import QShowEvent
+
+from task_agenda_model import TaskAgendaModel
+from task_calendar_model import TaskCountModel
+from UI.task_calendar_UI import TaskCalendar
+
+
+class TaskAgendaSection(QWidget):
+    # Emitted when the user double clicks on a day or a task.
+    date_chosen = Signal(QDate)
+
+    def __init__(self, count_model: TaskCountModel) -> None:
+        """This funtion creates the week and agenda views of the app.
+        Its date picker shares the task counts with the "Tasks" tab.
+        """
+
+        super().__init__()
+
+        # This is the main vertical layout for the agenda section.
+        self.main_v_layout = QVBoxLayout()
+
+        # Simply a title for this section
+        self.tab_title = QLabel("Agenda")
+        self.tab_title.setAlignment(Qt.AlignHCenter)
+
+        # The user can choose to see a single week (starting on Monday) or -
+        # an agenda which keeps going while they scroll down.
+        self.view_choice = QComboBox()
+        self.view_choice.addItem("Week")
+        self.view_choice.addItem("Agenda")
+        self.view_choice.currentIndexChanged.connect(self.load_from_DB)
+
+        # The first date that is shown, the buttons move it by a week.
+        self.first_date = QDateEdit(QDate.currentDate())
+        self.first_date.setDisplayFormat("dd.MM.yyyy")
+        self.first_date.setCalendarPopup(True)
+        self.first_date.setCalendarWidget(TaskCalendar(count_model))
+        self.first_date.setAlignment(Qt.AlignCenter)
+        self.first_date.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Preferred)
+        self.first_date.dateChanged.connect(self.load_from_DB)
+
+        self.previous_week_button = QPushButton("<")
+        self.previous_week_button.clicked.connect(
+            lambda: self.first_date.setDate(self.first_date.date().addDays(-7))
+        )
+        self.next_week_button = QPushButton(">")
+        self.next_week_button.clicked.connect(
+            lambda: self.first_date.setDate(self.first_date.date().addDays(7))
+        )
+
+        self.date_selection_h_layout = QHBoxLayout()
+        self.date_selection_h_layout.addWidget(self.view_choice)
+        self.date_selection_h_layout.addWidget(self.previous_week_button)
+        self.date_selection_h_layout.addWidget(self.first_date)
+        self.date_selection_h_layout.addWidget(self.next_week_button)
+
+        # Every date is a bold header followed by its tasks.
+        # The list view only paints the rows that are visible and the -
+        # agenda only loads more dates once the user scrolls to the end.
+        self.agenda_model = TaskAgendaModel()  # Custom class
+        self.agenda_list_view = QListView()
+        self.agenda_list_view.setModel(self.agenda_model)
+        self.agenda_list_view.setUniformItemSizes(True)
+        self.agenda_list_view.setSelectionMode(QListView.NoSelection)
+        self.agenda_list_view.doubleClicked.connect(self.show_date)
+
+        self.main_v_layout.addWidget(self.tab_title)
+        self.main_v_layout.addLayout(self.date_selection_h_layout)
+        self.main_v_layout.addWidget(self.agenda_list_view)
+        self.setLayout(self.main_v_layout)
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """This function will run every time the user opens the tab.
+        Tasks may have been added or completed in the meantime, so the view
+        is re-loaded.
+        """
+
+        super().showEvent(event)
+        self.load_from_DB()
+
+    def load_from_DB(self) -> None:
+        """This function will re-fill the view with the chosen dates.
+        The dates are loaded in the background.
+        """
+
+        first_date = self.first_date.date()
+        if self.view_choice.currentText() == "Week":
+            # Weeks start on Monday. (dayOfWeek() is 1 for Monday)
+            first_date = first_date.addDays(1 - first_date.dayOfWeek())
+            self.agenda_model.show_week(first_date.toString(Qt.ISODate))
+        else:
+            self.agenda_model.show_agenda(first_date.toString(Qt.ISODate))
+
+    def show_date(self, index: QModelIndex) -> None:
+        """This function will show the tasks of the date the user clicked on."""
+
+        task_date = self.agenda_model.date_at(index.row())
+        self.date_chosen.emit(QDate.fromString(task_date, Qt.ISODate))
@@ -0,0 +1,75 @@
+from PySide6.QtWidgets import QCalendarWidget, QWidget, QLabel, QVBoxLayout
+from PySide6.QtCore import Qt, QDate, QRect, Signal
+from PySide6.QtGui import QColor, QPainter
+
+from task_cache import month_of
+from task_calendar_model import TaskCountModel
+
+# A day with this many tasks (or more) gets the strongest color.
+BUSIEST_DAY = 10
+
+
+class TaskCalendar(QCalendarWidget):
+    def __init__(self, count_model: TaskCountModel, parent: QWidget = None) -> None:
+        """This calendar colors every day by the number of tasks on it (a heat
+        map) and shows the number in the corner of the day.
+        It is used by the date pickers and the month overview.
+        """
+
+        super().__init__(parent)
+
+        self.COUNT_MODEL = count_model
+        self.COUNT_MODEL.counts_changed.connect(self.updateCells)
+        self.setGridVisible(True)
+
+    def paintCell(self, painter: QPainter, rect: QRect, date: QDate) -> None:
+        super().paintCell(painter, rect, date)
+
+        # The counts of a whole month come from one query. (See store.py)
+        # The days of the months before and after are counted as well.
+        iso_date = date.toString(Qt.ISODate)
+        counts = self.COUNT_MODEL.counts(month_of(iso_date))
+        if not counts:
+            return
+        count = counts.get(iso_date)
+        if not count:
+            return
+
+        painter.save()
+        heat = QColor(self.palette().highlight().color())
+        heat.setAlphaF(0.15 + 0.45 * min(count, BUSIEST_DAY) / BUSIEST_DAY)
+        painter.fillRect(rect.adjusted(1, 1, -1, -1), heat)
+
+        font = painter.font()
+        font.setPointSizeF(font.pointSizeF() * 0.7)
+        painter.setFont(font)
+        painter.setPen(self.palette().text().color())
+        painter.drawText(rect.adjusted(2, 1, -3, -1), Qt.AlignTop | Qt.AlignRight, str(count))
+        painter.restore()
+
+
+class TaskCalendarSection(QWidget):
+    # Emitted when the user clicks on a day.
+    date_chosen = Signal(QDate)
+
+    def __init__(self, count_model: TaskCountModel) -> None:
+        """This funtion creates the month overview of the app. It shares the
+        task counts with the date pickers of the "Tasks" tab.
+        """
+
+        super().__init__()
+
+        # This is the main vertical layout for the overview.
+        self.main_v_layout = QVBoxLayout()
+
+        # Simply a title for this section
+        self.tab_title = QLabel("Tasks per Day")
+        self.tab_title.setAlignment(Qt.AlignHCenter)
+
+        # Clicking on a day shows its tasks.
+        self.month_calendar = TaskCalendar(count_model)
+        self.month_calendar.clicked.connect(self.date_chosen)
+
+        self.main_v_layout.addWidget(self.tab_title)
+        self.main_v_layout.addWidget(self.month_calendar)
+        self.setLayout(self.main_v_layout)
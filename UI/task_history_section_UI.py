@@ -0,0 +1,95 @@
+from PySide6.QtWidgets import (
+    QWidget,
+    QLabel,
+    QVBoxLayout,
+    QHBoxLayout,
+    QDateEdit,
+    QTableView,
+    QHeaderView,
+    QAbstractItemView,
+)
+from PySide6.QtCore import Qt, QDate
+from PySide6.QtGui import QShowEvent
+
+from task_history_model import TaskHistoryModel, TITLE_COLUMN
+
+
+class TaskHistorySection(QWidget):
+    def __init__(self) -> None:
+        """This funtion creates and implements everything needed
+        for the completed tasks history of the app.
+        """
+
+        super().__init__()
+
+        # This is the main vertical layout for the history section.
+        self.main_v_layout = QVBoxLayout()
+        self.main_v_layout.setAlignment(Qt.AlignTop | Qt.AlignHCenter)
+
+        # Simply a title for this section
+        self.tab_title = QLabel("Completed Tasks")
+        self.tab_title.setAlignment(Qt.AlignHCenter)
+
+        # The user chooses the range of dates the tasks were completed in.
+        # The last 30 days are shown by default.
+        # Every time one of the dates is changed the history is re-loaded.
+        self.first_date = QDateEdit(QDate.currentDate().addDays(-29))
+        self.last_date = QDateEdit(QDate.currentDate())
+        for date_edit in (self.first_date, self.last_date):
+            date_edit.setDisplayFormat("dd.MM.yyyy")
+            date_edit.setCalendarPopup(True)
+            date_edit.dateChanged.connect(self.load_from_DB)
+
+        self.range_h_layout = QHBoxLayout()
+        self.range_h_layout.addWidget(QLabel("From"))
+        self.range_h_layout.addWidget(self.first_date)
+        self.range_h_layout.addWidget(QLabel("to"))
+        self.range_h_layout.addWidget(self.last_date)
+
+        # The completions are kept in a model and shown in a table.
+        # The model fetches older completions page by page while the user -
+        # scrolls down.
+        self.history_model = TaskHistoryModel()  # Custom class
+        self.history_table_view = QTableView()
+        self.history_table_view.setModel(self.history_model)
+        self.history_table_view.setShowGrid(False)
+        self.history_table_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.history_table_view.setFocusPolicy(Qt.NoFocus)
+        self.history_table_view.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeToContents
+        )
+        self.history_table_view.horizontalHeader().setSectionResizeMode(
+            TITLE_COLUMN, QHeaderView.Stretch
+        )
+        self.history_table_view.verticalHeader().hide()
+        self.history_table_view.verticalHeader().setSectionResizeMode(
+            QHeaderView.Fixed
+        )
+
+        # Finally adding everything to the main vertical layout in order.
+        self.main_v_layout.addWidget(self.tab_title)
+        self.main_v_layout.addLayout(self.range_h_layout)
+        self.main_v_layout.addWidget(self.history_table_view)
+        self.setLayout(self.main_v_layout)
+
+    def showEvent(self, event: QShowEvent) -> None:
+        """This function will run every time the user opens the History tab.
+        Tasks may have been completed since it was last shown, so it is
+        re-loaded.
+        """
+
+        super().showEvent(event)
+        self.load_from_DB()
+
+    def load_from_DB(self) -> None:
+        """This function will re-fill the history with the chosen range."""
+
+        first_date = self.first_date.date()
+        last_date = self.last_date.date()
+        # A range the wrong way round is read the other way round.
+        if first_date > last_date:
+            first_date, last_date = last_date, first_date
+
+        self.history_model.set_range(
+            first_date.toString(Qt.ISODate), last_date.toString(Qt.ISODate)
+        )
@@ -1,4 +1,3 @@
-import sqlite3
 from PySide6.QtWidgets import (
     QPushButton,
     QLineEdit,
@@ -8,18 +7,19 @@ from PySide6.QtWidgets import (
     QHBoxLayout,
     QDateEdit,
     QSizePolicy,
-    QScrollArea,
+    QListView,
+    QComboBox,
+    QSpinBox,
 )
-from PySide6.QtCore import Qt, QDate
-from os.path import dirname, join
-from os import environ
+from PySide6.QtCore import Qt, QDate, QModelIndex
 
-# Disable the corny pointless idiotic PyGame Welcome message in the console...
-environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "0"
-
-from pygame import mixer
-
-from populate_scroll_area import PopulateScrollArea
+from audio import get_audio
+from UI.task_calendar_UI import TaskCalendar
+from recurrence import RULES
+from store import TaskStore
+from task_calendar_model import TaskCountModel
+from task_list_model import TaskListModel, TaskItemDelegate
+from task_search_model import TaskSearchModel
 
 
 class TaskInputSection(QWidget):
@@ -29,14 +29,9 @@ class TaskInputSection(QWidget):
         """
         super().__init__()
 
-        # Initializing PyGame music variable
-        mixer.init()
-        self.task_added_notification = mixer.Sound(
-            join(
-                dirname(__file__),
-                "../Resources/Sounds/taskAddedNotificationSound_V0.2.wav",
-            )
-        )
+        # The number of tasks on every day, shown in the calendar popups of -
+        # the date pickers. (And in the "Calendar" tab, see main_UI.py)
+        self.task_counts = TaskCountModel()  # Custom class
 
         # This is the main vertical layout for the input section.
         self.main_v_layout = QVBoxLayout()
@@ -62,8 +57,22 @@ class TaskInputSection(QWidget):
         self.new_task_date.setMinimumDate(QDate.currentDate())
         self.new_task_date.setDisplayFormat("dd.MM.yyyy")
         self.new_task_date.setCalendarPopup(True)
+        self.new_task_date.setCalendarWidget(TaskCalendar(self.task_counts))
         self.new_task_date.dateChanged.connect(self.update_active_tasks_date)
 
+        # The user can choose to repeat the task instead of adding it once.
+        # The number of days is only asked for with "Every N days".
+        self.new_task_repeat = QComboBox()
+        self.new_task_repeat.addItem("Once", None)
+        for rule, rule_name in RULES.items():
+            self.new_task_repeat.addItem(rule_name, rule)
+        self.new_task_repeat.currentIndexChanged.connect(self.update_repeat_interval)
+        self.new_task_repeat_interval = QSpinBox()
+        self.new_task_repeat_interval.setRange(2, 365)
+        self.new_task_repeat_interval.setPrefix("every ")
+        self.new_task_repeat_interval.setSuffix(" days")
+        self.new_task_repeat_interval.hide()
+
         # Pressing this button will save the task into the DB and refresh the UI.
         self.new_task_add_button = QPushButton("Add")
         self.new_task_add_button.clicked.connect(self.save_to_DB)
@@ -74,6 +83,8 @@ class TaskInputSection(QWidget):
         self.input_section_h_layout = QHBoxLayout()
         self.input_section_h_layout.addWidget(self.new_task_input)
         self.input_section_h_layout.addWidget(self.new_task_date)
+        self.input_section_h_layout.addWidget(self.new_task_repeat)
+        self.input_section_h_layout.addWidget(self.new_task_repeat_interval)
         self.input_section_h_layout.addWidget(self.new_task_add_button)
 
         # Simply a title for the active tasks section
@@ -85,6 +96,7 @@ class TaskInputSection(QWidget):
         self.active_tasks_date = QDateEdit(QDate.currentDate())
         self.active_tasks_date.setDisplayFormat("dd.MM.yyyy")
         self.active_tasks_date.setCalendarPopup(True)
+        self.active_tasks_date.setCalendarWidget(TaskCalendar(self.task_counts))
         self.active_tasks_date.setAlignment(Qt.AlignCenter)
         self.active_tasks_date.setSizePolicy(
             QSizePolicy.Expanding, QSizePolicy.Preferred
@@ -113,18 +125,46 @@ class TaskInputSection(QWidget):
         self.active_tasks_date_selection_h_layout.addWidget(self.active_tasks_date)
         self.active_tasks_date_selection_h_layout.addWidget(self.next_day_button)
 
-        # Creating a scroll area so that if there are too many tasks -
-        # the UI wouldn't grow too much.
-        self.tasks_scroll_area = QScrollArea()
-        self.tasks_scroll_area.setWidgetResizable(True)
-        self.tasks_scroll_area.setAlignment(Qt.AlignTop)
+        # The tasks of the active date are kept in a model and shown in a list.
+        # The list view only creates and paints the rows that are visible -
+        # so if there are too many tasks the UI wouldn't grow too much.
+        # Once a task gets checked, play a short sound.
+        self.tasks_model = TaskListModel()  # Custom class
+        self.tasks_model.task_completed.connect(
+            lambda task: get_audio().play("task_completed")
+        )
+        self.tasks_model.loading_changed.connect(self.update_loading_state)
+        self.tasks_model.tasks_changed.connect(self.task_counts.invalidate)
+        self.tasks_list_view = QListView()
+        self.tasks_list_view.setModel(self.tasks_model)
+        self.tasks_list_view.setItemDelegate(TaskItemDelegate(self.tasks_list_view))
+        self.tasks_list_view.setUniformItemSizes(True)
+        self.tasks_list_view.setSelectionMode(QListView.NoSelection)
+
+        # The user can search the tasks of all dates by their title.
+        # The results replace the tasks list while there is a search text.
+        # Clicking a result jumps to the date of that task.
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search tasks...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_model = TaskSearchModel()  # Custom class
+        self.search_model.searching_changed.connect(self.update_active_tasks_label)
+        self.search_input.textChanged.connect(self.search_tasks)
+        self.search_results_view = QListView()
+        self.search_results_view.setModel(self.search_model)
+        self.search_results_view.setUniformItemSizes(True)
+        self.search_results_view.setEditTriggers(QListView.NoEditTriggers)
+        self.search_results_view.clicked.connect(self.show_search_result)
+        self.search_results_view.hide()
 
         # Finally adding everything to the main vertical layout in order.
         self.main_v_layout.addWidget(self.tab_title)
         self.main_v_layout.addLayout(self.input_section_h_layout)
         self.main_v_layout.addWidget(self.current_active_tasks_label)
         self.main_v_layout.addLayout(self.active_tasks_date_selection_h_layout)
-        self.main_v_layout.addWidget(self.tasks_scroll_area)
+        self.main_v_layout.addWidget(self.search_input)
+        self.main_v_layout.addWidget(self.tasks_list_view)
+        self.main_v_layout.addWidget(self.search_results_view)
         self.setLayout(self.main_v_layout)
 
         # Loading tasks from DB once everything is set.
@@ -153,79 +193,87 @@ class TaskInputSection(QWidget):
                 self.update_active_tasks_date(self.new_task_date.date())
 
             task_title = self.new_task_input.text()
-            task_date = self.new_task_date.date().toString(Qt.RFC2822Date)
-            task_ID = 1
-
-            # Opening the database connection.
-            DB_CONNECTION = sqlite3.connect("TaskMan.db")
-            DB_CURSOR = DB_CONNECTION.cursor()
-
-            # Checking for the last task ID saved in the DB.
-            # TO-DO: Only select task_id from DB (no need to get everything)
-            DB_CURSOR.execute(f"SELECT * FROM Tasks WHERE task_date = '{task_date}'")
-            tasks = DB_CURSOR.fetchall()
-
-            # Simply trying to find the last ID saved in the DB
-            # TO-DO: can be easily done with something like:
-            # if empty -> ID = 1 | if not empty -> ID = tasks[-1][0] + 1
-            for task in tasks:
-                if task[0] > task_ID:
-                    task_ID = task[0]
-                if task[0] == task_ID:
-                    task_ID += 1
-
-            # Finally saving the new task in the DB.
-            DB_CURSOR.execute(
-                f"INSERT INTO Tasks VALUES('{task_ID}', '{task_title}', '{task_date}')"
-            )
-
-            # This will commit the changes before closing the connection.
-            DB_CONNECTION.commit()
-
-            # Close the DB connection.
-            DB_CURSOR.close()
-            DB_CONNECTION.close()
+            task_date = self.new_task_date.date().toString(Qt.ISODate)
+
+            # Recurring tasks are saved once as a rule, starting on the chosen date.
+            # They can show up on any date, so the list is re-loaded for them.
+            rule = self.new_task_repeat.currentData()
+            if rule is not None:
+                interval = 1
+                if rule == "every_n_days":
+                    interval = self.new_task_repeat_interval.value()
+                TaskStore().add_recurrence(task_title, rule, task_date, interval)
+                self.new_task_input.clear()
+                self.tasks_model.add_recurrence()
+                get_audio().play("task_added")
+                return
+
+            # Saving the new task in the DB.
+            # The database hands out the ID of the new task.
+            task = TaskStore().add_task(task_title, task_date)
 
             # Clearing the input field after completion.
             self.new_task_input.clear()
 
-            # Refreshing the UI so the newly added task shows up.
-            self.load_from_DB()
+            # Only adding the new task to the list instead of re-loading it.
+            # The list is already showing the date of the new task (see above).
+            self.tasks_model.insert_task(task)
+            self.search_model.refresh()
 
             # Play a completion notification sound
-            self.task_added_notification.play()
+            get_audio().play("task_added")
 
-    def load_from_DB(self) -> None:
-        """This function will completely destroy the tasks list widgets if they
-        exist and re-generate them.
-        The function will load the tasks from the chosen date by the user.
-        """
+    def update_repeat_interval(self) -> None:
+        """This function will only show the number of days when it is needed."""
 
-        # Load tasks from this date
-        date = self.active_tasks_date.date().toString(Qt.RFC2822Date)
+        self.new_task_repeat_interval.setVisible(
+            self.new_task_repeat.currentData() == "every_n_days"
+        )
 
-        try:
-            if self.tasks_scroll_area_widget:
-                # If the widget already exists destroy first before re-generating.
-                self.generate_tasks_list_UI(date, already_exists=True)
+    def update_loading_state(self, loading: bool) -> None:
+        """This function will let the user know while the tasks of the chosen
+        date are still being loaded. The rest of the UI stays usable.
+        """
+
+        self.update_active_tasks_label()
 
-        except AttributeError:
-            # If it does not exist, simply generate it.
+    def update_active_tasks_label(self) -> None:
+        """This function will show what the list below the label is showing."""
 
-            self.generate_tasks_list_UI(date)
+        if self.search_input.text().strip():
+            if self.search_model.searching:
+                self.current_active_tasks_label.setText("Searching...")
+            else:
+                self.current_active_tasks_label.setText("Search Results")
+        elif self.tasks_model.loading:
+            self.current_active_tasks_label.setText("Loading Tasks...")
+        else:
+            self.current_active_tasks_label.setText("Current Active Tasks")
 
-    def generate_tasks_list_UI(self, date: str, already_exists: bool = False) -> None:
-        """This function will create a new object of my custom class.
-        The class will return a QWidget populated with items from the DB.
+    def search_tasks(self, text: str) -> None:
+        """This function will run every time the search text changes.
+        The search itself waits until the user stops typing.
         """
 
-        # If the widget already exists destroy first before re-generating.
-        if already_exists:
-            self.tasks_scroll_area_widget.destroy()
+        searching = bool(text.strip())
+        self.tasks_list_view.setVisible(not searching)
+        self.search_results_view.setVisible(searching)
+        self.search_model.search(text)
+        self.update_active_tasks_label()
+
+    def show_search_result(self, index: QModelIndex) -> None:
+        """This function will show the date of the task the user clicked on."""
 
-        # Creating a widget filled with tasks from the DB with checkboxes
-        self.tasks_scroll_area_widget = PopulateScrollArea()  # Custom class
-        self.tasks_scroll_area_widget.get_task_widget(date)
+        task = self.search_model.task_at(index.row())
+        self.search_input.clear()
+        self.active_tasks_date.setDate(QDate.fromString(task.task_date, Qt.ISODate))
 
-        # Set the object as the Scroll Area's widget
-        self.tasks_scroll_area.setWidget(self.tasks_scroll_area_widget)
+    def load_from_DB(self) -> None:
+        """This function will re-fill the tasks list model.
+        The function will load the tasks from the chosen date by the user.
+        The tasks are loaded in the background if they aren't cached yet.
+        """
+
+        # Load tasks from this date
+        date = self.active_tasks_date.date().toString(Qt.ISODate)
+        self.tasks_model.load(date)
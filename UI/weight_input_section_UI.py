@@ -1,4 +1,3 @@
-import sqlite3
 from PySide6.QtWidgets import (
     QPushButton,
     QDoubleSpinBox,
@@ -9,13 +8,19 @@ from PySide6.QtWidgets import (
     QDateEdit,
     QComboBox,
     QSizePolicy,
-    QScrollArea,
+    QTableView,
+    QHeaderView,
+    QAbstractItemView,
+    QTabWidget,
 )
 from PySide6.QtCore import Qt, QDate
-from os.path import dirname, join
-from pygame import mixer
 
-from populate_scroll_area import PopulateScrollArea
+from audio import get_audio
+from db_workers import run_in_background
+from store import WeightStore, WeightSummary
+from weight_chart import WeightChart
+from weight_history_model import WeightHistoryModel
+from weight_series import KG_PER_LB, convert_weight
 
 
 class WeightInputSection(QWidget):
@@ -26,15 +31,6 @@ class WeightInputSection(QWidget):
 
         super().__init__()
 
-        # Initializing PyGame music variable
-        mixer.init()
-        self.weight_added_notification = mixer.Sound(
-            join(
-                dirname(__file__),
-                "../Resources/Sounds/taskAddedNotificationSound_V0.2.wav",
-            )
-        )
-
         # This is the main vertical layout for the input section.
         self.main_v_layout = QVBoxLayout()
         self.main_v_layout.setAlignment(Qt.AlignTop | Qt.AlignHCenter)
@@ -81,7 +77,9 @@ class WeightInputSection(QWidget):
         self.new_weight_date.setCalendarPopup(True)
 
         # Pressing this button will save the weight into the DB and refresh the UI.
+        # The button stays disabled until the weights list has been loaded.
         self.new_weight_add_button = QPushButton("Add")
+        self.new_weight_add_button.setEnabled(False)
         self.new_weight_add_button.clicked.connect(self.save_to_DB)
 
         # Adding all input elements to one layout.
@@ -93,32 +91,73 @@ class WeightInputSection(QWidget):
         self.input_section_h_layout.addWidget(self.new_weight_date)
         self.input_section_h_layout.addWidget(self.new_weight_add_button)
 
-        # This section shows how much progress the user has had since the last-
-        # entry. (Not from the first entry but rather from the previous one)
-        # TO-DO: Let this show overall progress since the first entry ever
+        # This section shows how much progress the user has had since the first-
+        # entry ever. (The first and last entry by date, not by saving order)
         self.weight_changes_label = QLabel("Weight Changes: No progress")
         self.weight_changes_label.setAlignment(Qt.AlignHCenter)
         self.weight_changes_label.setToolTip("Weight changes since the first entry")
 
-        # Creating a scroll area so that if there are too many tasks -
-        # the UI wouldn't grow too much.
-        self.weights_scroll_area = QScrollArea()
-        self.weights_scroll_area.setWidgetResizable(True)
-        self.weights_scroll_area.setAlignment(Qt.AlignTop)
+        # A small statistics panel with moving averages and the lowest and -
+        # highest weight ever saved. Filled in once the statistics are loaded.
+        self.weight_stats_label = QLabel()
+        self.weight_stats_label.setAlignment(Qt.AlignHCenter)
+        self.weight_stats_label.setToolTip(
+            "Averages of the last 7/30 days up to the newest entry"
+        )
+
+        # The weight history is kept in a model and shown in a table.
+        # The model only loads the newest records and fetches older ones -
+        # page by page while the user scrolls down.
+        # The model starts loading the history in the background right away.
+        self.weights_model = WeightHistoryModel(
+            self.weight_unit_combobox.currentText()
+        )  # Custom class
+        self.weights_model.first_page_loaded.connect(self.first_page_loaded)
+
+        self.weights_table_view = QTableView()
+        self.weights_table_view.setModel(self.weights_model)
+        self.weights_table_view.setShowGrid(False)
+        self.weights_table_view.setSelectionMode(QAbstractItemView.NoSelection)
+        self.weights_table_view.setFocusPolicy(Qt.NoFocus)
+        self.weights_table_view.horizontalHeader().hide()
+        self.weights_table_view.horizontalHeader().setSectionResizeMode(
+            QHeaderView.Stretch
+        )
+        self.weights_table_view.verticalHeader().hide()
+        self.weights_table_view.verticalHeader().setSectionResizeMode(
+            QHeaderView.Fixed
+        )
+
+        # A chart of the weight over time, next to the table in its own tab.
+        # It only loads the history the first time the user opens it.
+        self.weights_chart = WeightChart(self.weight_unit_combobox.currentText())
+        self.weights_chart.setToolTip(
+            "Scroll to zoom, drag to move, double click to show everything"
+        )
+
+        self.weights_view_tab_widget = QTabWidget()
+        self.weights_view_tab_widget.addTab(self.weights_table_view, "History")
+        self.weights_view_tab_widget.addTab(self.weights_chart, "Trend")
+
+        # Shown above the table while the newest weights are being loaded.
+        self.weights_loading_label = QLabel("Loading...")
+        self.weights_loading_label.setAlignment(Qt.AlignCenter)
 
         # Finally adding everything to the main vertical layout in order.
         self.main_v_layout.addWidget(self.tab_title)
         self.main_v_layout.addLayout(self.input_section_h_layout)
         self.main_v_layout.addWidget(self.weight_changes_label)
-        self.main_v_layout.addWidget(self.weights_scroll_area)
+        self.main_v_layout.addWidget(self.weight_stats_label)
+        self.main_v_layout.addWidget(self.weights_loading_label)
+        self.main_v_layout.addWidget(self.weights_view_tab_widget)
         self.setLayout(self.main_v_layout)
 
-        # Loading weights from DB once everything is set.
-        self.load_from_DB()
+        # Loading the statistics of the history once everything is set.
+        self.load_summary()
 
     def update_weight_input_suffix(self, currentUnit: str) -> None:
         """This function will run when the user changes the weight unit.
-        It will destroy the UI first and re-generate it with converted values.
+        It will re-label the loaded rows with converted values.
 
         By default, this app stores weight values in KG.
         This means if the user saves a new entry as lbs, it will first be -
@@ -129,8 +168,10 @@ class WeightInputSection(QWidget):
         # Set the suffix to whatever the user changed the unti to.
         self.new_weight_input.setSuffix(f" {currentUnit}")
 
-        # Destroy the UI first and re-generate it with converted values.
-        self.generate_weights_list_UI(already_exists=True)
+        # Re-label the rows in place with converted values.
+        self.weights_model.set_unit(currentUnit)
+        self.weights_chart.set_unit(currentUnit)
+        self.update_weight_changes()
 
     def save_to_DB(self) -> None:
         """This function will convert any values that were entered as lb to KG.
@@ -140,80 +181,93 @@ class WeightInputSection(QWidget):
 
         weight_value = self.new_weight_input.value()
         weight_unit = self.weight_unit_combobox.currentText()
-        weight_date = self.new_weight_date.date().toString(Qt.RFC2822Date)
-        weight_ID = 1
+        weight_date = self.new_weight_date.date().toString(Qt.ISODate)
 
         # Only save Kilogram values in the Database.
         # If the user chooses "lb", the program will convert the values.
         # If not, the values will simply be shown straight from the DB.
         if weight_unit == "lb":
-            weight_value = round(weight_value * 0.45359237, 2)
+            weight_value = round(weight_value * KG_PER_LB, 2)
             weight_unit = "KG"
 
-        # Opening the database connection.
-        DB_CONNECTION = sqlite3.connect("TaskMan.db")
-        DB_CURSOR = DB_CONNECTION.cursor()
-
-        # Checking for the last task ID saved in the DB.
-        # TO-DO: Only select weight_id from DB (no need to get everything)
-        DB_CURSOR.execute("SELECT * FROM Weights")
-        weights = DB_CURSOR.fetchall()
-
-        # Simply trying to find the last ID saved in the DB
-        # TO-DO: can be easily done with something like:
-        # if empty -> ID = 1 | if not empty -> ID = weights[-1][0] + 1
-        for weight in weights:
-            if weight[0] > weight_ID:
-                weight_ID = weight[0]
-            if weight[0] == weight_ID:
-                weight_ID += 1
-
-        # Finally saving the new weight in the DB.
-        DB_CURSOR.execute(
-            f"INSERT INTO Weights VALUES('{weight_ID}', '{weight_value}', '{weight_unit}', '{weight_date}')"
-        )
-
-        # This will commit the changes before closing the connection.
-        DB_CONNECTION.commit()
-
-        # Close the DB connection.
-        DB_CURSOR.close()
-        DB_CONNECTION.close()
+        # Saving the new weight in the DB.
+        # The database hands out the ID of the new weight.
+        weight = WeightStore().add_weight(weight_value, weight_unit, weight_date)
 
-        # Refreshing the UI so the newly added weight shows up.
-        self.load_from_DB()
+        # Only adding the new weight to the UI instead of re-generating it.
+        # The statistics were already updated by the database while saving.
+        self.weights_model.add_weight(weight)
+        self.weights_chart.add_weight(weight)
+        self.load_summary()
 
         # Play a completion notification sound
-        self.weight_added_notification.play()
+        get_audio().play("task_added")
 
-    def load_from_DB(self) -> None:
-        """This function will completely destroy the weights list widgets if they
-        exist and re-generate them.
-        The function will load (all) records saved by the user.
+    def load_summary(self) -> None:
+        """This function will load the statistics of the weight history in
+        the background. They are kept up to date by the database itself,
+        so this is a single row lookup no matter how long the history is.
         """
 
-        try:
-            if self.weights_scroll_area:
-                self.generate_weights_list_UI(already_exists=True)
+        run_in_background(WeightStore().get_summary, on_finished=self.summary_loaded)
 
-        except AttributeError:
-            self.generate_weights_list_UI()
+    def summary_loaded(self, weight_summary: WeightSummary) -> None:
+        """This function will run on the GUI thread once the statistics arrive."""
 
-    def generate_weights_list_UI(self, already_exists: bool = False) -> None:
-        """This function will create a new object of my custom class.
-        The class will return a QWidget populated with items from the DB.
+        self.weight_summary = weight_summary
+        self.update_weight_changes()
+
+    def update_weight_changes(self) -> None:
+        """This function will update the weight changes label so that the user
+        can see if they have gained or lost weight since the first entry, and
+        the statistics below it, in the unit the user has selected.
         """
 
-        # If the widgets exist, destroy them first before re-generating.
-        if already_exists:
-            self.weights_scroll_area.destroy()
+        try:
+            weight_summary = self.weight_summary
+        except AttributeError:
+            # The statistics are still being loaded.
+            return
+
+        unit = self.weight_unit_combobox.currentText()
+
+        # The change from the first to the last record (by date).
+        # It is None until there are more than 1 records saved in the DB.
+        total_change = weight_summary.total_change
+        if total_change is not None:
+            difference = round(convert_weight(total_change, unit), 2)
+
+            # If value is a negative number, that means the user has lost weight.
+            # Example: 85 KG - 90 KG : -5 KG
+            if difference < 0:
+                self.weight_changes_label.setText(
+                    f"Weight Changes:  -{str(abs(difference))}"
+                )
+            # If the value is a positive number, that means the user has gained weight.
+            # Example: 95 KG - 90 KG : 5 KG
+            elif difference > 0:
+                self.weight_changes_label.setText(
+                    f"Weight Changes:  +{str(difference)}"
+                )
+            # If both values are the same, there has been no progress since the start.
+            else:
+                self.weight_changes_label.setText("Weight Changes:  No progress")
+
+        # The statistics only make sense once there is at least one record.
+        if weight_summary.entry_count > 0:
+            average_7 = round(convert_weight(weight_summary.moving_average_7, unit), 2)
+            average_30 = round(convert_weight(weight_summary.moving_average_30, unit), 2)
+            min_weight = convert_weight(weight_summary.min_value, unit)
+            max_weight = convert_weight(weight_summary.max_value, unit)
+
+            self.weight_stats_label.setText(
+                f"7-day avg: {average_7}  |  30-day avg: {average_30}  |  "
+                f"Min: {min_weight}  |  Max: {max_weight}"
+            )
 
-        # Creating a widget filled with weight records from the DB.
-        # This is a custom class created by me.
-        self.weights_scroll_area_widget = PopulateScrollArea()
-        self.weights_scroll_area_widget.get_weight_widget(
-            self.weight_unit_combobox.currentText(), self.weight_changes_label
-        )
+    def first_page_loaded(self) -> None:
+        """This function will run once the newest records have been loaded."""
 
-        # Set the object as the Scroll Area's widget
-        self.weights_scroll_area.setWidget(self.weights_scroll_area_widget)
+        # Now that the newest records are known, new weights can be added.
+        self.new_weight_add_button.setEnabled(True)
+        self.weights_loading_label.hide()
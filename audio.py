@@ -0,0 +1,95 @@
+import threading
+from os import environ
+from os.path import dirname, join
+
+"""This file contains the audio service which plays the notification sounds.
+
+PyGame is only imported and its mixer only initialized when the first sound is
+needed (or when warm_up() is called once the window is on screen), so probing
+the audio device never delays the start of the app. Decoded sounds are kept.
+
+Setting the TASKMAN_SILENT environment variable (e.g. TASKMAN_SILENT=1)
+turns all sounds off, which is handy on servers and headless machines.
+"""
+
+# Disable the corny pointless idiotic PyGame Welcome message in the console...
+environ["PYGAME_HIDE_SUPPORT_PROMPT"] = "0"
+
+SOUNDS_DIRECTORY = join(dirname(__file__), "Resources/Sounds")
+SOUNDS = {
+    "task_added": "taskAddedNotificationSound_V0.2.wav",
+    "task_completed": "taskCompletedNotificationSound_V0.07.wav",
+}
+
+
+def silent_mode_requested() -> bool:
+    """This function will check if the user asked for no sounds at all."""
+
+    return environ.get("TASKMAN_SILENT", "").lower() not in ("", "0", "false", "no")
+
+
+class AudioService:
+    def __init__(self, enabled: bool = None) -> None:
+        """This initializer doesn't touch the audio device at all."""
+
+        if enabled is None:
+            enabled = not silent_mode_requested()
+        self.enabled = enabled
+
+        self.sounds = {}
+        self.ready = False
+        self._lock = threading.Lock()
+
+    def initialize(self) -> None:
+        """This function will initialize the mixer and decode every sound.
+        It only does the work once, later calls return right away.
+        """
+
+        with self._lock:
+            if self.ready or not self.enabled:
+                return
+            try:
+                from pygame import error, mixer
+            except ImportError:
+                self.enabled = False
+                return
+
+            try:
+                mixer.init()
+                for name, file_name in SOUNDS.items():
+                    self.sounds[name] = mixer.Sound(join(SOUNDS_DIRECTORY, file_name))
+            except error:
+                # No audio device (or no permission to use it), stay silent.
+                self.enabled = False
+                return
+            self.ready = True
+
+    def warm_up(self) -> None:
+        """This function will initialize the mixer on a background thread so
+        the first sound doesn't have to wait for it.
+        """
+
+        if self.enabled and not self.ready:
+            threading.Thread(target=self.initialize, daemon=True).start()
+
+    def play(self, name: str) -> None:
+        """This function will play one of the sounds in SOUNDS."""
+
+        if not self.enabled:
+            return
+        self.initialize()
+        if self.ready:
+            self.sounds[name].play()
+
+
+# The audio service the whole app shares.
+_audio = None
+
+
+def get_audio() -> AudioService:
+    """This function will return the shared AudioService object."""
+
+    global _audio
+    if _audio is None:
+        _audio = AudioService()
+    return _audio
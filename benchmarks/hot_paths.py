@@ -0,0 +1,262 @@
+"""This script benchmarks the database and UI hot paths of Task Man.
+
+It generates databases of different sizes, builds the real widgets without a
+display (QT_QPA_PLATFORM=offscreen) or sound (TASKMAN_SILENT=1) and times:
+
+    task_load_date      switching the task list to a date that isn't cached
+    task_save           TaskInputSection.save_to_DB
+    task_complete       checking (completing) a task in the list (the write
+                        itself is queued, see write_queue.py)
+    task_search         a full-text search over the titles of all tasks
+    weight_tab_open     building the Weight tab until its first page is shown
+    weight_unit_switch  switching the unit combobox between KG and lb
+    weight_save         WeightInputSection.save_to_DB
+
+For every operation and size it reports the p50/p95/p99 latency and the peak
+memory allocated by Python while the operation ran (tracemalloc).
+
+Usage:
+    python benchmarks/hot_paths.py                      # 1k, 10k, 100k rows
+    python benchmarks/hot_paths.py --sizes 1000 1000000
+    python benchmarks/hot_paths.py --save-baseline      # store the results
+    python benchmarks/hot_paths.py --tolerance 0.5      # allow 50% slower
+    python benchmarks/hot_paths.py --memory             # without disk I/O
+
+If benchmarks/baselines.json exists the results are compared against it and
+the exit code is 1 when an operation's p50 got slower than the tolerance.
+"""
+
+import os
+
+# Must be set before Qt or the audio service are imported.
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("TASKMAN_SILENT", "1")
+
+import argparse
+import json
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+from os.path import abspath, dirname, exists, join
+
+# Make the app's modules importable when this script is run directly.
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from PySide6.QtCore import QThreadPool
+from PySide6.QtWidgets import QApplication
+
+from store import Database, MemoryDatabase, TaskStore, set_database
+
+BASELINES = join(dirname(abspath(__file__)), "baselines.json")
+
+# Tasks are spread over this many days, so every date holds size / DAYS tasks.
+DAYS = 365
+START_DATE = date(2020, 1, 1)
+
+
+def generate_database(database: Database, size: int) -> None:
+    """This function will fill a new database with "size" tasks and weights."""
+
+    connection = database.connection
+    connection.execute("BEGIN")
+    connection.executemany(
+        "INSERT INTO Tasks(task_title, task_date) VALUES(?, ?)",
+        (
+            (f"Task number {number}", (START_DATE + timedelta(days=number % DAYS)).isoformat())
+            for number in range(size)
+        ),
+    )
+    # Four weights per day, going back in time from the start date.
+    # (One per day wouldn't fit a million of them into the calendar)
+    connection.executemany(
+        "INSERT INTO Weights(weight_value, weight_unit, weight_date) VALUES(?, 'KG', ?)",
+        (
+            (70 + number % 20, (START_DATE - timedelta(days=number // 4)).isoformat())
+            for number in range(size)
+        ),
+    )
+    connection.execute("COMMIT")
+
+
+def wait_for(app: QApplication, condition: object) -> None:
+    """This function will run the event loop until the condition is true."""
+
+    while not condition():
+        QThreadPool.globalInstance().waitForDone(1)
+        app.processEvents()
+
+
+def measure(operation: object, repeats: int) -> dict[str, float]:
+    """This function will run an operation "repeats" times and return its
+    latency percentiles (ms) and peak Python memory (KiB).
+    """
+
+    latencies = []
+    tracemalloc.start()
+    for repeat in range(repeats):
+        start = time.perf_counter()
+        operation(repeat)
+        latencies.append((time.perf_counter() - start) * 1000)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)],
+        "p99": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)],
+        "peak_kib": peak / 1024,
+    }
+
+
+def benchmark_size(
+    app: QApplication, directory: str, size: int, repeats: int, memory: bool
+) -> dict:
+    """This function will benchmark every operation against one database size.
+    With "memory" the database is never written to disk, so only the UI and
+    SQLite itself are measured.
+    """
+
+    if memory:
+        database = MemoryDatabase()
+    else:
+        database = Database(join(directory, f"TaskMan_{size}.db"))
+    generate_database(database, size)
+    set_database(database)
+
+    # Imported late so the modules pick up the database set above.
+    from UI.task_input_section_UI import TaskInputSection
+    from UI.weight_input_section_UI import WeightInputSection
+
+    results = {}
+
+    tasks = TaskInputSection()
+    model = tasks.tasks_model
+    wait_for(app, lambda: not model.loading)
+
+    def load_date(repeat: int) -> None:
+        day = START_DATE + timedelta(days=repeat % DAYS)
+        model.CACHE.invalidate(day.isoformat())
+        model.load(day.isoformat())
+        wait_for(app, lambda: not model.loading)
+
+    results["task_load_date"] = measure(load_date, repeats)
+
+    day = START_DATE + timedelta(days=DAYS // 2)
+    tasks.active_tasks_date.setDate(day)
+    tasks.new_task_date.setMinimumDate(START_DATE)
+    tasks.new_task_date.setDate(day)
+    wait_for(app, lambda: not model.loading)
+
+    def save_task(repeat: int) -> None:
+        tasks.new_task_input.setText(f"Benchmark task {repeat}")
+        tasks.save_to_DB()
+
+    results["task_save"] = measure(save_task, repeats)
+
+    def complete_task(repeat: int) -> None:
+        model.complete_task(0)
+
+    results["task_complete"] = measure(complete_task, min(repeats, model.rowCount()))
+    model.WRITE_QUEUE.flush()
+
+    store = TaskStore()
+
+    def search_tasks(repeat: int) -> None:
+        # Alternates between a word in every title and a (prefix of a) number.
+        store.search_tasks("task" if repeat % 2 else f"number {repeat}")
+
+    results["task_search"] = measure(search_tasks, repeats)
+
+    weights = []
+
+    def open_weight_tab(repeat: int) -> None:
+        weight_tab = WeightInputSection()
+        wait_for(app, lambda: weight_tab.weights_model.loaded_first_page)
+        weights.append(weight_tab)
+
+    results["weight_tab_open"] = measure(open_weight_tab, max(repeats // 10, 3))
+    weight_tab = weights[-1]
+
+    def switch_unit(repeat: int) -> None:
+        weight_tab.weight_unit_combobox.setCurrentIndex((repeat + 1) % 2)
+        app.processEvents()
+
+    results["weight_unit_switch"] = measure(switch_unit, repeats)
+
+    def save_weight(repeat: int) -> None:
+        weight_tab.save_to_DB()
+
+    results["weight_save"] = measure(save_weight, repeats)
+
+    wait_for(app, lambda: QThreadPool.globalInstance().activeThreadCount() == 0)
+    return results
+
+
+def compare(results: dict, baselines: dict, tolerance: float) -> list[str]:
+    """This function will return the operations that got slower than allowed."""
+
+    regressions = []
+    for size, operations in results.items():
+        for operation, numbers in operations.items():
+            baseline = baselines.get(size, {}).get(operation)
+            if baseline is None:
+                continue
+            if numbers["p50"] > baseline["p50"] * (1 + tolerance):
+                regressions.append(
+                    f"{operation} @ {size} rows: p50 {numbers['p50']:.2f} ms "
+                    f"(baseline {baseline['p50']:.2f} ms)"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--memory", action="store_true", help="keep the databases in memory")
+    arguments = parser.parse_args()
+
+    app = QApplication([])
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in arguments.sizes:
+            results[str(size)] = benchmark_size(
+                app, directory, size, arguments.repeats, arguments.memory
+            )
+
+    print(f"{'operation':<20}{'rows':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KiB':>11}")
+    for size, operations in results.items():
+        for operation, numbers in operations.items():
+            print(
+                f"{operation:<20}{size:>10}{numbers['p50']:>10.2f}{numbers['p95']:>10.2f}"
+                f"{numbers['p99']:>10.2f}{numbers['peak_kib']:>11.0f}"
+            )
+    # ru_maxrss is in KiB on Linux.
+    print(f"\npeak RSS of the whole run: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
+
+    if arguments.save_baseline:
+        with open(BASELINES, "w") as baselines_file:
+            json.dump(results, baselines_file, indent=2)
+        print(f"Saved baselines to {BASELINES}")
+        return 0
+
+    if exists(BASELINES):
+        with open(BASELINES) as baselines_file:
+            regressions = compare(results, json.load(baselines_file), arguments.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
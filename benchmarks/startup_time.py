@@ -0,0 +1,114 @@
+"""This script measures how long Task Man takes to start.
+
+It starts the app several times without a display (QT_QPA_PLATFORM=offscreen),
+each time letting it exit right after the main window was painted for the
+first time (TASKMAN_STARTUP_REPORT=1, see startup_report.py). It then prints
+the time-to-first-paint of every run and the modules which took the longest
+to import (from "python -X importtime").
+
+Usage:
+    python benchmarks/startup_time.py --runs 10 --budget 300
+    python benchmarks/startup_time.py --database path/to/TaskMan.db
+
+The exit code is 1 if the median time-to-first-paint is over the budget.
+"""
+
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from os.path import abspath, dirname, join
+
+TASKMAN = join(dirname(dirname(abspath(__file__))), "taskman.py")
+
+FIRST_PAINT = re.compile(r"time-to-first-paint: ([\d.]+) ms")
+IMPORT_TIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def start_app(directory: str, import_time: bool = False) -> subprocess.CompletedProcess:
+    """This function will start the app once in the specified directory,
+    against the TaskMan.db in there. (Even if TASKMAN_DB is set)
+    """
+
+    environment = dict(
+        os.environ,
+        QT_QPA_PLATFORM="offscreen",
+        TASKMAN_STARTUP_REPORT="1",
+        TASKMAN_SILENT="1",
+        TASKMAN_DB=join(directory, "TaskMan.db"),
+    )
+    command = [sys.executable]
+    if import_time:
+        command += ["-X", "importtime"]
+    command.append(TASKMAN)
+
+    return subprocess.run(
+        command, cwd=directory, env=environment, capture_output=True, text=True
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=300, help="in ms")
+    parser.add_argument("--top", type=int, default=15, help="modules to list")
+    parser.add_argument(
+        "--database", help="start against a copy of this TaskMan.db instead of a new one"
+    )
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        if arguments.database:
+            shutil.copy(arguments.database, join(directory, "TaskMan.db"))
+
+        # The first start creates (or upgrades) the database, which is not
+        # what a normal start looks like, so it isn't counted.
+        start_app(directory)
+
+        first_paints = []
+        for run in range(arguments.runs):
+            result = start_app(directory)
+            match = FIRST_PAINT.search(result.stdout)
+            if match is None:
+                print(result.stdout + result.stderr)
+                print("FAILED: the app did not report its first paint")
+                return 1
+            first_paints.append(float(match.group(1)))
+
+        imports = start_app(directory, import_time=True)
+
+    print("time-to-first-paint (ms):")
+    print("  runs:   " + ", ".join(f"{value:.0f}" for value in first_paints))
+    print(f"  min:    {min(first_paints):.1f}")
+    print(f"  median: {statistics.median(first_paints):.1f}")
+    print(f"  max:    {max(first_paints):.1f}")
+
+    # Only top level imports are listed, their time includes everything
+    # they import themselves.
+    modules = []
+    for line in imports.stderr.splitlines():
+        match = IMPORT_TIME.match(line)
+        if match and len(match.group(3)) == 1:
+            modules.append((int(match.group(2)), match.group(4)))
+    modules.sort(reverse=True)
+
+    print("\nslowest top-level imports (cumulative ms, one run):")
+    for microseconds, module in modules[: arguments.top]:
+        print(f"  {microseconds / 1000:8.1f}  {module}")
+
+    median = statistics.median(first_paints)
+    if median > arguments.budget:
+        print(f"\nFAILED: median {median:.1f} ms is over the {arguments.budget:.0f} ms budget")
+        return 1
+    print(f"\nOK: median {median:.1f} ms is within the {arguments.budget:.0f} ms budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""This script zooms the weight chart far out and drags it far to both sides
+and then checks that the view stayed next to the weights and that the chart
+can still be painted. It runs without a display and on an in-memory database.
+
+Usage:
+    python benchmarks/stress_chart_navigation.py --steps 80
+"""
+
+import os
+
+# Must be set before Qt or the audio service are imported.
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("TASKMAN_SILENT", "1")
+
+import argparse
+import sys
+import traceback
+from datetime import date
+from os.path import dirname, abspath
+
+# Make the app's modules importable when this script is run directly.
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from PySide6.QtCore import QEvent, QPoint, QPointF, QThreadPool, Qt
+from PySide6.QtGui import QMouseEvent, QWheelEvent
+from PySide6.QtWidgets import QApplication
+
+from store import MemoryDatabase, WeightStore, set_database
+from weight_chart import WeightChart
+
+
+def wheel(app: QApplication, chart: WeightChart, notches: int) -> None:
+    """This function will turn the mouse wheel over the middle of the chart."""
+
+    position = QPointF(chart.width() / 2, chart.height() / 2)
+    event = QWheelEvent(
+        position,
+        chart.mapToGlobal(position),
+        QPoint(),
+        QPoint(0, 120 * notches),
+        Qt.NoButton,
+        Qt.NoModifier,
+        Qt.NoScrollPhase,
+        False,
+    )
+    app.sendEvent(chart, event)
+
+
+def drag(app: QApplication, chart: WeightChart, distance: float) -> None:
+    """This function will drag the chart "distance" pixels to the right."""
+
+    start = QPointF(chart.width() / 2, chart.height() / 2)
+    end = QPointF(start.x() + distance, start.y())
+    for event_type, position, buttons in (
+        (QEvent.MouseButtonPress, start, Qt.LeftButton),
+        (QEvent.MouseMove, end, Qt.LeftButton),
+        (QEvent.MouseButtonRelease, end, Qt.NoButton),
+    ):
+        event = QMouseEvent(
+            event_type, position, chart.mapToGlobal(position), Qt.LeftButton, buttons, Qt.NoModifier
+        )
+        app.sendEvent(chart, event)
+
+
+def check_chart(app: QApplication, weight_dates: list[str], steps: int) -> list[str]:
+    """This function will navigate a chart of the specified weights and
+    return what went wrong.
+    """
+
+    set_database(MemoryDatabase())
+    store = WeightStore()
+    for number, weight_date in enumerate(weight_dates):
+        store.add_weight(70 + number % 5, "KG", weight_date)
+
+    chart = WeightChart("KG")
+    chart.resize(600, 300)
+    chart.show()
+    while chart.weight_series is None:
+        QThreadPool.globalInstance().waitForDone(1)
+        app.processEvents()
+
+    first_weight = date.fromisoformat(weight_dates[0]).toordinal()
+    last_weight = date.fromisoformat(weight_dates[-1]).toordinal()
+
+    # Errors raised in the event handlers or while painting don't reach -
+    # this script, Qt only hands them to sys.excepthook.
+    errors = []
+    sys.excepthook = lambda *error: errors.append("".join(traceback.format_exception(*error)))
+    try:
+        for action in (
+            lambda: wheel(app, chart, -steps),
+            lambda: drag(app, chart, 1_000_000),
+            lambda: drag(app, chart, -1_000_000),
+            lambda: wheel(app, chart, steps),
+            lambda: drag(app, chart, -1_000_000),
+        ):
+            action()
+            # The view has to stay within the calendar and show some weights.
+            view = f"{chart.view_start:.0f}-{chart.view_stop:.0f}"
+            if not 1 <= chart.view_start < chart.view_stop <= date.max.toordinal():
+                errors.append(f"the view {view} left the calendar")
+            elif chart.view_start > last_weight or chart.view_stop < first_weight:
+                errors.append(f"the view {view} doesn't show any weights")
+            chart.grab()
+    finally:
+        sys.excepthook = sys.__excepthook__
+        chart.close()
+    return errors
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--steps", type=int, default=80, help="wheel notches to zoom by")
+    arguments = parser.parse_args()
+
+    app = QApplication([])
+    first_day = date(2025, 10, 18).toordinal()
+    cases = {
+        "a single weight": ["2026-10-18"],
+        "a year of weights": [date.fromordinal(first_day + day).isoformat() for day in range(365)],
+        "weights at the ends of the calendar": ["0001-01-01", "9999-12-31"],
+    }
+
+    failed = False
+    for name, weight_dates in cases.items():
+        errors = check_chart(app, weight_dates, arguments.steps)
+        print(f"{name}: {'OK' if not errors else 'FAILED'}")
+        for error in errors:
+            print(f"FAILED: {error}")
+        failed = failed or bool(errors)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""This script hammers one database file with inserts from several processes
+at the same time and then checks that every record got its own ID.
+
+Usage:
+    python benchmarks/stress_concurrent_inserts.py --processes 8 --inserts 500
+"""
+
+import argparse
+import multiprocessing
+import sys
+import tempfile
+import time
+from os.path import dirname, join, abspath
+
+# Make the app's modules importable when this script is run directly.
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+from store import Database, TaskStore, WeightStore
+
+
+def insert_records(path: str, worker_number: int, inserts: int) -> list[int]:
+    """This function will run in its own process and insert tasks and weights
+    as fast as it can. It returns the IDs it was handed out.
+    """
+
+    database = Database(path)
+    task_store = TaskStore(database)
+    weight_store = WeightStore(database)
+
+    IDs = []
+    for number in range(inserts):
+        task = task_store.add_task(f"Task {worker_number}-{number}", "2024-01-01")
+        weight_store.add_weight(60 + number % 40, "KG", "2024-01-01")
+        IDs.append(task.task_ID)
+
+    database.close()
+    return IDs
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--inserts", type=int, default=500)
+    arguments = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = join(directory, "TaskMan.db")
+
+        # Create the schema once before the workers start racing each other.
+        Database(path).connection.close()
+
+        start = time.perf_counter()
+        with multiprocessing.Pool(arguments.processes) as pool:
+            results = pool.starmap(
+                insert_records,
+                [
+                    (path, worker_number, arguments.inserts)
+                    for worker_number in range(arguments.processes)
+                ],
+            )
+        elapsed = time.perf_counter() - start
+
+        expected = arguments.processes * arguments.inserts
+        handed_out = [task_ID for IDs in results for task_ID in IDs]
+
+        database = Database(path)
+        (task_count,) = database.connection.execute(
+            "SELECT COUNT(*) FROM Tasks"
+        ).fetchone()
+        (weight_count,) = database.connection.execute(
+            "SELECT COUNT(*) FROM Weights"
+        ).fetchone()
+        (distinct_task_IDs,) = database.connection.execute(
+            "SELECT COUNT(DISTINCT task_ID) FROM Tasks"
+        ).fetchone()
+        database.close()
+
+    print(
+        f"{expected * 2} inserts from {arguments.processes} processes "
+        f"in {elapsed:.2f}s ({expected * 2 / elapsed:.0f} inserts/s)"
+    )
+
+    failures = []
+    if len(set(handed_out)) != expected:
+        failures.append("the same task ID was handed out more than once")
+    if task_count != expected or distinct_task_IDs != expected:
+        failures.append(f"expected {expected} tasks, found {task_count}")
+    if weight_count != expected:
+        failures.append(f"expected {expected} weights, found {weight_count}")
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""This script edits several databases (devices) at random, syncs them through
+a shared folder in a random order and then checks that all of them ended up
+with the same tasks and weights. It also shows how little a sync moves
+compared to copying the whole database.
+
+Usage:
+    python benchmarks/stress_sync.py --devices 3 --rounds 20 --records 10000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from os.path import dirname, join, abspath
+
+# Make the app's modules importable when this script is run directly.
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+import import_export
+import sync
+from store import Database, TaskStore, WeightStore, timestamp
+
+
+def edit_randomly(database: Database, generator: random.Random, edits: int) -> None:
+    """This function will add, rename, complete and remove some records."""
+
+    tasks = TaskStore(database)
+    weights = WeightStore(database)
+    connection = database.connection
+
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        for number in range(edits):
+            (task_IDs,) = zip(*connection.execute("SELECT task_ID FROM Tasks").fetchall() or [(None,)])
+            task_ID = generator.choice(task_IDs)
+            action = generator.random()
+            if action < 0.4 or task_ID is None:
+                day = generator.randrange(1, 29)
+                tasks.add_task(f"Task {generator.getrandbits(32):x}", f"2026-10-{day:02}")
+            elif action < 0.6:
+                connection.execute(
+                    "UPDATE Tasks SET task_title = task_title || '!' WHERE task_ID = ?", (task_ID,)
+                )
+            elif action < 0.8:
+                tasks.complete_task(task_ID, timestamp())
+            elif action < 0.9:
+                connection.execute("DELETE FROM Tasks WHERE task_ID = ?", (task_ID,))
+            else:
+                weights.add_weight(generator.uniform(60, 90), "KG", f"2026-10-{number % 28 + 1:02}")
+
+
+def contents(database: Database) -> tuple[list, list]:
+    """This function will return the synced columns of every record."""
+
+    connection = database.connection
+    tasks = connection.execute(
+        "SELECT task_title, task_date, task_completed_at FROM Tasks ORDER BY 1, 2, 3"
+    ).fetchall()
+    weights = connection.execute(
+        "SELECT weight_value, weight_unit, weight_date FROM Weights ORDER BY 1, 2, 3"
+    ).fetchall()
+    return tasks, weights
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--devices", type=int, default=3)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--edits", type=int, default=25, help="edits per device and round")
+    parser.add_argument("--records", type=int, default=10000, help="tasks every device starts with")
+    parser.add_argument("--seed", type=int, default=1)
+    arguments = parser.parse_args()
+
+    generator = random.Random(arguments.seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        shared_folder = join(directory, "shared")
+
+        # The first device starts with a big database, the others get it -
+        # through the first sync.
+        devices = [Database(join(directory, f"device_{number}.db")) for number in range(arguments.devices)]
+        with open(join(directory, "tasks.csv"), "w", newline="") as tasks_file:
+            tasks_file.write("task_title,task_date\n")
+            for number in range(arguments.records):
+                tasks_file.write(f"Old task {number},2026-09-{number % 30 + 1:02}\n")
+        with open(join(directory, "tasks.csv"), newline="") as tasks_file:
+            import_export.import_tasks(tasks_file, "csv", devices[0])
+
+        start = time.perf_counter()
+        for database in devices:
+            sync.sync(shared_folder, database)
+        print(f"First sync of {arguments.records} tasks in {time.perf_counter() - start:.2f}s")
+
+        bytes_moved = 0
+        start = time.perf_counter()
+        for _ in range(arguments.rounds):
+            for database in devices:
+                edit_randomly(database, generator, arguments.edits)
+            for database in generator.sample(devices, len(devices)):
+                report = sync.sync(shared_folder, database)
+                bytes_moved += report.bytes_written + report.bytes_read
+        elapsed = time.perf_counter() - start
+
+        # Every device has to see the last changes of every other device.
+        for database in devices:
+            sync.sync(shared_folder, database)
+        results = [contents(database) for database in devices]
+
+        database_size = os.path.getsize(join(directory, "device_0.db"))
+        for database in devices:
+            database.close()
+
+    syncs = arguments.rounds * arguments.devices
+    print(
+        f"{syncs} syncs in {elapsed:.2f}s, {bytes_moved / syncs / 1024:.1f} KiB per sync "
+        f"(the database is {database_size / 1024:.0f} KiB)"
+    )
+
+    tasks, weights = results[0]
+    print(f"{len(tasks)} tasks and {len(weights)} weights on every device")
+    if any(result != results[0] for result in results[1:]):
+        print("FAILED: the devices ended up with different records")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+from recurrence import RULES
+from store import Task, TaskStore, WeightStore, get_database, open_database, set_database
+from weight_series import KG_PER_LB, convert_weight
+
+"""This file contains the command-line interface of the app.
+
+    taskman.py add "Buy milk" ["Call mom" ...] [--date YYYY-MM-DD]
+                   [--repeat daily|weekdays|weekly|monthly | --every N]
+    taskman.py list [--date YYYY-MM-DD] [--days N]
+    taskman.py complete TASK_ID [TASK_ID ...] [--date YYYY-MM-DD]
+    taskman.py search TEXT [--limit N]
+    taskman.py history [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--limit N]
+    taskman.py weight add VALUE [--unit KG|lb] [--date YYYY-MM-DD]
+    taskman.py weight list [--limit N] [--unit KG|lb]
+    taskman.py import tasks|weights FILE [--format csv|jsonl]
+    taskman.py export tasks|weights [FILE] [--format csv|jsonl]
+    taskman.py sync FOLDER [--new-device]
+
+Every command takes "--db PATH" before its name to work on another database
+than TASKMAN_DB (or TaskMan.db), ":memory:" for one that is never saved.
+
+It works on the same database as the window but never imports PySide6 or
+PyGame, so a call only costs the start of Python and SQLite. This makes it
+usable from cron jobs and scripts.
+Passing "-" as the title of "add" reads one title per line from stdin and
+saves all of them in a single transaction.
+Recurring tasks are listed as "R<ID>", completing one of them only completes
+it on the specified date.
+Import and export stream the file (See import_export.py), "-" or no FILE
+for export means stdout. The throughput is reported on stderr.
+Sync exchanges the changes since the last sync with other devices through a
+shared folder. (See sync.py)
+"""
+
+
+def iso_date(text: str) -> str:
+    """This function will check that a date argument is an ISO date."""
+
+    try:
+        return date.fromisoformat(text).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a date (YYYY-MM-DD): {text}")
+
+
+def day_count(text: str) -> int:
+    """This function will check that a number of days is at least 1."""
+
+    if not text.isdigit() or int(text) < 1:
+        raise argparse.ArgumentTypeError(f"not a number of days: {text}")
+    return int(text)
+
+
+def task_reference(text: str) -> str:
+    """This function will check that an argument is a task ID ("12") or the
+    ID of a recurring task ("R3").
+    """
+
+    if not text.upper().removeprefix("R").isdigit():
+        raise argparse.ArgumentTypeError(f"not a task ID: {text}")
+    return text.upper()
+
+
+def print_task(task: Task) -> None:
+    # Occurrences of recurring tasks have no ID of their own.
+    task_ID = f"R{task.recurrence_ID}" if task.recurring else task.task_ID
+    print(f"{task_ID}\t{task.task_date}\t{task.task_title}")
+
+
+def add_tasks(arguments: argparse.Namespace) -> int:
+    titles = arguments.titles
+    if titles == ["-"]:
+        titles = [line.strip() for line in sys.stdin]
+    titles = [title for title in titles if title]
+
+    rule = arguments.repeat
+    if arguments.every is not None:
+        rule = "every_n_days"
+
+    # All tasks are saved in one transaction, which only syncs to disk once.
+    store = TaskStore()
+    connection = store.DATABASE.connection
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        for title in titles:
+            if rule is None:
+                print_task(store.add_task(title, arguments.date))
+            else:
+                recurrence = store.add_recurrence(title, rule, arguments.date, arguments.every or 1)
+                print(f"R{recurrence.recurrence_ID}\t{recurrence.start_date}\t{title} ({rule})")
+    return 0
+
+
+def list_tasks(arguments: argparse.Namespace) -> int:
+    if arguments.days == 1:
+        tasks = TaskStore().get_tasks(arguments.date)
+    else:
+        # All dates are loaded with a single range query.
+        last_date = date.fromisoformat(arguments.date) + timedelta(days=arguments.days - 1)
+        tasks = TaskStore().get_tasks_between(arguments.date, last_date.isoformat())
+    for task in tasks:
+        print_task(task)
+    return 0
+
+
+def complete_tasks(arguments: argparse.Namespace) -> int:
+    store = TaskStore()
+    exit_code = 0
+    for task_ID in arguments.task_IDs:
+        # A recurring task is only completed on the specified date.
+        if task_ID.startswith("R"):
+            if not store.complete_occurrence(int(task_ID[1:]), arguments.date):
+                print(f"There is no task {task_ID} to complete on {arguments.date}", file=sys.stderr)
+                exit_code = 1
+        elif not store.complete_task(int(task_ID)):
+            print(f"There is no task with the ID {task_ID}", file=sys.stderr)
+            exit_code = 1
+    return exit_code
+
+
+def search_tasks(arguments: argparse.Namespace) -> int:
+    # Best matches first, from any date.
+    for task in TaskStore().search_tasks(" ".join(arguments.text), arguments.limit):
+        print_task(task)
+    return 0
+
+
+def list_history(arguments: argparse.Namespace) -> int:
+    # Most recently completed first, the same way the History tab shows them.
+    completions = TaskStore().get_completions(
+        arguments.first_date, arguments.last_date, None, arguments.limit
+    )
+    for completion in completions:
+        print(f"{completion.task_completed_at}\t{completion.task_date}\t{completion.task_title}")
+    return 0
+
+
+def add_weight(arguments: argparse.Namespace) -> int:
+    # Only Kilogram values are saved in the database. (Same as the window)
+    weight_value = arguments.value
+    if arguments.unit == "lb":
+        weight_value = round(weight_value * KG_PER_LB, 2)
+
+    weight = WeightStore().add_weight(weight_value, "KG", arguments.date)
+    print(f"{weight.weight_ID}\t{weight.weight_date}\t{weight.weight_value} KG")
+    return 0
+
+
+def list_weights(arguments: argparse.Namespace) -> int:
+    # Newest first, the same way the history table shows them.
+    page = WeightStore().get_page(None, arguments.limit)
+    for index in range(len(page)):
+        weight_value = convert_weight(page.values[index], arguments.unit)
+        print(f"{page.IDs[index]}\t{page.dates[index]}\t{weight_value} {arguments.unit}")
+    return 0
+
+
+def import_file(arguments: argparse.Namespace) -> int:
+    # Only imported when needed, csv & json would slow down every other command.
+    import import_export
+
+    file_format = arguments.format or import_export.guess_format(arguments.file)
+    import_rows = (
+        import_export.import_tasks if arguments.table == "tasks" else import_export.import_weights
+    )
+
+    try:
+        if arguments.file == "-":
+            report = import_rows(sys.stdin, file_format)
+        else:
+            with open(arguments.file, newline="", encoding="utf-8") as file:
+                report = import_rows(file, file_format)
+    except (OSError, ValueError) as error:
+        print(f"Import failed: {error}", file=sys.stderr)
+        return 1
+
+    print(f"Imported {report}", file=sys.stderr)
+    return 0
+
+
+def export_file(arguments: argparse.Namespace) -> int:
+    import import_export
+
+    file_format = arguments.format or import_export.guess_format(arguments.file)
+    export_rows = (
+        import_export.export_tasks if arguments.table == "tasks" else import_export.export_weights
+    )
+
+    if arguments.file == "-":
+        report = export_rows(sys.stdout, file_format)
+    else:
+        with open(arguments.file, "w", newline="", encoding="utf-8") as file:
+            report = export_rows(file, file_format)
+
+    print(f"Exported {report}", file=sys.stderr)
+    return 0
+
+
+def sync_folder(arguments: argparse.Namespace) -> int:
+    # Only imported when needed, the same way as import_export.
+    import sync
+
+    if arguments.new_device:
+        print(f"This device is now {sync.new_device_identity()}", file=sys.stderr)
+
+    try:
+        report = sync.sync(arguments.folder)
+    except (OSError, ValueError) as error:
+        print(f"Sync failed: {error}", file=sys.stderr)
+        return 1
+
+    print(f"Synced: {report}", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """This function will describe every command and its arguments."""
+
+    today = date.today().isoformat()
+
+    parser = argparse.ArgumentParser(
+        prog="taskman.py",
+        description="Manage tasks and weights without opening the window.",
+    )
+    parser.add_argument(
+        "--db",
+        metavar="PATH",
+        help='the database to use (default: $TASKMAN_DB or TaskMan.db), ":memory:" for none',
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_parser = commands.add_parser("add", help="add one or more tasks")
+    add_parser.add_argument("titles", nargs="+", help='task titles, or "-" to read them from stdin')
+    add_parser.add_argument("--date", type=iso_date, default=today, help="the (first) date")
+    add_parser.add_argument("--repeat", choices=[rule for rule in RULES if rule != "every_n_days"])
+    add_parser.add_argument("--every", type=day_count, metavar="N", help="repeat every N days")
+    add_parser.set_defaults(run=add_tasks)
+
+    list_parser = commands.add_parser("list", help="list the tasks of a date")
+    list_parser.add_argument("--date", type=iso_date, default=today, help="the (first) date")
+    list_parser.add_argument(
+        "--days", type=day_count, default=1, help="list this many dates, starting with --date"
+    )
+    list_parser.set_defaults(run=list_tasks)
+
+    complete_parser = commands.add_parser("complete", help="complete tasks by their ID")
+    complete_parser.add_argument("task_IDs", nargs="+", type=task_reference, metavar="task_ID")
+    complete_parser.add_argument(
+        "--date", type=iso_date, default=today, help="the date of recurring tasks (R...)"
+    )
+    complete_parser.set_defaults(run=complete_tasks)
+
+    search_parser = commands.add_parser("search", help="search the tasks of all dates")
+    search_parser.add_argument("text", nargs="+")
+    search_parser.add_argument("--limit", type=int, default=20)
+    search_parser.set_defaults(run=search_tasks)
+
+    history_parser = commands.add_parser("history", help="list completed tasks")
+    history_parser.add_argument(
+        "--from",
+        dest="first_date",
+        type=iso_date,
+        default=(date.today() - timedelta(days=29)).isoformat(),
+        help="the first date tasks were completed on (default: 30 days ago)",
+    )
+    history_parser.add_argument("--to", dest="last_date", type=iso_date, default=today)
+    history_parser.add_argument("--limit", type=int, default=100)
+    history_parser.set_defaults(run=list_history)
+
+    weight_parser = commands.add_parser("weight", help="add or list weights")
+    weight_commands = weight_parser.add_subparsers(dest="weight_command", required=True)
+
+    weight_add_parser = weight_commands.add_parser("add", help="add a weight")
+    weight_add_parser.add_argument("value", type=float)
+    weight_add_parser.add_argument("--unit", choices=("KG", "lb"), default="KG")
+    weight_add_parser.add_argument("--date", type=iso_date, default=today)
+    weight_add_parser.set_defaults(run=add_weight)
+
+    weight_list_parser = weight_commands.add_parser("list", help="list the newest weights")
+    weight_list_parser.add_argument("--limit", type=int, default=30)
+    weight_list_parser.add_argument("--unit", choices=("KG", "lb"), default="KG")
+    weight_list_parser.set_defaults(run=list_weights)
+
+    import_parser = commands.add_parser("import", help="import tasks or weights from a file")
+    import_parser.add_argument("table", choices=("tasks", "weights"))
+    import_parser.add_argument("file", help='a .csv or .jsonl file, or "-" for stdin')
+    import_parser.add_argument("--format", choices=("csv", "jsonl"))
+    import_parser.set_defaults(run=import_file)
+
+    export_parser = commands.add_parser("export", help="export tasks or weights to a file")
+    export_parser.add_argument("table", choices=("tasks", "weights"))
+    export_parser.add_argument("file", nargs="?", default="-", help="a .csv or .jsonl file")
+    export_parser.add_argument("--format", choices=("csv", "jsonl"))
+    export_parser.set_defaults(run=export_file)
+
+    sync_parser = commands.add_parser("sync", help="sync with other devices through a folder")
+    sync_parser.add_argument("folder", help="a folder every device can read and write")
+    sync_parser.add_argument(
+        "--new-device",
+        action="store_true",
+        help="give a database that was copied from another device its own identity",
+    )
+    sync_parser.set_defaults(run=sync_folder)
+
+    return parser
+
+
+def main(argv: list[str] = None) -> int:
+    """This function will run the command given on the command line and
+    return the exit code of the program.
+    """
+
+    arguments = build_parser().parse_args(argv)
+    if arguments.db:
+        set_database(open_database(arguments.db))
+
+    # Creating a brand new database or upgrading an existing one.
+    get_database().connection
+    try:
+        return arguments.run(arguments)
+    except BrokenPipeError:
+        # The output was piped into a program which stopped reading it (e.g. head).
+        # Python would complain again when flushing stdout on exit.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
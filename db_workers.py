@@ -0,0 +1,76 @@
+import logging
+from typing import Callable
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+"""This file contains the helpers for running database work off the GUI thread.
+
+A function is wrapped in a DatabaseWorker and run on Qt's global thread pool.
+Its result is delivered back to the GUI thread through a signal, so the
+window keeps responding while SQLite is busy reading from disk.
+Every worker thread gets its own connection from the store. (See store.py)
+"""
+
+logger = logging.getLogger("taskman.workers")
+
+
+class WorkerSignals(QObject):
+    # QRunnable is not a QObject, so the signals live in a separate object.
+    # This object is created on the GUI thread which makes every emit from -
+    # a worker thread arrive on the GUI thread.
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class DatabaseWorker(QRunnable):
+    def __init__(self, function: Callable, *args: object) -> None:
+        """This initializer will remember the function to run and its arguments."""
+
+        super().__init__()
+
+        self.FUNCTION = function
+        self.ARGS = args
+        self.signals = WorkerSignals()
+
+    def run(self) -> None:
+        """This function runs on a worker thread of the thread pool."""
+
+        try:
+            result = self.FUNCTION(*self.ARGS)
+        except Exception as error:
+            # Logged here, where the traceback is still known.
+            name = getattr(self.FUNCTION, "__name__", repr(self.FUNCTION))
+            logger.exception("Background work failed: %s", name)
+            self.signals.failed.emit(str(error))
+        else:
+            self.signals.finished.emit(result)
+
+
+# Workers which are still running.
+# Keeping a reference stops Python from collecting their signals too early.
+_running_workers = set()
+
+
+def run_in_background(
+    function: Callable,
+    *args: object,
+    on_finished: Callable[[object], None],
+    on_failed: Callable[[str], None] = None,
+) -> DatabaseWorker:
+    """This function will run a function on the thread pool and call
+    on_finished with its result on the GUI thread. If it raises, the error is
+    logged and on_failed is called with its message instead.
+    """
+
+    worker = DatabaseWorker(function, *args)
+    worker.signals.finished.connect(on_finished)
+    if on_failed is not None:
+        worker.signals.failed.connect(on_failed)
+
+    # Forget about the worker once it is done.
+    worker.signals.finished.connect(lambda result: _running_workers.discard(worker))
+    worker.signals.failed.connect(lambda error: _running_workers.discard(worker))
+    _running_workers.add(worker)
+
+    QThreadPool.globalInstance().start(worker)
+    return worker
@@ -0,0 +1,302 @@
+import csv
+import json
+import sqlite3
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import date
+from itertools import islice
+from operator import itemgetter
+from typing import Callable, Iterable, Iterator, NamedTuple, TextIO
+
+from migrations import SYNCED_TABLES, log_inserted_records, to_iso_date
+from store import Database, get_database
+from weight_series import KG_PER_LB
+
+"""This file contains the bulk import and export of tasks and weights.
+
+Both work on CSV files (with a header row) and JSON Lines files (one object
+per line) with the same column names as the database, e.g.
+
+    task_title,task_date                weight_value,weight_unit,weight_date
+    Buy milk,2026-10-18                 81.5,KG,2026-10-18
+
+Files are streamed row by row in both directions, so a file of any size is
+handled in constant memory. Imports are saved in batches, every batch is one
+executemany() in one transaction, which is what makes a million rows take
+seconds instead of a million separate commits.
+Weights are de-duplicated by date: a weight is skipped if there already is
+one on its date, either in the database or earlier in the same file.
+"""
+
+# How many rows are saved per transaction.
+BATCH_SIZE = 50_000
+
+TASK_COLUMNS = ("task_title", "task_date")
+WEIGHT_COLUMNS = ("weight_value", "weight_unit", "weight_date")
+WEIGHT_UNITS = ("KG", "lb")
+
+
+class TransferReport(NamedTuple):
+    rows_read: int
+    rows_written: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        skipped = self.rows_read - self.rows_written
+        return (
+            f"{self.rows_written} rows in {self.seconds:.2f} s "
+            f"({self.rows_per_second:,.0f} rows/s, {skipped} skipped)"
+        )
+
+
+def guess_format(path: str) -> str:
+    """This function will pick the file format from the file extension."""
+
+    if path.endswith((".jsonl", ".json", ".ndjson")):
+        return "jsonl"
+    return "csv"
+
+
+def read_rows(
+    file: TextIO, file_format: str, columns: tuple[str, ...], clean_row: Callable
+) -> Iterator[tuple]:
+    """This function will yield the specified columns of every row of a file
+    after passing them through "clean_row". Bad rows raise a ValueError
+    which tells on which line they are.
+    """
+
+    if file_format == "csv":
+        # Plain lists and the positions of the columns in the header are a -
+        # lot faster than csv.DictReader building a dict for every row.
+        records = csv.reader(file)
+        header = next(records, [])
+        missing = [column for column in columns if column not in header]
+        if missing:
+            raise ValueError(f"Line 1: missing column {missing[0]!r}")
+        get_columns = itemgetter(*(header.index(column) for column in columns))
+        first_line = 2
+    else:
+        records = (json.loads(line) for line in file if line.strip())
+        get_columns = itemgetter(*columns)
+        first_line = 1
+
+    for line_number, record in enumerate(records, first_line):
+        if file_format != "csv" and not isinstance(record, dict):
+            raise ValueError(f"Line {line_number}: not a JSON object")
+        try:
+            row = clean_row(*get_columns(record))
+        except KeyError as error:
+            raise ValueError(f"Line {line_number}: missing column {error}") from None
+        except IndexError:
+            raise ValueError(f"Line {line_number}: missing columns") from None
+        except ValueError as error:
+            raise ValueError(f"Line {line_number}: {error}") from None
+        except TypeError:
+            # e.g. a number or null where JSON Lines should have a text.
+            raise ValueError(f"Line {line_number}: a value has the wrong type") from None
+        yield row
+
+
+def write_rows(file: TextIO, file_format: str, columns: tuple[str, ...], rows: Iterable) -> int:
+    """This function will write rows to a file and return how many it wrote."""
+
+    count = 0
+    if file_format == "csv":
+        writer = csv.writer(file)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in rows:
+            file.write(json.dumps(dict(zip(columns, row))) + "\n")
+            count += 1
+    return count
+
+
+def clean_date(text: str) -> str:
+    """This function will return an ISO date for a date of an imported row.
+    Dates in the old format of the app ("18 Oct 2023") are converted.
+    """
+
+    try:
+        # Only YYYY-MM-DD is kept as it is, fromisoformat takes "20231018" too.
+        iso_date = date.fromisoformat(text)
+        return text if len(text) == 10 else iso_date.isoformat()
+    except ValueError:
+        # Raises again if it is neither an ISO nor an RFC 2822 date.
+        return date.fromisoformat(to_iso_date(text)).isoformat()
+
+
+def insert_batches(
+    database: Database,
+    statement: str,
+    rows: Iterator[tuple],
+    batch_size: int,
+    around_batch: Callable = None,
+) -> tuple[int, int]:
+    """This function will save rows in batches of "batch_size", each in its
+    own transaction, and return how many rows were read and inserted.
+    "around_batch" is a context manager factory which is entered within the
+    transaction of every batch. (See suspend_task_triggers)
+    A bad row stops the import, the batches before it stay saved and the
+    error tells how many rows that were.
+    """
+
+    connection = database.connection
+    rows_read = rows_inserted = 0
+    while True:
+        try:
+            batch = list(islice(rows, batch_size))
+        except ValueError as error:
+            if not rows_read:
+                raise ValueError(f"{error}, nothing was imported") from None
+            raise ValueError(
+                f"{error}, only the {rows_inserted} rows of the lines before it were imported"
+            ) from None
+        if not batch:
+            break
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            with around_batch(connection) if around_batch else nullcontext():
+                cursor = connection.executemany(statement, batch)
+        rows_read += len(batch)
+        rows_inserted += cursor.rowcount
+    return rows_read, rows_inserted
+
+
+@contextmanager
+def suspend_search_indexing(connection: sqlite3.Connection) -> Iterator[None]:
+    """This function will index the tasks inserted within the "with" block in
+    one go instead of letting the insert trigger index them row by row.
+    (See migrations.add_task_search)
+
+    FTS5 is several times faster at indexing many rows in one statement.
+    The trigger is dropped and re-created in the same transaction, so no
+    other connection ever sees the table without it.
+    """
+
+    (trigger_sql,) = connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = 'Tasks_search_insert'"
+    ).fetchone()
+    (last_task_ID,) = connection.execute("SELECT COALESCE(MAX(task_ID), 0) FROM Tasks").fetchone()
+
+    connection.execute("DROP TRIGGER Tasks_search_insert")
+    yield
+    connection.execute(
+        """INSERT INTO TasksSearch(rowid, task_title)
+        SELECT task_ID, task_title FROM Tasks WHERE task_ID > ?""",
+        (last_task_ID,),
+    )
+    connection.execute(trigger_sql)
+
+
+@contextmanager
+def suspend_change_logging(connection: sqlite3.Connection, table: str) -> Iterator[None]:
+    """This function will log the records inserted within the "with" block
+    for the sync in one statement instead of one trigger run per row.
+    (See migrations.add_sync_change_log)
+
+    It works the same way as suspend_search_indexing.
+    """
+
+    trigger_name = f"{table}_sync_insert"
+    (trigger_sql,) = connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = ?", (trigger_name,)
+    ).fetchone()
+    (last_ID,) = connection.execute(
+        f"SELECT COALESCE(MAX({SYNCED_TABLES[table]}), 0) FROM {table}"
+    ).fetchone()
+
+    connection.execute(f"DROP TRIGGER {trigger_name}")
+    yield
+    log_inserted_records(connection, table, last_ID)
+    connection.execute(trigger_sql)
+
+
+@contextmanager
+def suspend_task_triggers(connection: sqlite3.Connection) -> Iterator[None]:
+    """This function will suspend both insert triggers of the tasks."""
+
+    with suspend_search_indexing(connection), suspend_change_logging(connection, "Tasks"):
+        yield
+
+
+def import_tasks(
+    file: TextIO, file_format: str, database: Database = None, batch_size: int = BATCH_SIZE
+) -> TransferReport:
+    """This function will add every task of a CSV or JSON Lines file."""
+
+    started_at = time.perf_counter()
+
+    def clean_task(task_title: str, task_date: str) -> tuple[str, str]:
+        return task_title, clean_date(task_date)
+
+    rows_read, rows_inserted = insert_batches(
+        database or get_database(),
+        "INSERT INTO Tasks(task_title, task_date) VALUES(?, ?)",
+        read_rows(file, file_format, TASK_COLUMNS, clean_task),
+        batch_size,
+        around_batch=suspend_task_triggers,
+    )
+    return TransferReport(rows_read, rows_inserted, time.perf_counter() - started_at)
+
+
+def import_weights(
+    file: TextIO, file_format: str, database: Database = None, batch_size: int = BATCH_SIZE
+) -> TransferReport:
+    """This function will add every weight of a CSV or JSON Lines file whose
+    date doesn't have a weight yet. Values in lb are saved as KG.
+    """
+
+    started_at = time.perf_counter()
+
+    def clean_weight(weight_value: str, weight_unit: str, weight_date: str) -> tuple:
+        weight_value = float(weight_value)
+        if weight_unit not in WEIGHT_UNITS:
+            raise ValueError(f"unknown weight unit {weight_unit!r} (use KG or lb)")
+        if weight_unit == "lb":
+            weight_value = round(weight_value * KG_PER_LB, 2)
+        weight_date = clean_date(weight_date)
+        # The date is passed twice, the second one is for the duplicate check.
+        return weight_value, weight_date, weight_date
+
+    # The date lookup goes through the date index, rows inserted earlier in -
+    # the same batch are seen as well since executemany runs them in order.
+    rows_read, rows_inserted = insert_batches(
+        database or get_database(),
+        """INSERT INTO Weights(weight_value, weight_unit, weight_date)
+        SELECT ?, 'KG', ? WHERE NOT EXISTS (SELECT 1 FROM Weights WHERE weight_date = ?)""",
+        read_rows(file, file_format, WEIGHT_COLUMNS, clean_weight),
+        batch_size,
+        around_batch=lambda connection: suspend_change_logging(connection, "Weights"),
+    )
+    return TransferReport(rows_read, rows_inserted, time.perf_counter() - started_at)
+
+
+def export_tasks(file: TextIO, file_format: str, database: Database = None) -> TransferReport:
+    """This function will write every active task to a file, ordered by date."""
+
+    started_at = time.perf_counter()
+    # The cursor hands out the rows one by one while they are written.
+    cursor = (database or get_database()).connection.execute(
+        """SELECT task_title, task_date FROM Tasks WHERE task_completed_at IS NULL
+        ORDER BY task_date, task_ID"""
+    )
+    count = write_rows(file, file_format, TASK_COLUMNS, cursor)
+    return TransferReport(count, count, time.perf_counter() - started_at)
+
+
+def export_weights(file: TextIO, file_format: str, database: Database = None) -> TransferReport:
+    """This function will write every weight (in KG) to a file, ordered by date."""
+
+    started_at = time.perf_counter()
+    cursor = (database or get_database()).connection.execute(
+        "SELECT weight_value, weight_unit, weight_date FROM Weights ORDER BY weight_date, weight_ID"
+    )
+    count = write_rows(file, file_format, WEIGHT_COLUMNS, cursor)
+    return TransferReport(count, count, time.perf_counter() - started_at)
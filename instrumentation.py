@@ -0,0 +1,272 @@
+import atexit
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from os import environ
+from typing import Callable, Iterator
+
+"""This file contains the instrumentation of the app.
+
+Every statement sent to SQLite goes through TimedConnection (see store.py),
+which records how often it ran and how long it took. UI work which is worth
+watching (loading a date, building a tab, painting the chart...) is timed
+with @timed(). Everything ends up in one Instrumentation object which the
+Help -> Diagnostics dialog shows and which can be dumped as JSON.
+
+Environment variables:
+    TASKMAN_SLOW_QUERY_MS   Statements slower than this are logged (default 50)
+    TASKMAN_PROFILE         A file to write cProfile statistics to on exit
+    TASKMAN_TRACEMALLOC     Set to 1 to trace memory allocations
+    TASKMAN_DIAGNOSTICS     A file to write the JSON dump to on exit
+
+A statement is timed until it returns its first row, which is where SQLite
+does the searching, sorting and grouping. Rows read after that aren't counted.
+"""
+
+# How many characters of a slow statement are logged.
+SLOW_QUERY_LOG_LENGTH = 80
+# A statement that keeps being slow (e.g. every batch of an import) is only -
+# logged once within this many seconds.
+SLOW_QUERY_LOG_INTERVAL = 10.0
+
+
+class Timing:
+    # __slots__ keeps recording cheap, this runs for every single statement.
+    __slots__ = ("count", "total", "maximum")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def as_dict(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 3),
+            "average_ms": round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            "max_ms": round(self.maximum * 1000, 3),
+        }
+
+
+class Instrumentation:
+    def __init__(self, slow_query_ms: float = None) -> None:
+        """This initializer will create empty counters."""
+
+        if slow_query_ms is None:
+            slow_query_ms = float(environ.get("TASKMAN_SLOW_QUERY_MS", 50))
+        self.SLOW_QUERY_SECONDS = slow_query_ms / 1000
+
+        # Statements are recorded from the worker threads as well.
+        self._lock = threading.Lock()
+        self.statements: dict[str, Timing] = {}
+        self.operations: dict[str, Timing] = {}
+        self.slow_queries = 0
+        # When every slow statement was last logged and how often it was -
+        # slow since then.
+        self._slow_logged: dict[str, tuple[float, int]] = {}
+
+        # Functions returning more counters for the dump, e.g. cache stats.
+        self.sources: dict[str, Callable[[], dict]] = {}
+        self.started_at = time.time()
+
+    def record_statement(self, sql: str, seconds: float) -> None:
+        """This function will count one run of an SQL statement."""
+
+        with self._lock:
+            timing = self.statements.get(sql)
+            if timing is None:
+                timing = self.statements[sql] = Timing()
+            timing.add(seconds)
+            if seconds < self.SLOW_QUERY_SECONDS:
+                return
+            self.slow_queries += 1
+
+            now = time.monotonic()
+            logged_at, repeats = self._slow_logged.get(sql, (None, 0))
+            if logged_at is not None and now - logged_at < SLOW_QUERY_LOG_INTERVAL:
+                self._slow_logged[sql] = (logged_at, repeats + 1)
+                return
+            self._slow_logged[sql] = (now, 0)
+
+        # Only imported once there is something to log, the CLI starts -
+        # faster without it.
+        import logging
+
+        statement = " ".join(sql.split())
+        if len(statement) > SLOW_QUERY_LOG_LENGTH:
+            statement = statement[:SLOW_QUERY_LOG_LENGTH] + "..."
+        message = "Slow query (%.1f ms): %s"
+        if repeats:
+            message += f" (slow {repeats} more times since it was last logged)"
+        logging.getLogger("taskman.slow_queries").warning(message, seconds * 1000, statement)
+
+    def record_operation(self, name: str, seconds: float) -> None:
+        """This function will count one run of a timed UI operation."""
+
+        with self._lock:
+            timing = self.operations.get(name)
+            if timing is None:
+                timing = self.operations[name] = Timing()
+            timing.add(seconds)
+
+    def add_source(self, name: str, source: Callable[[], dict]) -> None:
+        """This function will include the counters returned by "source" in
+        every snapshot, e.g. the hit rate of the task cache.
+        """
+
+        self.sources[name] = source
+
+    def snapshot(self) -> dict:
+        """This function will return every counter in a JSON friendly dict.
+        Statements and operations are sorted by their total time.
+        """
+
+        with self._lock:
+            statements = [
+                {"sql": " ".join(sql.split()), **timing.as_dict()}
+                for sql, timing in self.statements.items()
+            ]
+            operations = [
+                {"name": name, **timing.as_dict()} for name, timing in self.operations.items()
+            ]
+        statements.sort(key=lambda statement: statement["total_ms"], reverse=True)
+        operations.sort(key=lambda operation: operation["total_ms"], reverse=True)
+
+        snapshot = {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "slow_query_ms": self.SLOW_QUERY_SECONDS * 1000,
+            "slow_queries": self.slow_queries,
+            "statements": statements,
+            "operations": operations,
+        }
+        for name, source in self.sources.items():
+            snapshot[name] = source()
+
+        memory = tracemalloc_snapshot()
+        if memory is not None:
+            snapshot["memory"] = memory
+        return snapshot
+
+    def dump(self, path: str) -> None:
+        """This function will write a snapshot to a JSON file."""
+
+        import json
+
+        with open(path, "w", encoding="utf-8") as dump_file:
+            json.dump(self.snapshot(), dump_file, indent=2)
+
+
+# The instrumentation the whole app shares.
+_instrumentation = Instrumentation()
+
+
+def get_instrumentation() -> Instrumentation:
+    """This function will return the shared Instrumentation object."""
+
+    return _instrumentation
+
+
+class TimedConnection(sqlite3.Connection):
+    """A sqlite3 connection which times every statement it runs.
+    It is passed as the "factory" of sqlite3.connect().
+    """
+
+    def execute(self, sql: str, parameters: object = (), /) -> sqlite3.Cursor:
+        started_at = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _instrumentation.record_statement(sql, time.perf_counter() - started_at)
+
+    def executemany(self, sql: str, parameters: object, /) -> sqlite3.Cursor:
+        started_at = time.perf_counter()
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            _instrumentation.record_statement(sql, time.perf_counter() - started_at)
+
+
+@contextmanager
+def timing(name: str) -> Iterator[None]:
+    """This function will time the code in a "with" block."""
+
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        _instrumentation.record_operation(name, time.perf_counter() - started_at)
+
+
+def timed(name: str) -> Callable:
+    """This decorator will time every call of a function."""
+
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def timed_function(*args: object, **kwargs: object) -> object:
+            started_at = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _instrumentation.record_operation(name, time.perf_counter() - started_at)
+
+        return timed_function
+
+    return decorator
+
+
+def tracemalloc_snapshot(top: int = 10) -> dict | None:
+    """This function will return the current and peak traced memory and the
+    lines which allocated the most, if tracemalloc is running.
+    """
+
+    import tracemalloc
+
+    if not tracemalloc.is_tracing():
+        return None
+
+    current, peak = tracemalloc.get_traced_memory()
+    statistics = tracemalloc.take_snapshot().statistics("lineno")[:top]
+    return {
+        "current_kib": round(current / 1024),
+        "peak_kib": round(peak / 1024),
+        "top_allocations": [
+            {"where": str(statistic.traceback), "kib": round(statistic.size / 1024)}
+            for statistic in statistics
+        ],
+    }
+
+
+def start_from_environment() -> None:
+    """This function will start the profilers and the JSON dump on exit that
+    were asked for through the environment variables.
+    """
+
+    if environ.get("TASKMAN_TRACEMALLOC", "") not in ("", "0"):
+        import tracemalloc
+
+        tracemalloc.start()
+
+    profile_path = environ.get("TASKMAN_PROFILE")
+    if profile_path:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+        def save_profile() -> None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+
+        atexit.register(save_profile)
+
+    diagnostics_path = environ.get("TASKMAN_DIAGNOSTICS")
+    if diagnostics_path:
+        atexit.register(_instrumentation.dump, diagnostics_path)
@@ -0,0 +1,510 @@
+import sqlite3
+from datetime import datetime
+
+"""This file contains the schema migrations of the database.
+
+Every migration is a function that upgrades the schema by exactly one version.
+The version a database is currently on is kept in "PRAGMA user_version" so
+existing databases are upgraded in place the next time the app opens them.
+
+New migrations must only ever be appended to the MIGRATIONS list.
+"""
+
+
+def to_iso_date(date: str) -> str:
+    """This function will convert a date that was saved by older versions of
+    the app (Qt.RFC2822Date, e.g. "18 Oct 2023") to an ISO date ("2023-10-18").
+
+    Dates which are already in the ISO format are returned untouched.
+    """
+
+    # RFC 2822 dates may start with the name of the day. ("Wed, 18 Oct 2023")
+    date = date.split(",")[-1].strip()
+    try:
+        return datetime.strptime(date, "%d %b %Y").date().isoformat()
+    except ValueError:
+        return date
+
+
+def create_legacy_tables(connection: sqlite3.Connection) -> None:
+    """Version 1: the original "Tasks" and "Weights" tables."""
+
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS Tasks(task_ID Integer, task_title TEXT, task_date TEXT)"
+    )
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS Weights(weight_ID Integer, weight_value REAL, weight_unit TEXT, weight_date TEXT)"
+    )
+
+
+def add_primary_keys_and_iso_dates(connection: sqlite3.Connection) -> None:
+    """Version 2: real primary keys, ISO dates and indexes on the dates.
+
+    Task IDs used to start from 1 again on every date, so they are re-numbered
+    here to become unique across the whole table.
+    """
+
+    connection.create_function("to_iso_date", 1, to_iso_date, deterministic=True)
+
+    connection.execute("ALTER TABLE Tasks RENAME TO Tasks_v1")
+    connection.execute(
+        "CREATE TABLE Tasks(task_ID INTEGER PRIMARY KEY, task_title TEXT NOT NULL, task_date TEXT NOT NULL)"
+    )
+    connection.execute(
+        """INSERT INTO Tasks(task_title, task_date)
+        SELECT task_title, to_iso_date(task_date) FROM Tasks_v1
+        ORDER BY to_iso_date(task_date), task_ID"""
+    )
+    connection.execute("DROP TABLE Tasks_v1")
+    # Covers the per-date query of the tasks list without touching the table.
+    connection.execute(
+        "CREATE INDEX Tasks_date_ID ON Tasks(task_date, task_ID, task_title)"
+    )
+
+    connection.execute("ALTER TABLE Weights RENAME TO Weights_v1")
+    connection.execute(
+        "CREATE TABLE Weights(weight_ID INTEGER PRIMARY KEY, weight_value REAL NOT NULL, weight_unit TEXT NOT NULL, weight_date TEXT NOT NULL)"
+    )
+    connection.execute(
+        """INSERT INTO Weights(weight_value, weight_unit, weight_date)
+        SELECT weight_value, weight_unit, to_iso_date(weight_date) FROM Weights_v1
+        ORDER BY weight_ID"""
+    )
+    connection.execute("DROP TABLE Weights_v1")
+    connection.execute("CREATE INDEX Weights_date ON Weights(weight_date, weight_value)")
+
+
+def use_autoincrement_IDs(connection: sqlite3.Connection) -> None:
+    """Version 3: let SQLite hand out the IDs of new records.
+
+    AUTOINCREMENT makes sure an ID is never handed out twice, not even after
+    the record that had the highest ID has been removed.
+    """
+
+    connection.execute("ALTER TABLE Tasks RENAME TO Tasks_v2")
+    connection.execute("DROP INDEX Tasks_date_ID")
+    connection.execute(
+        "CREATE TABLE Tasks(task_ID INTEGER PRIMARY KEY AUTOINCREMENT, task_title TEXT NOT NULL, task_date TEXT NOT NULL)"
+    )
+    connection.execute("INSERT INTO Tasks SELECT * FROM Tasks_v2")
+    connection.execute("DROP TABLE Tasks_v2")
+    connection.execute(
+        "CREATE INDEX Tasks_date_ID ON Tasks(task_date, task_ID, task_title)"
+    )
+
+    connection.execute("ALTER TABLE Weights RENAME TO Weights_v2")
+    connection.execute("DROP INDEX Weights_date")
+    connection.execute(
+        "CREATE TABLE Weights(weight_ID INTEGER PRIMARY KEY AUTOINCREMENT, weight_value REAL NOT NULL, weight_unit TEXT NOT NULL, weight_date TEXT NOT NULL)"
+    )
+    connection.execute("INSERT INTO Weights SELECT * FROM Weights_v2")
+    connection.execute("DROP TABLE Weights_v2")
+    connection.execute("CREATE INDEX Weights_date ON Weights(weight_date, weight_value)")
+
+
+def add_weight_summary(connection: sqlite3.Connection) -> None:
+    """Version 4: a summary of the weight history kept up to date by triggers.
+
+    Saving a weight updates the running totals (count, sum, min/max, first and
+    last weight by date) in place and re-averages only the last 7/30 days
+    through the date index, so reading the statistics never scans the history.
+    Removing or changing a weight is rare, those re-calculate everything.
+    """
+
+    connection.execute(
+        """CREATE TABLE WeightSummary(
+            summary_ID INTEGER PRIMARY KEY CHECK (summary_ID = 1),
+            entry_count INTEGER NOT NULL DEFAULT 0,
+            value_sum REAL NOT NULL DEFAULT 0,
+            min_value REAL,
+            max_value REAL,
+            first_date TEXT,
+            first_value REAL,
+            last_date TEXT,
+            last_value REAL,
+            moving_average_7 REAL,
+            moving_average_30 REAL
+        )"""
+    )
+    connection.execute("INSERT INTO WeightSummary(summary_ID) VALUES(1)")
+
+    update_moving_averages = """
+        UPDATE WeightSummary SET
+            moving_average_7 = (
+                SELECT AVG(weight_value) FROM Weights
+                WHERE weight_date BETWEEN date(WeightSummary.last_date, '-6 days')
+                AND WeightSummary.last_date
+            ),
+            moving_average_30 = (
+                SELECT AVG(weight_value) FROM Weights
+                WHERE weight_date BETWEEN date(WeightSummary.last_date, '-29 days')
+                AND WeightSummary.last_date
+            )
+        WHERE summary_ID = 1;
+    """
+    recalculate_summary = (
+        """
+        UPDATE WeightSummary SET
+            entry_count = (SELECT COUNT(*) FROM Weights),
+            value_sum = (SELECT TOTAL(weight_value) FROM Weights),
+            min_value = (SELECT MIN(weight_value) FROM Weights),
+            max_value = (SELECT MAX(weight_value) FROM Weights),
+            first_date = (SELECT weight_date FROM Weights ORDER BY weight_date, weight_ID LIMIT 1),
+            first_value = (SELECT weight_value FROM Weights ORDER BY weight_date, weight_ID LIMIT 1),
+            last_date = (SELECT weight_date FROM Weights ORDER BY weight_date DESC, weight_ID DESC LIMIT 1),
+            last_value = (SELECT weight_value FROM Weights ORDER BY weight_date DESC, weight_ID DESC LIMIT 1)
+        WHERE summary_ID = 1;
+        """
+        + update_moving_averages
+    )
+
+    # In an UPDATE every expression still sees the values from before it.
+    connection.execute(
+        f"""CREATE TRIGGER Weights_summary_insert AFTER INSERT ON Weights BEGIN
+            UPDATE WeightSummary SET
+                entry_count = entry_count + 1,
+                value_sum = value_sum + NEW.weight_value,
+                min_value = MIN(COALESCE(min_value, NEW.weight_value), NEW.weight_value),
+                max_value = MAX(COALESCE(max_value, NEW.weight_value), NEW.weight_value),
+                first_date = CASE WHEN first_date IS NULL OR NEW.weight_date < first_date
+                    THEN NEW.weight_date ELSE first_date END,
+                first_value = CASE WHEN first_date IS NULL OR NEW.weight_date < first_date
+                    THEN NEW.weight_value ELSE first_value END,
+                last_date = CASE WHEN last_date IS NULL OR NEW.weight_date >= last_date
+                    THEN NEW.weight_date ELSE last_date END,
+                last_value = CASE WHEN last_date IS NULL OR NEW.weight_date >= last_date
+                    THEN NEW.weight_value ELSE last_value END
+            WHERE summary_ID = 1;
+            {update_moving_averages}
+        END"""
+    )
+    connection.execute(
+        f"""CREATE TRIGGER Weights_summary_delete AFTER DELETE ON Weights BEGIN
+            {recalculate_summary}
+        END"""
+    )
+    connection.execute(
+        f"""CREATE TRIGGER Weights_summary_update AFTER UPDATE ON Weights BEGIN
+            {recalculate_summary}
+        END"""
+    )
+
+    # Summarize the weights which were saved before this version.
+    for statement in recalculate_summary.split(";"):
+        if statement.strip():
+            connection.execute(statement)
+
+
+def add_task_search(connection: sqlite3.Connection) -> None:
+    """Version 5: a full-text index over the task titles.
+
+    The FTS5 table only holds the index, the titles themselves are read from
+    Tasks (external content) and triggers keep both in sync. The prefix
+    indexes (up to 4 letters) make search-as-you-type queries ("mil*") as
+    cheap as whole words.
+    """
+
+    connection.execute(
+        """CREATE VIRTUAL TABLE TasksSearch USING fts5(
+            task_title,
+            content = 'Tasks',
+            content_rowid = 'task_ID',
+            tokenize = 'unicode61 remove_diacritics 2',
+            prefix = '1 2 3 4'
+        )"""
+    )
+
+    # External content tables are told about removed rows with the special -
+    # 'delete' command and the old values, which is also how updates work.
+    connection.execute(
+        """CREATE TRIGGER Tasks_search_insert AFTER INSERT ON Tasks BEGIN
+            INSERT INTO TasksSearch(rowid, task_title) VALUES(NEW.task_ID, NEW.task_title);
+        END"""
+    )
+    connection.execute(
+        """CREATE TRIGGER Tasks_search_delete AFTER DELETE ON Tasks BEGIN
+            INSERT INTO TasksSearch(TasksSearch, rowid, task_title)
+            VALUES('delete', OLD.task_ID, OLD.task_title);
+        END"""
+    )
+    connection.execute(
+        """CREATE TRIGGER Tasks_search_update AFTER UPDATE OF task_title ON Tasks BEGIN
+            INSERT INTO TasksSearch(TasksSearch, rowid, task_title)
+            VALUES('delete', OLD.task_ID, OLD.task_title);
+            INSERT INTO TasksSearch(rowid, task_title) VALUES(NEW.task_ID, NEW.task_title);
+        END"""
+    )
+
+    # Index the tasks which were saved before this version.
+    connection.execute("INSERT INTO TasksSearch(TasksSearch) VALUES('rebuild')")
+
+
+def add_recurring_tasks(connection: sqlite3.Connection) -> None:
+    """Version 6: tasks which repeat on a schedule.
+
+    A recurring task is saved once, as a rule, and is only turned into tasks
+    for the dates the user looks at. Completing one occurrence saves an
+    exception for its date, so nothing is ever saved per future date.
+    """
+
+    connection.execute(
+        """CREATE TABLE Recurrences(
+            recurrence_ID INTEGER PRIMARY KEY AUTOINCREMENT,
+            recurrence_title TEXT NOT NULL,
+            recurrence_rule TEXT NOT NULL
+                CHECK (recurrence_rule IN ('daily', 'weekdays', 'weekly', 'monthly', 'every_n_days')),
+            recurrence_interval INTEGER NOT NULL DEFAULT 1 CHECK (recurrence_interval > 0),
+            start_date TEXT NOT NULL,
+            end_date TEXT
+        )"""
+    )
+    # The dates on which an occurrence has been completed.
+    connection.execute(
+        """CREATE TABLE RecurrenceExceptions(
+            recurrence_ID INTEGER NOT NULL REFERENCES Recurrences,
+            exception_date TEXT NOT NULL,
+            PRIMARY KEY (recurrence_ID, exception_date)
+        ) WITHOUT ROWID"""
+    )
+
+
+def add_task_completions(connection: sqlite3.Connection) -> None:
+    """Version 7: completed tasks are kept (with the time they were completed)
+    instead of being removed.
+
+    The date index of the tasks list becomes a partial index over the active
+    tasks only, so loading a date costs the same no matter how many completed
+    tasks have piled up. Completed tasks get their own partial index which the
+    History view pages through. Completing an occurrence of a recurring task
+    saves a completed task (with its recurrence_ID) for the history as well.
+
+    Only active tasks are kept in the search index. Note that the FTS5
+    'rebuild' command would index every row of Tasks again.
+    """
+
+    connection.execute("ALTER TABLE Tasks ADD COLUMN task_completed_at TEXT")
+    connection.execute("ALTER TABLE Tasks ADD COLUMN recurrence_ID INTEGER REFERENCES Recurrences")
+
+    # task_completed_at is always NULL in there, but without it SQLite would -
+    # still read the table to check the WHERE clause of the tasks list query.
+    connection.execute("DROP INDEX Tasks_date_ID")
+    connection.execute(
+        """CREATE INDEX Tasks_active_date ON Tasks(task_date, task_ID, task_title, task_completed_at)
+        WHERE task_completed_at IS NULL"""
+    )
+    connection.execute(
+        """CREATE INDEX Tasks_completed_at
+        ON Tasks(task_completed_at, task_ID, task_title, task_date, recurrence_ID)
+        WHERE task_completed_at IS NOT NULL"""
+    )
+
+    # The search triggers of version 5 now skip completed tasks.
+    connection.execute("DROP TRIGGER Tasks_search_insert")
+    connection.execute("DROP TRIGGER Tasks_search_delete")
+    connection.execute("DROP TRIGGER Tasks_search_update")
+    connection.execute(
+        """CREATE TRIGGER Tasks_search_insert AFTER INSERT ON Tasks
+        WHEN NEW.task_completed_at IS NULL BEGIN
+            INSERT INTO TasksSearch(rowid, task_title) VALUES(NEW.task_ID, NEW.task_title);
+        END"""
+    )
+    connection.execute(
+        """CREATE TRIGGER Tasks_search_delete AFTER DELETE ON Tasks
+        WHEN OLD.task_completed_at IS NULL BEGIN
+            INSERT INTO TasksSearch(TasksSearch, rowid, task_title)
+            VALUES('delete', OLD.task_ID, OLD.task_title);
+        END"""
+    )
+    connection.execute(
+        """CREATE TRIGGER Tasks_search_update AFTER UPDATE OF task_title ON Tasks
+        WHEN OLD.task_completed_at IS NULL AND NEW.task_completed_at IS NULL BEGIN
+            INSERT INTO TasksSearch(TasksSearch, rowid, task_title)
+            VALUES('delete', OLD.task_ID, OLD.task_title);
+            INSERT INTO TasksSearch(rowid, task_title) VALUES(NEW.task_ID, NEW.task_title);
+        END"""
+    )
+    # Completing a task takes it out of the index, un-completing puts it back.
+    connection.execute(
+        """CREATE TRIGGER Tasks_search_complete AFTER UPDATE OF task_completed_at ON Tasks
+        WHEN (OLD.task_completed_at IS NULL) != (NEW.task_completed_at IS NULL) BEGIN
+            INSERT INTO TasksSearch(TasksSearch, rowid, task_title)
+            SELECT 'delete', OLD.task_ID, OLD.task_title WHERE NEW.task_completed_at IS NOT NULL;
+            INSERT INTO TasksSearch(rowid, task_title)
+            SELECT NEW.task_ID, NEW.task_title WHERE NEW.task_completed_at IS NULL;
+        END"""
+    )
+
+
+# The tables which are synced between devices and their ID columns.
+SYNCED_TABLES = {"Tasks": "task_ID", "Weights": "weight_ID"}
+# The rows of a synced table which are not synced, {row} is the table or -
+# NEW/OLD in a trigger. Completed occurrences of recurring tasks are saved in
+# Tasks, but recurrences aren't synced.
+UNSYNCED_ROWS = {"Tasks": "{row}.recurrence_ID IS NOT NULL", "Weights": "0"}
+
+# A new record uid: the time in ms (hex) followed by 10 random bytes.
+# Uids of new records sort after older ones, so they are appended to the end
+# of the SyncRecords index instead of landing on a random page of it.
+NEW_RECORD_UID = """printf('%012x', CAST((julianday('now') - 2440587.5) * 86400000 AS INTEGER))
+    || lower(hex(randomblob(10)))"""
+
+
+def log_inserted_records(connection: sqlite3.Connection, table: str, after_ID: int) -> None:
+    """This function will log every record of a synced table whose ID is
+    greater than after_ID as inserted by this device, in one statement.
+    (See add_sync_change_log, also used by the imports in import_export.py)
+    """
+
+    ID_column = SYNCED_TABLES[table]
+    cursor = connection.execute(
+        f"""INSERT INTO SyncRecords(record_uid, table_name, local_ID, device_ID, change_seq, changed_at)
+        SELECT {NEW_RECORD_UID}, '{table}', {ID_column},
+            (SELECT value FROM SyncState WHERE name = 'device_ID'),
+            (SELECT value FROM SyncState WHERE name = 'last_seq')
+                + row_number() OVER (ORDER BY {ID_column}),
+            strftime('%Y-%m-%dT%H:%M:%fZ', 'now')
+        FROM {table} WHERE {ID_column} > ? AND NOT ({UNSYNCED_ROWS[table].format(row=table)})""",
+        (after_ID,),
+    )
+    connection.execute(
+        "UPDATE SyncState SET value = value + ? WHERE name = 'last_seq'", (cursor.rowcount,)
+    )
+
+
+def add_sync_change_log(connection: sqlite3.Connection) -> None:
+    """Version 8: a change log for syncing tasks and weights between devices.
+
+    Every task and weight gets a row in SyncRecords with a random uid that is
+    the same on every device, the device which changed it last, that device's
+    sequence number of the change and when it happened. Triggers keep it up
+    to date, removed records stay in there (deleted = 1) so the removal can
+    be synced as well. (See sync.py)
+
+    Every database gets its own device_ID here, the next sequence number of
+    the device is kept in SyncState. Changes applied by a sync are not logged
+    again, sync.py marks them with an 'applying' row in SyncState which only
+    ever exists within its own transaction.
+    """
+
+    connection.execute(
+        """CREATE TABLE SyncState(
+            name TEXT PRIMARY KEY,
+            value
+        ) WITHOUT ROWID"""
+    )
+    connection.execute(
+        """INSERT INTO SyncState(name, value) VALUES
+            ('device_ID', lower(hex(randomblob(16)))),
+            ('last_seq', 0),
+            ('exported_seq', 0)"""
+    )
+    connection.execute(
+        """CREATE TABLE SyncRecords(
+            record_uid TEXT PRIMARY KEY,
+            table_name TEXT NOT NULL,
+            local_ID INTEGER,
+            device_ID TEXT NOT NULL,
+            change_seq INTEGER NOT NULL,
+            changed_at TEXT NOT NULL,
+            deleted INTEGER NOT NULL DEFAULT 0
+        ) WITHOUT ROWID"""
+    )
+    # The triggers find a record by its local ID, the export by sequence.
+    # local_ID is NULL for a removal synced from a device where the record -
+    # was created and removed before this device ever saw it.
+    connection.execute("CREATE UNIQUE INDEX SyncRecords_local ON SyncRecords(table_name, local_ID)")
+    connection.execute("CREATE INDEX SyncRecords_device_seq ON SyncRecords(device_ID, change_seq)")
+    # How far the change log of every other device has been applied.
+    connection.execute(
+        """CREATE TABLE SyncPeers(
+            device_ID TEXT PRIMARY KEY,
+            last_seq INTEGER NOT NULL,
+            file_offset INTEGER NOT NULL
+        ) WITHOUT ROWID"""
+    )
+
+    # Change times are in UTC, the devices may be in different time zones.
+    next_change = """
+        UPDATE SyncState SET value = value + 1 WHERE name = 'last_seq';
+    """
+    device_ID = "(SELECT value FROM SyncState WHERE name = 'device_ID')"
+    last_seq = "(SELECT value FROM SyncState WHERE name = 'last_seq')"
+    now = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+    not_applying = "NOT EXISTS (SELECT 1 FROM SyncState WHERE name = 'applying')"
+
+    for table, ID_column in SYNCED_TABLES.items():
+        new_synced = f"{not_applying} AND NOT ({UNSYNCED_ROWS[table].format(row='NEW')})"
+        old_synced = f"{not_applying} AND NOT ({UNSYNCED_ROWS[table].format(row='OLD')})"
+
+        connection.execute(
+            f"""CREATE TRIGGER {table}_sync_insert AFTER INSERT ON {table}
+            WHEN {new_synced} BEGIN
+                {next_change}
+                INSERT INTO SyncRecords(record_uid, table_name, local_ID, device_ID, change_seq, changed_at)
+                VALUES({NEW_RECORD_UID}, '{table}', NEW.{ID_column}, {device_ID}, {last_seq}, {now});
+            END"""
+        )
+        connection.execute(
+            f"""CREATE TRIGGER {table}_sync_update AFTER UPDATE ON {table}
+            WHEN {new_synced} BEGIN
+                {next_change}
+                UPDATE SyncRecords SET device_ID = {device_ID}, change_seq = {last_seq}, changed_at = {now}
+                WHERE table_name = '{table}' AND local_ID = NEW.{ID_column};
+            END"""
+        )
+        connection.execute(
+            f"""CREATE TRIGGER {table}_sync_delete AFTER DELETE ON {table}
+            WHEN {old_synced} BEGIN
+                {next_change}
+                UPDATE SyncRecords SET device_ID = {device_ID}, change_seq = {last_seq}, changed_at = {now}, deleted = 1
+                WHERE table_name = '{table}' AND local_ID = OLD.{ID_column};
+            END"""
+        )
+
+        # Log the records which were saved before this version.
+        log_inserted_records(connection, table, 0)
+
+
+# The position of a migration in this list + 1 is the version it upgrades to.
+MIGRATIONS = [
+    create_legacy_tables,
+    add_primary_keys_and_iso_dates,
+    use_autoincrement_IDs,
+    add_weight_summary,
+    add_task_search,
+    add_recurring_tasks,
+    add_task_completions,
+    add_sync_change_log,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def get_schema_version(connection: sqlite3.Connection) -> int:
+    """This function will return the schema version of the database."""
+
+    (version,) = connection.execute("PRAGMA user_version").fetchone()
+    return version
+
+
+def migrate(connection: sqlite3.Connection) -> None:
+    """This function will run every migration the database hasn't seen yet.
+
+    Each migration runs in its own transaction together with the version bump,
+    so a crash half way through leaves the database on the previous version.
+    The version is checked again after taking the write lock in case another
+    TaskMan process has upgraded the database in the meantime.
+    """
+
+    if get_schema_version(connection) >= SCHEMA_VERSION:
+        return
+
+    for version, migration in enumerate(MIGRATIONS, start=1):
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            if get_schema_version(connection) >= version:
+                connection.execute("COMMIT")
+                continue
+            migration(connection)
+            # PRAGMA statements can not be parameterized.
+            connection.execute(f"PRAGMA user_version = {version}")
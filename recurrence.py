@@ -0,0 +1,44 @@
+from calendar import monthrange
+from datetime import date
+
+"""This file contains the rules of recurring tasks.
+
+A rule only answers one question: does the task happen on a given date?
+The store asks it for the dates the user actually looks at, so a task which
+repeats every day forever costs nothing for the dates nobody opens.
+"""
+
+# The rules and the names the UI shows for them.
+RULES = {
+    "daily": "Daily",
+    "weekdays": "Weekdays",
+    "weekly": "Weekly",
+    "monthly": "Monthly",
+    "every_n_days": "Every N days",
+}
+
+
+def occurs_on(rule: str, interval: int, start_date: str, day: str) -> bool:
+    """This function will check if a recurring task which starts on
+    "start_date" has an occurrence on "day". Dates are ISO dates.
+    """
+
+    start = date.fromisoformat(start_date)
+    current = date.fromisoformat(day)
+    if current < start:
+        return False
+
+    if rule == "daily":
+        return True
+    if rule == "weekdays":
+        # Monday is 0, Saturday & Sunday are 5 & 6.
+        return current.weekday() < 5
+    if rule == "weekly":
+        return (current - start).days % 7 == 0
+    if rule == "every_n_days":
+        return (current - start).days % interval == 0
+    if rule == "monthly":
+        # A task on the 31st happens on the last day of shorter months.
+        last_day = monthrange(current.year, current.month)[1]
+        return current.day == min(start.day, last_day)
+    raise ValueError(f"Unknown recurrence rule: {rule}")
@@ -0,0 +1,38 @@
+import time
+
+from PySide6.QtCore import QEvent, QObject
+from PySide6.QtWidgets import QApplication, QWidget
+
+"""This file contains the startup-time report of the app.
+
+Run the app with TASKMAN_STARTUP_REPORT=1 and it will print how long it took
+from the start of taskman.py until the main window was painted for the first
+time, and then exit. benchmarks/startup_time.py uses this to measure cold
+starts repeatedly.
+"""
+
+
+class FirstPaintReporter(QObject):
+    def __init__(self, app: QApplication, window: QWidget, started_at: float) -> None:
+        """This initializer will start watching the window for its first paint.
+        "started_at" is the time.perf_counter() value taken at the very top
+        of taskman.py.
+        """
+
+        # The window owns the reporter, so it lives as long as the window -
+        # without anyone holding on to it.
+        super().__init__(window)
+
+        self.APP = app
+        self.STARTED_AT = started_at
+        window.installEventFilter(self)
+
+    def eventFilter(self, watched: QObject, event: QEvent) -> bool:
+        if event.type() == QEvent.Paint:
+            elapsed = (time.perf_counter() - self.STARTED_AT) * 1000
+            print(f"time-to-first-paint: {elapsed:.1f} ms", flush=True)
+            watched.removeEventFilter(self)
+
+            # exit() leaves the event loop without asking for confirmation.
+            self.APP.exit(0)
+        return False
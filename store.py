@@ -0,0 +1,609 @@
+import itertools
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+from os import environ
+from typing import NamedTuple
+
+import migrations
+from instrumentation import TimedConnection
+from recurrence import occurs_on
+from weight_series import WeightSeries
+
+"""This file contains the data-access layer of the app.
+
+Every part of the app that needs to read or write the database goes through
+the stores in here instead of opening its own connection.
+The Database class owns one long-lived connection per thread and the stores
+(TaskStore & WeightStore) only use parameterized statements so that SQLite
+can re-use its prepared statements instead of parsing every query again.
+
+The Database class is the storage backend. Database keeps the data in a file
+and MemoryDatabase keeps it in memory only, which is handy for benchmarks and
+for trying things out. open_database() picks the backend for a location and
+the app opens the one in the TASKMAN_DB environment variable on startup.
+"""
+
+DB_PATH = "TaskMan.db"
+# The location open_database() turns into a MemoryDatabase.
+MEMORY_LOCATION = ":memory:"
+
+# Tuning applied to every new connection.
+# WAL lets readers keep reading while a write is being committed and
+# "synchronous = NORMAL" is safe in WAL mode while saving an fsync per commit.
+CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+    "PRAGMA busy_timeout = 5000",
+)
+
+# How many prepared statements each connection keeps around.
+STATEMENT_CACHE_SIZE = 256
+
+
+# How many results a task search returns at most.
+SEARCH_LIMIT = 100
+# How many of the newest matches are ranked to pick those results from.
+SEARCH_CANDIDATES = 1000
+
+
+def timestamp() -> str:
+    """This function will return the local time in the format completion
+    times are saved in. ("YYYY-MM-DD HH:MM:SS", so they sort as text)
+    """
+
+    return datetime.now().isoformat(sep=" ", timespec="seconds")
+
+
+def to_match_query(text: str) -> str:
+    """This function will turn what the user typed into an FTS5 query.
+    Every word is quoted, so characters like '"', '*' or '-' can't break the
+    query, and the last one is searched as a prefix.
+    """
+
+    words = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    if words:
+        words[-1] += "*"
+    return " ".join(words)
+
+
+class Task(NamedTuple):
+    task_ID: int | None
+    task_title: str
+    task_date: str
+    # Set (and task_ID is None) for an occurrence of a recurring task.
+    recurrence_ID: int | None = None
+
+    @property
+    def recurring(self) -> bool:
+        return self.recurrence_ID is not None
+
+
+class Completion(NamedTuple):
+    task_ID: int
+    task_title: str
+    task_date: str
+    task_completed_at: str
+    # Set if this was an occurrence of a recurring task.
+    recurrence_ID: int | None = None
+
+
+class Recurrence(NamedTuple):
+    recurrence_ID: int
+    recurrence_title: str
+    recurrence_rule: str
+    recurrence_interval: int
+    start_date: str
+
+
+class Weight(NamedTuple):
+    weight_ID: int
+    weight_value: float
+    weight_unit: str
+    weight_date: str
+
+
+class WeightSummary(NamedTuple):
+    entry_count: int
+    value_sum: float
+    min_value: float | None
+    max_value: float | None
+    first_date: str | None
+    first_value: float | None
+    last_date: str | None
+    last_value: float | None
+    moving_average_7: float | None
+    moving_average_30: float | None
+
+    @property
+    def total_change(self) -> float | None:
+        """The change from the first to the last weight (by date) in KG."""
+
+        if self.entry_count < 2:
+            return None
+        return self.last_value - self.first_value
+
+
+class Database:
+    def __init__(self, path: str = DB_PATH) -> None:
+        """This initializer will only remember where the database lives.
+        Connections are opened lazily the first time a thread needs one and
+        are then kept open for the lifetime of that thread.
+        """
+
+        self.PATH = path
+        self._local = threading.local()
+        self._migrated = False
+        self._migration_lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """This function will return the connection of the calling thread.
+        SQLite connections can not be shared between threads so each thread -
+        gets its own one, which is created once and re-used afterwards.
+        """
+
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self.open_connection()
+            self._local.connection = connection
+        return connection
+
+    def open_connection(self) -> sqlite3.Connection:
+        """This function will open and tune a brand new connection."""
+
+        connection = self.connect()
+        for pragma in CONNECTION_PRAGMAS:
+            connection.execute(pragma)
+
+        # The very first connection brings the schema up to date.
+        # This also creates the tables of a brand new database.
+        with self._migration_lock:
+            if not self._migrated:
+                migrations.migrate(connection)
+                self._migrated = True
+        return connection
+
+    def connect(self) -> sqlite3.Connection:
+        """This function will open a plain connection to the database file."""
+
+        # "isolation_level = None" puts the connection in autocommit mode.
+        # Writes that need more than one statement open their own transaction.
+        # TimedConnection records how long every statement takes.
+        return sqlite3.connect(
+            self.PATH,
+            isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            factory=TimedConnection,
+        )
+
+    def close(self) -> None:
+        """This function will close the connection of the calling thread."""
+
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self._local.connection = None
+
+
+class MemoryDatabase(Database):
+    # Every MemoryDatabase gets its own name, so they don't share their data.
+    _names = itertools.count(1)
+
+    def __init__(self) -> None:
+        """This initializer will create an empty database which only lives
+        in memory. Nothing is ever written to disk and the data is gone once
+        the program ends.
+        """
+
+        # The "memdb" VFS lets every connection (and so every thread) that -
+        # opens the same name see the same database, with the normal locking.
+        # (A plain ":memory:" database belongs to a single connection)
+        super().__init__(f"file:/taskman-{next(self._names)}?vfs=memdb")
+
+        # The database is dropped as soon as its last connection is closed, -
+        # this one is kept open so threads can come and go.
+        self.KEEP_ALIVE = self.connect()
+
+    def connect(self) -> sqlite3.Connection:
+        """This function will open a plain connection to the memory database."""
+
+        return sqlite3.connect(
+            self.PATH,
+            uri=True,
+            isolation_level=None,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            factory=TimedConnection,
+        )
+
+
+def open_database(location: str) -> Database:
+    """This function will return the backend for a location.
+    ":memory:" means a MemoryDatabase, anything else is the path of a file.
+    """
+
+    if location == MEMORY_LOCATION:
+        return MemoryDatabase()
+    return Database(location)
+
+
+# The database the whole app shares.
+_database = None
+_database_lock = threading.Lock()
+
+
+def get_database() -> Database:
+    """This function will return the shared Database object and create it
+    the first time it is asked for. It lives where the TASKMAN_DB environment
+    variable says, by default in TaskMan.db in the working directory.
+    """
+
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = open_database(environ.get("TASKMAN_DB") or DB_PATH)
+        return _database
+
+
+def set_database(database: Database) -> None:
+    """This function will make the whole app use the specified database.
+    Stores created after this call use it by default.
+    """
+
+    global _database
+    with _database_lock:
+        _database = database
+
+
+class TaskStore:
+    def __init__(self, database: Database = None) -> None:
+        """This initializer will bind the store to a database.
+        By default the shared database of the app is used.
+        """
+
+        self.DATABASE = database or get_database()
+
+    def get_tasks(self, date: str) -> list[Task]:
+        """This function will return all active tasks on the specified date.
+        The occurrences of recurring tasks come first.
+        """
+
+        # "task_completed_at IS NULL" has to be spelled out for SQLite to use -
+        # the partial index of the active tasks. (See migrations.py)
+        cursor = self.DATABASE.connection.execute(
+            """SELECT task_ID, task_title, task_date FROM Tasks
+            WHERE task_date = ? AND task_completed_at IS NULL ORDER BY task_ID""",
+            (date,),
+        )
+        return self.get_occurrences(date) + [Task(*row) for row in cursor]
+
+    def get_occurrences(self, date: str) -> list[Task]:
+        """This function will expand the recurring tasks for a single date.
+        Occurrences which have been completed on that date are left out.
+        """
+
+        # There are only ever a handful of rules, checking each of them in -
+        # Python is cheaper than any date math SQLite could do per row.
+        cursor = self.DATABASE.connection.execute(
+            """SELECT recurrence_ID, recurrence_title, recurrence_rule, recurrence_interval, start_date
+            FROM Recurrences
+            WHERE start_date <= ? AND (end_date IS NULL OR end_date >= ?)
+            AND NOT EXISTS (
+                SELECT 1 FROM RecurrenceExceptions
+                WHERE RecurrenceExceptions.recurrence_ID = Recurrences.recurrence_ID
+                AND exception_date = ?
+            )
+            ORDER BY recurrence_ID""",
+            (date, date, date),
+        )
+        return [
+            Task(None, recurrence.recurrence_title, date, recurrence.recurrence_ID)
+            for recurrence in map(Recurrence._make, cursor)
+            if occurs_on(
+                recurrence.recurrence_rule,
+                recurrence.recurrence_interval,
+                recurrence.start_date,
+                date,
+            )
+        ]
+
+    def get_task_counts(self, first_date: str, last_date: str) -> dict[str, int]:
+        """This function will return how many active tasks there are on every
+        date between two dates (both included). Dates without tasks are left out.
+        """
+
+        # One range query through the partial index of the active tasks, -
+        # SQLite counts the tasks of each date while it walks the index.
+        cursor = self.DATABASE.connection.execute(
+            """SELECT task_date, COUNT(*) FROM Tasks
+            WHERE task_date BETWEEN ? AND ? AND task_completed_at IS NULL
+            GROUP BY task_date""",
+            (first_date, last_date),
+        )
+        counts = dict(cursor.fetchall())
+
+        for occurrence in self.get_occurrences_between(first_date, last_date):
+            counts[occurrence.task_date] = counts.get(occurrence.task_date, 0) + 1
+        return counts
+
+    def get_tasks_between(self, first_date: str, last_date: str) -> list[Task]:
+        """This function will return all active tasks between two dates (both
+        included), ordered by date. On every date the occurrences of recurring
+        tasks come first, the same way as in get_tasks().
+        """
+
+        # A single range scan over the partial index of the active tasks, -
+        # which already hands out the rows in the right order.
+        cursor = self.DATABASE.connection.execute(
+            """SELECT task_ID, task_title, task_date FROM Tasks
+            WHERE task_date BETWEEN ? AND ? AND task_completed_at IS NULL
+            ORDER BY task_date, task_ID""",
+            (first_date, last_date),
+        )
+        tasks = [Task(*row) for row in cursor]
+
+        # sort() keeps the order within a date, the occurrences go first.
+        occurrences = self.get_occurrences_between(first_date, last_date)
+        if occurrences:
+            tasks = occurrences + tasks
+            tasks.sort(key=lambda task: task.task_date)
+        return tasks
+
+    def get_occurrences_between(self, first_date: str, last_date: str) -> list[Task]:
+        """This function will expand the recurring tasks for every date between
+        two dates (both included), ordered by date.
+        """
+
+        # The same as get_occurrences(), but with a single query for the -
+        # rules and one for the exceptions no matter how long the range is.
+        cursor = self.DATABASE.connection.execute(
+            """SELECT recurrence_ID, recurrence_title, recurrence_rule, recurrence_interval, start_date
+            FROM Recurrences WHERE start_date <= ? AND (end_date IS NULL OR end_date >= ?)
+            ORDER BY recurrence_ID""",
+            (last_date, first_date),
+        )
+        recurrences = [Recurrence._make(row) for row in cursor]
+        if not recurrences:
+            return []
+
+        exceptions = set(
+            self.DATABASE.connection.execute(
+                """SELECT recurrence_ID, exception_date FROM RecurrenceExceptions
+                WHERE exception_date BETWEEN ? AND ?""",
+                (first_date, last_date),
+            )
+        )
+        occurrences = []
+        day = date.fromisoformat(first_date)
+        last_day = date.fromisoformat(last_date)
+        while day <= last_day:
+            iso_date = day.isoformat()
+            for recurrence in recurrences:
+                if (recurrence.recurrence_ID, iso_date) in exceptions:
+                    continue
+                if occurs_on(
+                    recurrence.recurrence_rule,
+                    recurrence.recurrence_interval,
+                    recurrence.start_date,
+                    iso_date,
+                ):
+                    occurrences.append(
+                        Task(None, recurrence.recurrence_title, iso_date, recurrence.recurrence_ID)
+                    )
+            day += timedelta(days=1)
+        return occurrences
+
+    def add_recurrence(
+        self, task_title: str, rule: str, start_date: str, interval: int = 1
+    ) -> Recurrence:
+        """This function will save a task which repeats from the start date on.
+        (See recurrence.py for the rules)
+        """
+
+        cursor = self.DATABASE.connection.execute(
+            """INSERT INTO Recurrences(recurrence_title, recurrence_rule, recurrence_interval, start_date)
+            VALUES(?, ?, ?, ?) RETURNING recurrence_ID""",
+            (task_title, rule, interval, start_date),
+        )
+        ((recurrence_ID,),) = cursor.fetchall()
+        return Recurrence(recurrence_ID, task_title, rule, interval, start_date)
+
+    def add_task(self, task_title: str, task_date: str) -> Task:
+        """This function will save a new task on the specified date and
+        return it with its newly assigned ID.
+        Dates are ISO dates. ("YYYY-MM-DD")
+        """
+
+        # The ID is handed out by SQLite within the insert itself, so this takes
+        # the same time no matter how many tasks there are and two processes -
+        # writing to the same database can never end up with the same ID.
+        # All rows of RETURNING have to be fetched for the insert to finish.
+        cursor = self.DATABASE.connection.execute(
+            "INSERT INTO Tasks(task_title, task_date) VALUES(?, ?) RETURNING task_ID",
+            (task_title, task_date),
+        )
+        ((task_ID,),) = cursor.fetchall()
+        return Task(task_ID, task_title, task_date)
+
+    def search_tasks(self, text: str, limit: int = SEARCH_LIMIT) -> list[Task]:
+        """This function will return the tasks (of any date) whose titles
+        contain every word of the specified text, best matches first.
+        The last word may be incomplete, so results show up while typing.
+        """
+
+        query = to_match_query(text)
+        if not query:
+            return []
+
+        # "rank" is the bm25() score of FTS5, the lower the better.
+        # Scoring every match of a word that is in almost every title (or of -
+        # a single letter) would take seconds on a big database, so only the -
+        # newest SEARCH_CANDIDATES matches are scored. FTS5 can stop reading -
+        # the index early when it is walked by rowid with a LIMIT.
+        cursor = self.DATABASE.connection.execute(
+            """SELECT task_ID, task_title, task_date FROM (
+                SELECT rowid, rank FROM TasksSearch WHERE TasksSearch MATCH ?
+                ORDER BY rowid DESC LIMIT ?
+            ) AS Matches
+            JOIN Tasks ON task_ID = Matches.rowid
+            ORDER BY Matches.rank LIMIT ?""",
+            (query, SEARCH_CANDIDATES, limit),
+        )
+        return [Task(*row) for row in cursor.fetchmany(limit)]
+
+    def complete_occurrence(
+        self, recurrence_ID: int, date: str, completed_at: str = None
+    ) -> bool:
+        """This function will complete a recurring task on a single date.
+        The other dates of the recurring task are not affected.
+        The occurrence is saved as a completed task for the history.
+        It returns False if there is no such recurring task, if it doesn't
+        occur on that date or if it was completed on that date already.
+        """
+
+        # A savepoint works on its own as well as within the transaction -
+        # of the write queue or the CLI.
+        connection = self.DATABASE.connection
+        connection.execute("SAVEPOINT complete_occurrence")
+        try:
+            recurrence = connection.execute(
+                """SELECT recurrence_title, recurrence_rule, recurrence_interval, start_date, end_date
+                FROM Recurrences WHERE recurrence_ID = ?""",
+                (recurrence_ID,),
+            ).fetchone()
+            if recurrence is None:
+                return False
+            title, rule, interval, start_date, end_date = recurrence
+            if (end_date is not None and date > end_date) or not occurs_on(
+                rule, interval, start_date, date
+            ):
+                return False
+
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO RecurrenceExceptions(recurrence_ID, exception_date) VALUES(?, ?)",
+                (recurrence_ID, date),
+            )
+            # Nothing is saved twice if it was completed on this date before.
+            if cursor.rowcount == 0:
+                return False
+            connection.execute(
+                """INSERT INTO Tasks(task_title, task_date, recurrence_ID, task_completed_at)
+                VALUES(?, ?, ?, ?)""",
+                (title, date, recurrence_ID, completed_at or timestamp()),
+            )
+            return True
+        except BaseException:
+            connection.execute("ROLLBACK TO complete_occurrence")
+            raise
+        finally:
+            connection.execute("RELEASE complete_occurrence")
+
+    def complete_task(self, task_ID: int, completed_at: str = None) -> bool:
+        """This function will mark a task as completed. It stays in the
+        database for the history but isn't shown or found anymore.
+        It returns False if there was no active task with the specified ID.
+        """
+
+        cursor = self.DATABASE.connection.execute(
+            "UPDATE Tasks SET task_completed_at = ? WHERE task_ID = ? AND task_completed_at IS NULL",
+            (completed_at or timestamp(), task_ID),
+        )
+        return cursor.rowcount > 0
+
+    def get_completions(
+        self,
+        first_date: str,
+        last_date: str,
+        after: tuple[str, int] | None,
+        limit: int,
+    ) -> list[Completion]:
+        """This function will load one page of the tasks completed between
+        two dates (both included), most recently completed first.
+
+        "after" is the (task_completed_at, task_ID) of the last completion of
+        the previous page. (See WeightStore.get_page)
+        """
+
+        # Completion times start with their date, so every completion on the -
+        # last date sorts before that date followed by "~".
+        if after is None:
+            after = (last_date + "~", 0)
+        cursor = self.DATABASE.connection.execute(
+            """SELECT task_ID, task_title, task_date, task_completed_at, recurrence_ID FROM Tasks
+            WHERE task_completed_at IS NOT NULL
+            AND task_completed_at >= ? AND (task_completed_at, task_ID) < (?, ?)
+            ORDER BY task_completed_at DESC, task_ID DESC LIMIT ?""",
+            (first_date, *after, limit),
+        )
+        return [Completion(*row) for row in cursor.fetchmany(limit)]
+
+
+class WeightStore:
+    def __init__(self, database: Database = None) -> None:
+        """This initializer will bind the store to a database.
+        By default the shared database of the app is used.
+        """
+
+        self.DATABASE = database or get_database()
+
+    def add_weight(self, weight_value: float, weight_unit: str, weight_date: str) -> Weight:
+        """This function will save a new weight record and return it with its
+        newly assigned ID.
+        """
+
+        # Same as with tasks, SQLite hands out the ID within the insert.
+        cursor = self.DATABASE.connection.execute(
+            "INSERT INTO Weights(weight_value, weight_unit, weight_date) VALUES(?, ?, ?) RETURNING weight_ID",
+            (weight_value, weight_unit, weight_date),
+        )
+        ((weight_ID,),) = cursor.fetchall()
+        return Weight(weight_ID, weight_value, weight_unit, weight_date)
+
+    def get_series(self) -> WeightSeries:
+        """This function will load the whole weight history, oldest date
+        first, straight into compact arrays. (See weight_series.py)
+        """
+
+        cursor = self.DATABASE.connection.execute(
+            "SELECT weight_ID, weight_value, weight_date FROM Weights ORDER BY weight_date, weight_ID"
+        )
+        return WeightSeries.from_rows(cursor)
+
+    def get_page(self, after: tuple[str, int] | None, limit: int) -> WeightSeries:
+        """This function will load one page of the weight history, newest first.
+
+        "after" is the (weight_date, weight_ID) of the last record of the
+        previous page. Continuing from there (instead of using OFFSET) lets
+        SQLite jump straight to the page through the date index, so every
+        page costs the same no matter how deep into the history it is.
+        """
+
+        if after is None:
+            cursor = self.DATABASE.connection.execute(
+                """SELECT weight_ID, weight_value, weight_date FROM Weights
+                ORDER BY weight_date DESC, weight_ID DESC LIMIT ?""",
+                (limit,),
+            )
+        else:
+            cursor = self.DATABASE.connection.execute(
+                """SELECT weight_ID, weight_value, weight_date FROM Weights
+                WHERE (weight_date, weight_ID) < (?, ?)
+                ORDER BY weight_date DESC, weight_ID DESC LIMIT ?""",
+                (*after, limit),
+            )
+        return WeightSeries.from_rows(cursor.fetchmany(limit))
+
+    def get_summary(self) -> WeightSummary:
+        """This function will return the statistics of the weight history.
+        They are kept up to date by triggers whenever a weight is saved,
+        so this is a single row lookup. (See migrations.py)
+        """
+
+        row = self.DATABASE.connection.execute(
+            """SELECT entry_count, value_sum, min_value, max_value, first_date,
+            first_value, last_date, last_value, moving_average_7, moving_average_30
+            FROM WeightSummary WHERE summary_ID = 1"""
+        ).fetchone()
+        return WeightSummary(*row)
@@ -0,0 +1,312 @@
+import json
+import os
+import sqlite3
+import time
+from typing import NamedTuple
+
+from migrations import SYNCED_TABLES
+from store import Database, get_database
+
+"""This file contains the sync of tasks and weights between devices.
+
+There is no server: every device appends its own changes to a file in a
+shared folder (e.g. a synced Dropbox/Nextcloud folder or a USB stick) and
+reads the files of the other devices from where it stopped last time.
+
+    <folder>/<device_ID>.jsonl      one change per line, in sequence order
+
+Every change (see migrations.add_sync_change_log) carries the uid of the
+record, the device that made it, that device's sequence number and the UTC
+time it was made, plus the current values of the record unless it was
+removed. Changing a record again before syncing only sends its latest state,
+so a day of edits is a few kilobytes no matter how big the database is.
+
+Conflicts are resolved record by record: the change with the latest
+(changed_at, device_ID, sequence number) wins, on every device alike, so all
+devices end up with the same records no matter in which order they sync.
+Removals are kept as such, an older change arriving later can't bring a
+removed record back.
+
+Recurring tasks and their completed occurrences are not synced.
+"""
+
+# The columns of every synced table which are sent to the other devices.
+SYNCED_COLUMNS = {
+    "Tasks": ("task_title", "task_date", "task_completed_at"),
+    "Weights": ("weight_value", "weight_unit", "weight_date"),
+}
+
+
+class SyncReport(NamedTuple):
+    changes_sent: int
+    changes_received: int
+    changes_applied: int
+    bytes_written: int
+    bytes_read: int
+    seconds: float
+
+    def __str__(self) -> str:
+        return (
+            f"sent {self.changes_sent} changes ({self.bytes_written:,} bytes), "
+            f"received {self.changes_received} ({self.bytes_read:,} bytes), "
+            f"applied {self.changes_applied} in {self.seconds:.2f} s"
+        )
+
+
+def get_device_ID(connection: sqlite3.Connection) -> str:
+    """This function will return the ID this database syncs under."""
+
+    (device_ID,) = connection.execute(
+        "SELECT value FROM SyncState WHERE name = 'device_ID'"
+    ).fetchone()
+    return device_ID
+
+
+def new_device_identity(database: Database = None) -> str:
+    """This function will give the database a new device ID and return it.
+
+    A database that was copied from another device still has the ID of that
+    device, so both would write to the same change log. The changes made
+    before the copy stay with the old ID, which is then treated like any
+    other device.
+    """
+
+    connection = (database or get_database()).connection
+    with connection:
+        connection.execute("BEGIN IMMEDIATE")
+        old_device_ID = get_device_ID(connection)
+        (last_seq,) = connection.execute(
+            "SELECT COALESCE(MAX(change_seq), 0) FROM SyncRecords WHERE device_ID = ?",
+            (old_device_ID,),
+        ).fetchone()
+        # Everything of the old ID is already in here.
+        connection.execute(
+            "INSERT OR REPLACE INTO SyncPeers(device_ID, last_seq, file_offset) VALUES(?, ?, 0)",
+            (old_device_ID, last_seq),
+        )
+        connection.execute(
+            "UPDATE SyncState SET value = lower(hex(randomblob(16))) WHERE name = 'device_ID'"
+        )
+        connection.execute("UPDATE SyncState SET value = 0 WHERE name = 'exported_seq'")
+        return get_device_ID(connection)
+
+
+def sync(folder: str, database: Database = None) -> SyncReport:
+    """This function will write the changes of this device to the shared
+    folder and apply the changes of every other device found in there.
+    """
+
+    started_at = time.perf_counter()
+    connection = (database or get_database()).connection
+    os.makedirs(folder, exist_ok=True)
+
+    changes_sent, bytes_written = export_changes(connection, folder)
+    changes_received, changes_applied, bytes_read = import_changes(connection, folder)
+    return SyncReport(
+        changes_sent,
+        changes_received,
+        changes_applied,
+        bytes_written,
+        bytes_read,
+        time.perf_counter() - started_at,
+    )
+
+
+def export_changes(connection: sqlite3.Connection, folder: str) -> tuple[int, int]:
+    """This function will append the changes which haven't been exported yet
+    to the change log of this device. It returns the number of changes and
+    bytes written.
+    """
+
+    with connection:
+        # Nothing can be changed between reading the changes and moving the -
+        # export mark past them.
+        connection.execute("BEGIN IMMEDIATE")
+        device_ID = get_device_ID(connection)
+        (exported_seq,) = connection.execute(
+            "SELECT value FROM SyncState WHERE name = 'exported_seq'"
+        ).fetchone()
+
+        # Only the latest change of every record is still in SyncRecords, -
+        # it's sent with the values the record has right now.
+        cursor = connection.execute(
+            """SELECT record_uid, table_name, change_seq, changed_at, deleted,
+                task_title, task_date, task_completed_at, weight_value, weight_unit, weight_date
+            FROM SyncRecords
+            LEFT JOIN Tasks ON table_name = 'Tasks' AND task_ID = local_ID
+            LEFT JOIN Weights ON table_name = 'Weights' AND weight_ID = local_ID
+            WHERE device_ID = ? AND change_seq > ?
+            ORDER BY change_seq""",
+            (device_ID, exported_seq),
+        )
+
+        lines = []
+        for record_uid, table, change_seq, changed_at, deleted, *values in cursor:
+            change = {
+                "device": device_ID,
+                "seq": change_seq,
+                "changed_at": changed_at,
+                "table": table,
+                "uid": record_uid,
+                "deleted": bool(deleted),
+            }
+            if not deleted:
+                row = values[:3] if table == "Tasks" else values[3:]
+                change["row"] = dict(zip(SYNCED_COLUMNS[table], row))
+            lines.append(json.dumps(change, separators=(",", ":")) + "\n")
+            exported_seq = change_seq
+
+        if not lines:
+            return 0, 0
+
+        data = "".join(lines).encode("utf-8")
+        append_to_log(os.path.join(folder, device_ID + ".jsonl"), data)
+        connection.execute(
+            "UPDATE SyncState SET value = ? WHERE name = 'exported_seq'", (exported_seq,)
+        )
+    return len(lines), len(data)
+
+
+def append_to_log(path: str, data: bytes) -> None:
+    """This function will append complete lines to a change log and make
+    sure they are on disk before the changes are marked as exported.
+    """
+
+    with open(path, "ab+") as log_file:
+        # A sync that crashed while writing may have left half a line, -
+        # those changes were never marked as exported and are written again.
+        size = log_file.seek(0, os.SEEK_END)
+        if size:
+            log_file.seek(max(size - 65536, 0))
+            tail = log_file.read()
+            if not tail.endswith(b"\n"):
+                log_file.truncate(size - len(tail) + tail.rfind(b"\n") + 1)
+        log_file.write(data)
+        log_file.flush()
+        os.fsync(log_file.fileno())
+
+
+def import_changes(connection: sqlite3.Connection, folder: str) -> tuple[int, int, int]:
+    """This function will apply the new changes of every other device.
+    It returns the number of changes received and applied and the bytes read.
+    """
+
+    device_ID = get_device_ID(connection)
+    changes_received = changes_applied = bytes_read = 0
+
+    for file_name in sorted(os.listdir(folder)):
+        peer_ID, extension = os.path.splitext(file_name)
+        if extension != ".jsonl" or peer_ID == device_ID:
+            continue
+
+        peer = connection.execute(
+            "SELECT last_seq, file_offset FROM SyncPeers WHERE device_ID = ?", (peer_ID,)
+        ).fetchone()
+        last_seq, file_offset = peer or (0, 0)
+
+        # Only the part that was added since the last sync is read.
+        with open(os.path.join(folder, file_name), "rb") as log_file:
+            if os.fstat(log_file.fileno()).st_size < file_offset:
+                # The file was replaced, the sequence numbers skip what was seen.
+                file_offset = 0
+            log_file.seek(file_offset)
+            data = log_file.read()
+        # The other device may still be writing the last line.
+        data = data[: data.rfind(b"\n") + 1]
+        if not data:
+            continue
+        bytes_read += len(data)
+
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            # Stops the triggers from logging the changes as changes of this device.
+            connection.execute("INSERT INTO SyncState(name, value) VALUES('applying', 1)")
+            for line in data.splitlines():
+                # A broken file stops the sync, nothing of it is applied.
+                try:
+                    change = json.loads(line)
+                    if change["seq"] <= last_seq:
+                        continue
+                    changes_received += 1
+                    if apply_change(connection, change):
+                        changes_applied += 1
+                    last_seq = change["seq"]
+                except (KeyError, TypeError) as error:
+                    raise ValueError(f"{file_name} holds a broken change ({error!r})") from error
+            connection.execute("DELETE FROM SyncState WHERE name = 'applying'")
+            connection.execute(
+                "INSERT OR REPLACE INTO SyncPeers(device_ID, last_seq, file_offset) VALUES(?, ?, ?)",
+                (peer_ID, last_seq, file_offset + len(data)),
+            )
+
+    return changes_received, changes_applied, bytes_read
+
+
+def apply_change(connection: sqlite3.Connection, change: dict) -> bool:
+    """This function will apply a change of another device unless the record
+    has a newer change already. It returns True if it was applied.
+    """
+
+    table = change["table"]
+    # Table and column names end up in the statements below.
+    if table not in SYNCED_TABLES:
+        raise ValueError(f"Changes of the table {table!r} can't be synced")
+    ID_column = SYNCED_TABLES[table]
+    columns = SYNCED_COLUMNS[table]
+
+    local = connection.execute(
+        """SELECT local_ID, device_ID, change_seq, changed_at, deleted
+        FROM SyncRecords WHERE record_uid = ?""",
+        (change["uid"],),
+    ).fetchone()
+    if local is not None:
+        local_ID, device_ID, change_seq, changed_at, deleted = local
+        # The same change (or a newer one) is already here.
+        if (changed_at, device_ID, change_seq) >= (
+            change["changed_at"],
+            change["device"],
+            change["seq"],
+        ):
+            return False
+        if deleted:
+            local_ID = None
+    else:
+        local_ID = None
+
+    # Table and column names come from SYNCED_TABLES/SYNCED_COLUMNS, never -
+    # from the file.
+    if change["deleted"]:
+        if local_ID is not None:
+            connection.execute(f"DELETE FROM {table} WHERE {ID_column} = ?", (local_ID,))
+        elif local is not None:
+            local_ID = local[0]
+    else:
+        values = [change["row"][column] for column in columns]
+        if local_ID is not None:
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            connection.execute(
+                f"UPDATE {table} SET {assignments} WHERE {ID_column} = ?", (*values, local_ID)
+            )
+        else:
+            cursor = connection.execute(
+                f"""INSERT INTO {table}({", ".join(columns)})
+                VALUES({", ".join("?" * len(columns))}) RETURNING {ID_column}""",
+                values,
+            )
+            ((local_ID,),) = cursor.fetchall()
+
+    connection.execute(
+        """INSERT OR REPLACE INTO SyncRecords(
+            record_uid, table_name, local_ID, device_ID, change_seq, changed_at, deleted
+        ) VALUES(?, ?, ?, ?, ?, ?, ?)""",
+        (
+            change["uid"],
+            table,
+            local_ID,
+            change["device"],
+            change["seq"],
+            change["changed_at"],
+            int(change["deleted"]),
+        ),
+    )
+    return True
@@ -0,0 +1,202 @@
+from datetime import date, timedelta
+
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QDate, Qt
+from PySide6.QtGui import QFont
+
+from db_workers import run_in_background
+from instrumentation import timed
+from store import Task, TaskStore
+from write_queue import WriteQueue, get_write_queue
+
+"""This file contains the model behind the week and agenda views.
+
+Both show the tasks of many dates at once, every date as a section (a header
+row followed by its tasks). The tasks of a whole range of dates are loaded
+with a single range query and grouped into sections here, instead of loading
+one date after the other.
+
+The week view loads its 7 dates in one go. The agenda starts at a date and
+keeps going: the next AGENDA_DAYS dates are only loaded once the user scrolls
+to the end of the list (fetchMore), so sections are loaded as they come into
+view.
+"""
+
+WEEK_DAYS = 7
+AGENDA_DAYS = 14
+
+
+class TaskAgendaModel(QAbstractListModel):
+    def __init__(self, store: TaskStore = None, write_queue: WriteQueue = None) -> None:
+        """This initializer will create an empty model.
+        Call show_week() or show_agenda() to fill it.
+        """
+
+        super().__init__()
+
+        self.STORE = store or TaskStore()
+        self.WRITE_QUEUE = write_queue or get_write_queue()
+        self.FIRST_DATE = None
+        # The number of dates to show, None for an agenda without an end.
+        self.DAYS = None
+
+        # Every row is either the ISO date of a section header or a task.
+        self.rows: list[str | Task] = []
+        # The first date which hasn't been loaded yet.
+        self.next_date = None
+
+        # Every new range gets a new generation, results of older ones are dropped.
+        self.generation = 0
+        self.fetching = False
+        # Set once a range couldn't be loaded, so the view doesn't keep trying.
+        self.fetch_failed = False
+
+    def show_week(self, first_date: str) -> None:
+        """This function will show the 7 dates starting with first_date."""
+
+        self.show_range(first_date, WEEK_DAYS)
+
+    def show_agenda(self, first_date: str) -> None:
+        """This function will show every date from first_date on."""
+
+        self.show_range(first_date, None)
+
+    def show_range(self, first_date: str, days: int | None) -> None:
+        """This function will empty the model and load the first dates."""
+
+        self.beginResetModel()
+        self.FIRST_DATE = first_date
+        self.DAYS = days
+        self.rows = []
+        self.next_date = date.fromisoformat(first_date)
+        self.generation += 1
+        self.fetching = False
+        self.fetch_failed = False
+        self.endResetModel()
+
+        self.fetchMore(QModelIndex())
+
+    @property
+    def last_date(self) -> date | None:
+        """The last date of a week, None for an agenda."""
+
+        if self.DAYS is None:
+            return None
+        return date.fromisoformat(self.FIRST_DATE) + timedelta(days=self.DAYS - 1)
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        # The view asks for more rows when the user scrolls near the end.
+        if parent.isValid() or self.FIRST_DATE is None or self.fetching or self.fetch_failed:
+            return False
+        return self.last_date is None or self.next_date <= self.last_date
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        """This function will load the next dates in the background."""
+
+        if not self.canFetchMore(parent):
+            return
+
+        first_date = self.next_date
+        last_date = first_date + timedelta(days=AGENDA_DAYS - 1)
+        if self.last_date is not None:
+            last_date = min(last_date, self.last_date)
+
+        self.fetching = True
+        generation = self.generation
+        run_in_background(
+            self.read_tasks,
+            first_date.isoformat(),
+            last_date.isoformat(),
+            on_finished=lambda tasks: self.tasks_loaded(
+                generation, first_date, last_date, tasks
+            ),
+            on_failed=lambda error: self.tasks_failed(generation),
+        )
+
+    def read_tasks(self, first_date: str, last_date: str) -> list[Task]:
+        """This function runs on a worker thread. Completions which are still
+        in the write queue are written first, otherwise they would show up.
+        """
+
+        self.WRITE_QUEUE.flush()
+        return self.STORE.get_tasks_between(first_date, last_date)
+
+    def tasks_failed(self, generation: int) -> None:
+        """This function will run on the GUI thread if a range couldn't be
+        loaded. Choosing a range again tries again.
+        """
+
+        if generation == self.generation:
+            self.fetching = False
+            self.fetch_failed = True
+
+    @timed("agenda.show_dates")
+    def tasks_loaded(
+        self, generation: int, first_date: date, last_date: date, tasks: list[Task]
+    ) -> None:
+        """This function will run on the GUI thread once a range has been
+        loaded and add a section for every date of it.
+        """
+
+        # The user has chosen another range in the meantime.
+        if generation != self.generation:
+            return
+        self.fetching = False
+
+        # The tasks come ordered by date, so they are grouped in one pass.
+        rows = []
+        task_index = 0
+        day = first_date
+        while day <= last_date:
+            iso_date = day.isoformat()
+            rows.append(iso_date)
+            while task_index < len(tasks) and tasks[task_index].task_date == iso_date:
+                rows.append(tasks[task_index])
+                task_index += 1
+            day += timedelta(days=1)
+        self.next_date = last_date + timedelta(days=1)
+
+        first_row = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first_row, first_row + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def date_at(self, row: int) -> str:
+        """This function will return the date of a header or a task row."""
+
+        entry = self.rows[row]
+        if isinstance(entry, str):
+            return entry
+        return entry.task_date
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> object:
+        if not index.isValid():
+            return None
+
+        entry = self.rows[index.row()]
+        if isinstance(entry, str):
+            # The header of a section, e.g. "Monday, 19.10.2026"
+            if role == Qt.DisplayRole:
+                return QDate.fromString(entry, Qt.ISODate).toString("dddd, dd.MM.yyyy")
+            if role == Qt.FontRole:
+                font = QFont()
+                font.setBold(True)
+                return font
+            return None
+
+        if role == Qt.DisplayRole:
+            return "    " + entry.task_title
+        if role == Qt.ToolTipRole:
+            if entry.recurring:
+                return entry.task_title + " (repeating)"
+            return entry.task_title
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled
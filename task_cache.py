@@ -0,0 +1,195 @@
+from calendar import monthrange
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from store import Task
+
+"""This file contains the in-memory caches of the tasks.
+
+Paging through days with the "<" and ">" buttons hits TaskCache instead of
+the database. The cache itself never touches the database, the tasks list
+model loads missed dates on the thread pool and puts them in here.
+The cache is bounded: once it holds more than MAX_DATES dates,
+the date that was used the longest time ago gets evicted.
+
+TaskCountCache works the same way for the number of tasks on every date of
+a month, which the calendars show. (See task_calendar_model.py)
+"""
+
+MAX_DATES = 64
+MAX_MONTHS = 24
+
+
+class TaskCache:
+    def __init__(self, max_dates: int = MAX_DATES) -> None:
+        """This initializer will create an empty cache."""
+
+        self.MAX_DATES = max_dates
+
+        # Most recently used dates are kept at the end.
+        self.tasks_by_date: OrderedDict[str, list[Task]] = OrderedDict()
+
+        # Counters for tuning the cache size. (See stats())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetches = 0
+
+        # Goes up on every invalidation. Loads which started before an -
+        # invalidation may have read stale data and must not be cached.
+        self.generation = 0
+
+    def get(self, date: str) -> list[Task] | None:
+        """This function will return the tasks on the specified date or None
+        if the date is not cached.
+        The list belongs to the cache and must not be changed by the caller.
+        """
+
+        tasks = self.tasks_by_date.get(date)
+        if tasks is not None:
+            self.hits += 1
+            self.tasks_by_date.move_to_end(date)
+            return tasks
+
+        self.misses += 1
+        return None
+
+    def contains(self, date: str) -> bool:
+        """This function will check for a date without counting a hit/miss."""
+
+        return date in self.tasks_by_date
+
+    def put(self, date: str, tasks: list[Task]) -> list[Task]:
+        """This function will store the tasks of a date and evict the least
+        recently used date if the cache has grown too big.
+        """
+
+        self.tasks_by_date[date] = tasks
+        self.tasks_by_date.move_to_end(date)
+        while len(self.tasks_by_date) > self.MAX_DATES:
+            self.tasks_by_date.popitem(last=False)
+            self.evictions += 1
+        return tasks
+
+    def put_prefetched(self, date: str, tasks: list[Task]) -> None:
+        """This function will store the tasks of a date that were loaded ahead
+        of time. Prefetched dates do not count as misses.
+        """
+
+        if date not in self.tasks_by_date:
+            self.prefetches += 1
+            self.put(date, tasks)
+
+    def invalidate(self, date: str) -> None:
+        """This function will forget the tasks of a date, so the next get()
+        loads them from the database again.
+        """
+
+        self.tasks_by_date.pop(date, None)
+        self.generation += 1
+
+    def clear(self) -> None:
+        """This function will forget the tasks of every date, e.g. after a
+        recurring task has been added which could show up on any of them.
+        """
+
+        self.tasks_by_date.clear()
+        self.generation += 1
+
+    def stats(self) -> dict[str, int]:
+        """This function will return the counters of the cache."""
+
+        return {
+            "dates": len(self.tasks_by_date),
+            "max_dates": self.MAX_DATES,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "prefetches": self.prefetches,
+        }
+
+
+class TaskCountCache:
+    def __init__(self, max_months: int = MAX_MONTHS) -> None:
+        """This initializer will create an empty cache."""
+
+        self.MAX_MONTHS = max_months
+
+        # Keys are months ("YYYY-MM"), most recently used ones at the end.
+        self.counts_by_month: OrderedDict[str, dict[str, int]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+        # Same as in TaskCache, loads from before an invalidation are dropped.
+        self.generation = 0
+
+    def get(self, month: str) -> dict[str, int] | None:
+        """This function will return the task counts of a month (by ISO date)
+        or None if the month is not cached.
+        """
+
+        counts = self.counts_by_month.get(month)
+        if counts is not None:
+            self.hits += 1
+            self.counts_by_month.move_to_end(month)
+            return counts
+
+        self.misses += 1
+        return None
+
+    def put(self, month: str, counts: dict[str, int]) -> None:
+        """This function will store the task counts of a month and evict the
+        least recently used month if the cache has grown too big.
+        """
+
+        self.counts_by_month[month] = counts
+        self.counts_by_month.move_to_end(month)
+        while len(self.counts_by_month) > self.MAX_MONTHS:
+            self.counts_by_month.popitem(last=False)
+
+    def invalidate(self, date: str) -> None:
+        """This function will forget the counts of the month a date is in."""
+
+        self.counts_by_month.pop(month_of(date), None)
+        self.generation += 1
+
+    def clear(self) -> None:
+        """This function will forget the counts of every month."""
+
+        self.counts_by_month.clear()
+        self.generation += 1
+
+    def stats(self) -> dict[str, int]:
+        """This function will return the counters of the cache."""
+
+        return {
+            "months": len(self.counts_by_month),
+            "max_months": self.MAX_MONTHS,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def month_of(iso_date: str) -> str:
+    """This function will return the month ("YYYY-MM") of an ISO date."""
+
+    return iso_date[:7]
+
+
+def month_range(month: str) -> tuple[str, str]:
+    """This function will return the first and last ISO date of a month."""
+
+    year, month_number = map(int, month.split("-"))
+    last_day = monthrange(year, month_number)[1]
+    return f"{month}-01", f"{month}-{last_day:02}"
+
+
+def adjacent_dates(iso_date: str) -> list[str]:
+    """This function will return the day before and the day after a date."""
+
+    day = date.fromisoformat(iso_date)
+    return [
+        (day - timedelta(days=1)).isoformat(),
+        (day + timedelta(days=1)).isoformat(),
+    ]
@@ -0,0 +1,98 @@
+from PySide6.QtCore import QObject, Signal
+
+from db_workers import run_in_background
+from instrumentation import get_instrumentation
+from store import TaskStore
+from task_cache import TaskCountCache, month_range
+from write_queue import WriteQueue, get_write_queue
+
+"""This file contains the model behind the task counts of the calendars.
+
+The calendars (the date picker popups and the month overview) show how many
+tasks there are on every day. The counts of a whole month are loaded with a
+single range query on the thread pool and cached per month, so painting a
+month never costs a query per day. A month is dropped from the cache when a
+task in it is added or completed and loaded again the next time it's shown.
+"""
+
+
+class TaskCountModel(QObject):
+    # Emitted when counts have been loaded or dropped, calendars re-paint then.
+    counts_changed = Signal()
+
+    def __init__(self, store: TaskStore = None, write_queue: WriteQueue = None) -> None:
+        """This initializer will create a model with an empty cache.
+        Counts are only loaded once a calendar asks for them.
+        """
+
+        super().__init__()
+
+        self.STORE = store or TaskStore()
+        self.WRITE_QUEUE = write_queue or get_write_queue()
+        self.CACHE = TaskCountCache()
+
+        # Months which are being loaded right now.
+        self.loading_months = set()
+
+        get_instrumentation().add_source("task_count_cache", self.CACHE.stats)
+
+    def counts(self, month: str) -> dict[str, int] | None:
+        """This function will return the task counts of a month (by ISO date).
+        If the month isn't cached yet it returns None and starts loading it,
+        counts_changed is emitted once it has arrived.
+        """
+
+        counts = self.CACHE.get(month)
+        if counts is None and month not in self.loading_months:
+            self.request_counts(month)
+        return counts
+
+    def request_counts(self, month: str) -> None:
+        """This function will load the task counts of a month on the thread pool."""
+
+        self.loading_months.add(month)
+        generation = self.CACHE.generation
+        run_in_background(
+            self.read_counts,
+            month,
+            on_finished=lambda counts: self.counts_read(month, generation, counts),
+            on_failed=lambda error: self.counts_failed(month),
+        )
+
+    def read_counts(self, month: str) -> dict[str, int]:
+        """This function runs on a worker thread. Completions which are still
+        in the write queue are written first, otherwise they would be counted.
+        """
+
+        self.WRITE_QUEUE.flush()
+        return self.STORE.get_task_counts(*month_range(month))
+
+    def counts_read(self, month: str, generation: int, counts: dict[str, int]) -> None:
+        """This function will run on the GUI thread once a month has been loaded."""
+
+        self.loading_months.discard(month)
+
+        # A task was added or completed while loading, so the counts are -
+        # dropped. The calendars ask again when they re-paint.
+        if generation == self.CACHE.generation:
+            self.CACHE.put(month, counts)
+        self.counts_changed.emit()
+
+    def counts_failed(self, month: str) -> None:
+        """This function will run on the GUI thread if a month couldn't be
+        loaded. The month is asked for again the next time a calendar paints
+        it. (counts_changed isn't emitted, the re-paint would ask right away)
+        """
+
+        self.loading_months.discard(month)
+
+    def invalidate(self, date: str | None) -> None:
+        """This function will run when the tasks of a date have changed.
+        None means that any date may have changed (e.g. a recurring task).
+        """
+
+        if date is None:
+            self.CACHE.clear()
+        else:
+            self.CACHE.invalidate(date)
+        self.counts_changed.emit()
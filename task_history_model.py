@@ -0,0 +1,160 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QDate, QDateTime, Qt
+
+from db_workers import run_in_background
+from instrumentation import timed
+from store import Completion, TaskStore
+from write_queue import WriteQueue, get_write_queue
+
+"""This file contains the model behind the completed tasks history.
+
+The history shows the tasks completed within a range of dates, most recently
+completed first. Like the weight history it is fetched page by page while
+the user scrolls (keyset pagination on the partial index of completed tasks),
+so a range with years of completions only ever loads what is on screen.
+"""
+
+PAGE_SIZE = 200
+
+# The columns of the table.
+TITLE_COLUMN = 0
+DATE_COLUMN = 1
+COMPLETED_AT_COLUMN = 2
+
+HEADERS = ("Task", "Date", "Completed")
+
+
+class TaskHistoryModel(QAbstractTableModel):
+    def __init__(self, store: TaskStore = None, write_queue: WriteQueue = None) -> None:
+        """This initializer will create an empty model.
+        Call set_range() to fill it with the completions of a range of dates.
+        """
+
+        super().__init__()
+
+        self.STORE = store or TaskStore()
+        self.WRITE_QUEUE = write_queue or get_write_queue()
+        self.FIRST_DATE = None
+        self.LAST_DATE = None
+        self.completions: list[Completion] = []
+
+        # Every new range gets a new generation, pages of older ones are dropped.
+        self.generation = 0
+        self.fetching = False
+        self.all_fetched = True
+
+    def set_range(self, first_date: str, last_date: str) -> None:
+        """This function will show the tasks completed between two ISO dates
+        (both included) and start fetching the first page.
+        """
+
+        self.beginResetModel()
+        self.FIRST_DATE = first_date
+        self.LAST_DATE = last_date
+        self.completions = []
+        self.generation += 1
+        self.fetching = False
+        self.all_fetched = False
+        self.endResetModel()
+
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.completions)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(HEADERS)
+
+    def headerData(
+        self, section: int, orientation: Qt.Orientation, role: int = Qt.DisplayRole
+    ) -> object:
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> object:
+        if not index.isValid():
+            return None
+
+        completion = self.completions[index.row()]
+        if role == Qt.DisplayRole:
+            if index.column() == TITLE_COLUMN:
+                return completion.task_title
+            if index.column() == DATE_COLUMN:
+                return QDate.fromString(completion.task_date, Qt.ISODate).toString("dd.MM.yyyy")
+            return QDateTime.fromString(
+                completion.task_completed_at, "yyyy-MM-dd HH:mm:ss"
+            ).toString("dd.MM.yyyy HH:mm")
+        if role == Qt.ToolTipRole and index.column() == TITLE_COLUMN:
+            if completion.recurrence_ID is not None:
+                return completion.task_title + " (repeating)"
+            return completion.task_title
+        return None
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        # The view asks for more rows when the user scrolls near the end.
+        if parent.isValid():
+            return False
+        return not self.fetching and not self.all_fetched
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        """This function will load the next (older) page in the background."""
+
+        if not self.canFetchMore(parent):
+            return
+
+        # Continue right after the last completion that has been loaded so far.
+        after = None
+        if self.completions:
+            after = (self.completions[-1].task_completed_at, self.completions[-1].task_ID)
+
+        self.fetching = True
+        generation = self.generation
+        run_in_background(
+            self.read_page,
+            self.FIRST_DATE,
+            self.LAST_DATE,
+            after,
+            on_finished=lambda page: self.page_loaded(generation, page),
+            on_failed=lambda error: self.page_failed(generation),
+        )
+
+    def read_page(
+        self, first_date: str, last_date: str, after: tuple[str, int] | None
+    ) -> list[Completion]:
+        """This function runs on a worker thread. Tasks which were just
+        completed are still in the write queue, so it is flushed first.
+        """
+
+        self.WRITE_QUEUE.flush()
+        return self.STORE.get_completions(first_date, last_date, after, PAGE_SIZE)
+
+    def page_failed(self, generation: int) -> None:
+        """This function will run on the GUI thread if a page couldn't be
+        loaded. No more pages are asked for, so the view doesn't keep trying.
+        """
+
+        if generation == self.generation:
+            self.fetching = False
+            self.all_fetched = True
+
+    @timed("history.show_page")
+    def page_loaded(self, generation: int, page: list[Completion]) -> None:
+        """This function will run on the GUI thread once a page has arrived."""
+
+        # The user has chosen another range in the meantime.
+        if generation != self.generation:
+            return
+
+        self.fetching = False
+        if len(page) < PAGE_SIZE:
+            self.all_fetched = True
+
+        if page:
+            first_row = len(self.completions)
+            self.beginInsertRows(QModelIndex(), first_row, first_row + len(page) - 1)
+            self.completions.extend(page)
+            self.endInsertRows()
@@ -0,0 +1,288 @@
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    QEvent,
+    Qt,
+    Signal,
+)
+from PySide6.QtWidgets import QStyledItemDelegate, QStyleOptionViewItem
+
+from db_workers import run_in_background
+from instrumentation import get_instrumentation, timed
+from store import Task, TaskStore, timestamp
+from task_cache import TaskCache, adjacent_dates
+from write_queue import WriteQueue, get_write_queue
+
+"""This file contains the model behind the tasks list and its delegate.
+
+The model only holds the records of the active date. The QListView showing it
+only asks for (and paints) the rows that are currently visible, so a date with
+thousands of tasks costs about as much as a date with a handful of them.
+
+Dates which are not cached yet are loaded on the thread pool. Results for a
+date the user has already moved away from are cached but not shown.
+
+Completed tasks are removed from the list right away but written to the
+database by the write queue (see write_queue.py), so every load waits for
+the queued writes first.
+"""
+
+
+class TaskListModel(QAbstractListModel):
+    # Emitted after a task has been completed and removed from the list.
+    task_completed = Signal(object)
+    # Emitted when the model starts (True) or stops (False) waiting for the DB.
+    loading_changed = Signal(bool)
+    # Emitted with the date whose tasks were added or completed, None means -
+    # any date could have changed. (e.g. a recurring task was added)
+    tasks_changed = Signal(object)
+
+    def __init__(self, store: TaskStore = None, write_queue: WriteQueue = None) -> None:
+        """This initializer will create an empty model.
+        Call load() to fill it with the tasks of a date.
+        """
+
+        super().__init__()
+
+        self.STORE = store or TaskStore()
+        self.WRITE_QUEUE = write_queue or get_write_queue()
+        self.CACHE = TaskCache()
+        self.DATE = None
+        self.tasks: list[Task] = []
+        self.loading = False
+
+        # Dates which are being prefetched right now.
+        self.prefetching_dates = set()
+
+        # The hit rate of the cache shows up in Help -> Diagnostics.
+        get_instrumentation().add_source("task_cache", self.CACHE.stats)
+
+    @timed("tasks.load_date")
+    def load(self, date: str) -> None:
+        """This function will replace the tasks in the model with the
+        tasks on the specified date.
+        """
+
+        cached_tasks = self.CACHE.get(date)
+
+        # The list is emptied right away if the date is not cached, so the -
+        # user never sees (or checks) the tasks of the previous date.
+        # The model changes its own list, so it gets a copy of the cached one.
+        self.beginResetModel()
+        self.DATE = date
+        self.tasks = list(cached_tasks) if cached_tasks is not None else []
+        self.endResetModel()
+
+        if cached_tasks is None:
+            self.request_tasks(date)
+        else:
+            self.set_loading(False)
+            self.prefetch_adjacent_dates(date)
+
+    def request_tasks(self, date: str) -> None:
+        """This function will load the tasks of a date on the thread pool."""
+
+        self.set_loading(True)
+        generation = self.CACHE.generation
+        run_in_background(
+            self.read_tasks,
+            date,
+            on_finished=lambda tasks: self.tasks_loaded(date, generation, tasks),
+            on_failed=lambda error: self.load_failed(date),
+        )
+
+    def read_tasks(self, date: str) -> list[Task]:
+        """This function runs on a worker thread. It waits for the completions
+        that are still queued, otherwise they would show up again.
+        """
+
+        self.WRITE_QUEUE.flush()
+        return self.STORE.get_tasks(date)
+
+    @timed("tasks.show_loaded_date")
+    def tasks_loaded(self, date: str, generation: int, tasks: list[Task]) -> None:
+        """This function will run on the GUI thread once a load has finished."""
+
+        # A task was added or completed while loading, so the result might -
+        # be outdated. Ask again if the date is still on screen.
+        if generation != self.CACHE.generation:
+            if date == self.DATE:
+                self.request_tasks(date)
+            return
+
+        self.CACHE.put(date, tasks)
+
+        # The user has moved on to another date in the meantime.
+        if date != self.DATE:
+            return
+
+        self.beginResetModel()
+        self.tasks = list(tasks)
+        self.endResetModel()
+        self.set_loading(False)
+
+        self.prefetch_adjacent_dates(date)
+
+    def load_failed(self, date: str) -> None:
+        """This function will run on the GUI thread if a load has failed.
+        The list stays empty, the next load of the date tries again.
+        """
+
+        if date == self.DATE:
+            self.set_loading(False)
+
+    def prefetch_adjacent_dates(self, date: str) -> None:
+        """This function will load the day before and after in the background
+        so the "<" and ">" buttons can be answered from the cache.
+        """
+
+        for adjacent_date in adjacent_dates(date):
+            if self.CACHE.contains(adjacent_date):
+                continue
+            if adjacent_date in self.prefetching_dates:
+                continue
+
+            self.prefetching_dates.add(adjacent_date)
+            self.request_prefetch(adjacent_date)
+
+    def request_prefetch(self, date: str) -> None:
+        """This function will prefetch the tasks of a single date."""
+
+        generation = self.CACHE.generation
+        run_in_background(
+            self.read_tasks,
+            date,
+            on_finished=lambda tasks: self.tasks_prefetched(date, generation, tasks),
+            on_failed=lambda error: self.prefetching_dates.discard(date),
+        )
+
+    def tasks_prefetched(self, date: str, generation: int, tasks: list[Task]) -> None:
+        """This function will run on the GUI thread once a prefetch has finished."""
+
+        self.prefetching_dates.discard(date)
+        if generation == self.CACHE.generation:
+            self.CACHE.put_prefetched(date, tasks)
+
+    def set_loading(self, loading: bool) -> None:
+        """This function will let the UI know if the model is waiting for the DB."""
+
+        if loading != self.loading:
+            self.loading = loading
+            self.loading_changed.emit(loading)
+
+    def insert_task(self, task: Task) -> None:
+        """This function will add a single newly saved task to the end of
+        the list if it belongs to the date the list is showing.
+        """
+
+        self.CACHE.invalidate(task.task_date)
+        self.tasks_changed.emit(task.task_date)
+        if task.task_date != self.DATE:
+            return
+
+        row = len(self.tasks)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.tasks.append(task)
+        self.endInsertRows()
+
+    def add_recurrence(self) -> None:
+        """This function will run after a recurring task has been saved.
+        It may show up on any date, so every cached date is dropped and the
+        date on screen is loaded again.
+        """
+
+        self.CACHE.clear()
+        self.tasks_changed.emit(None)
+        if self.DATE is not None:
+            self.load(self.DATE)
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        # This is a flat list, so only the (invalid) root has children.
+        if parent.isValid():
+            return 0
+        return len(self.tasks)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> object:
+        if not index.isValid():
+            return None
+
+        task = self.tasks[index.row()]
+        if role == Qt.DisplayRole:
+            return task.task_title
+        if role == Qt.ToolTipRole:
+            if task.recurring:
+                return task.task_title + " (repeating)"
+            return task.task_title
+        # Tasks in the list are never completed, they get removed instead.
+        if role == Qt.CheckStateRole:
+            return Qt.Unchecked
+        return None
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+
+    def setData(self, index: QModelIndex, value: object, role: int = Qt.EditRole) -> bool:
+        """This function will run when the user checks a task.
+        Doing this indicates that the task is completed and so it will be
+        marked as completed in the database and removed from the list.
+        """
+
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        if Qt.CheckState(value) != Qt.Checked:
+            return False
+
+        self.complete_task(index.row())
+        return True
+
+    def complete_task(self, row: int) -> None:
+        """This function will remove the task in the specified row from the
+        list and queue its completion in the database.
+        """
+
+        # Ticking off many tasks in a row ends up in a single transaction -
+        # instead of one commit per task, and the GUI thread never waits for it.
+        # The time is taken now, the write may happen a bit later.
+        task = self.tasks[row]
+        completed_at = timestamp()
+        if task.recurring:
+            # Only this date's occurrence is done, the task keeps repeating.
+            self.WRITE_QUEUE.submit(
+                self.STORE.complete_occurrence, task.recurrence_ID, task.task_date, completed_at
+            )
+        else:
+            self.WRITE_QUEUE.submit(self.STORE.complete_task, task.task_ID, completed_at)
+        self.CACHE.invalidate(task.task_date)
+
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self.tasks[row]
+        self.endRemoveRows()
+
+        self.tasks_changed.emit(task.task_date)
+        self.task_completed.emit(task)
+
+
+class TaskItemDelegate(QStyledItemDelegate):
+    """This delegate paints every task as a checkbox and lets the user click
+    anywhere on the row to check it, just like the old QCheckBox widgets.
+    """
+
+    def editorEvent(
+        self,
+        event: QEvent,
+        model: QAbstractListModel,
+        option: QStyleOptionViewItem,
+        index: QModelIndex | QPersistentModelIndex,
+    ) -> bool:
+        if (
+            event.type() == QEvent.MouseButtonRelease
+            and event.button() == Qt.LeftButton
+            and option.rect.contains(event.position().toPoint())
+        ):
+            return model.setData(index, Qt.Checked, Qt.CheckStateRole)
+
+        # Everything else (keyboard, double clicks...) is handled by Qt.
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,168 @@
+import sqlite3
+import threading
+
+from PySide6.QtCore import QAbstractListModel, QDate, QModelIndex, Qt, QTimer, Signal
+
+from db_workers import run_in_background
+from instrumentation import timed
+from store import Task, TaskStore
+from write_queue import get_write_queue
+
+"""This file contains the model behind the task search results.
+
+The user searches while typing, so the query only runs once no key has been
+pressed for SEARCH_DELAY milliseconds. Every new query supersedes the one
+before it: a query that hasn't started yet is skipped and one that is still
+running on the thread pool is interrupted (sqlite3.Connection.interrupt), so
+the pool never works on text the user has already changed.
+"""
+
+# How long to wait after the last key press before searching, in ms.
+SEARCH_DELAY = 150
+
+
+class TaskSearchModel(QAbstractListModel):
+    # Emitted when the user starts typing (True) or the results are shown (False).
+    searching_changed = Signal(bool)
+
+    def __init__(self, store: TaskStore = None) -> None:
+        """This initializer will create an empty model.
+        Call search() with the text the user has typed.
+        """
+
+        super().__init__()
+
+        self.STORE = store or TaskStore()
+        self.TEXT = ""
+        self.tasks: list[Task] = []
+        self.searching = False
+
+        # Every search gets a new generation, results of older ones are dropped.
+        self.generation = 0
+        # The connection (and generation) of the query running right now.
+        self._running = None
+        self._running_lock = threading.Lock()
+
+        self.debounce_timer = QTimer(self)
+        self.debounce_timer.setSingleShot(True)
+        self.debounce_timer.setInterval(SEARCH_DELAY)
+        self.debounce_timer.timeout.connect(self.start_search)
+
+    def search(self, text: str) -> None:
+        """This function will search for the text once the user stops typing."""
+
+        self.TEXT = text.strip()
+        self.generation += 1
+        self.cancel_running_query()
+
+        if not self.TEXT:
+            self.debounce_timer.stop()
+            self.show_results([])
+            return
+
+        # Every key press restarts the timer.
+        self.debounce_timer.start()
+        self.set_searching(True)
+
+    def refresh(self) -> None:
+        """This function will run the current search again right away,
+        e.g. after a task has been added.
+        """
+
+        if self.TEXT:
+            self.generation += 1
+            self.cancel_running_query()
+            self.start_search()
+
+    def start_search(self) -> None:
+        """This function will run the current search on the thread pool."""
+
+        self.set_searching(True)
+        generation = self.generation
+        run_in_background(
+            self.run_query,
+            generation,
+            self.TEXT,
+            on_finished=lambda tasks: self.search_finished(generation, tasks),
+            on_failed=lambda error: self.search_failed(generation),
+        )
+
+    def run_query(self, generation: int, text: str) -> list[Task] | None:
+        """This function runs on a worker thread. It returns None if the search
+        was superseded before or while it ran.
+        """
+
+        # Tasks which were just completed shouldn't be found anymore.
+        get_write_queue().flush()
+
+        connection = self.STORE.DATABASE.connection
+        with self._running_lock:
+            if generation != self.generation:
+                return None
+            self._running = (generation, connection)
+
+        try:
+            return self.STORE.search_tasks(text)
+        except sqlite3.OperationalError:
+            if generation != self.generation:
+                # Interrupted by cancel_running_query().
+                return None
+            raise
+        finally:
+            with self._running_lock:
+                self._running = None
+
+    def cancel_running_query(self) -> None:
+        """This function will interrupt the query of an older search.
+        The lock makes sure the connection isn't running another query yet.
+        """
+
+        with self._running_lock:
+            if self._running is not None and self._running[0] != self.generation:
+                self._running[1].interrupt()
+
+    def search_finished(self, generation: int, tasks: list[Task] | None) -> None:
+        """This function will run on the GUI thread once a query has ended."""
+
+        if tasks is None or generation != self.generation:
+            return
+        self.show_results(tasks)
+
+    def search_failed(self, generation: int) -> None:
+        """This function will run on the GUI thread if a query has failed."""
+
+        if generation == self.generation:
+            self.set_searching(False)
+
+    @timed("search.show_results")
+    def show_results(self, tasks: list[Task]) -> None:
+        self.beginResetModel()
+        self.tasks = tasks
+        self.endResetModel()
+        self.set_searching(False)
+
+    def set_searching(self, searching: bool) -> None:
+        if searching != self.searching:
+            self.searching = searching
+            self.searching_changed.emit(searching)
+
+    def task_at(self, row: int) -> Task:
+        return self.tasks[row]
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.tasks)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> object:
+        if not index.isValid():
+            return None
+
+        task = self.tasks[index.row()]
+        if role == Qt.DisplayRole:
+            # Results come from any date, so the date is shown with them.
+            task_date = QDate.fromString(task.task_date, Qt.ISODate).toString("dd.MM.yyyy")
+            return f"{task.task_title}  ({task_date})"
+        if role == Qt.ToolTipRole:
+            return task.task_title
+        return None
@@ -1,32 +1,57 @@
-import sqlite3
-from PySide6.QtWidgets import QApplication
-from os import path
+import time
 
-from UI.main_UI import TaskManUI
+# Taken before anything else is imported. (See startup_report.py)
+STARTED_AT = time.perf_counter()
 
-if __name__ == "__main__":
-    # Creating a brand new database if the app can not find one.
-    # I didn't use "try & except" because sqlite3.connect automatically -
-    # creates a database if it can't find the name specified.
-    if path.exists("TaskMan.db") is False:
-        # Open database connection
-        DB_CONNECTION = sqlite3.connect("TaskMan.db")
-        DB_CURSOR = DB_CONNECTION.cursor()
-
-        # Create and initialize the "Tasks" table.
-        DB_CURSOR.execute(
-            "CREATE TABLE Tasks(task_ID Integer, task_title TEXT, task_date TEXT)"
-        )
-
-        # Create and initialize the "Weights" table.
-        DB_CURSOR.execute(
-            "CREATE TABLE Weights(weight_ID Integer, weight_value REAL, weight_unit TEXT, weight_date TEXT)"
-        )
-
-        DB_CURSOR.close()
-        DB_CONNECTION.close()
+import sys
+from os import environ
+
+from instrumentation import start_from_environment
+
+
+def run_window() -> None:
+    """This function will start the window of the app."""
+
+    # PySide6 and PyGame are only imported here, so the command-line -
+    # interface (See cli.py) never has to pay for loading them.
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication
+
+    from UI.main_UI import TaskManUI
+    from audio import get_audio
+    from store import get_database
+
+    # Creating a brand new database or upgrading an existing one.
+    # sqlite3.connect automatically creates a database if it can't find -
+    # the name specified and the migrations then create the tables in it.
+    get_database().connection
 
     APP = QApplication()
     WINDOW = TaskManUI(APP)
+
+    if environ.get("TASKMAN_STARTUP_REPORT"):
+        from startup_report import FirstPaintReporter
+
+        # Parented to the window, which keeps the event filter alive.
+        FirstPaintReporter(APP, WINDOW, STARTED_AT)
+
     WINDOW.show()
+
+    # The audio device is only probed once the window is on screen.
+    # (Not while reporting, the app exits right after the first paint)
+    if not environ.get("TASKMAN_STARTUP_REPORT"):
+        QTimer.singleShot(0, get_audio().warm_up)
     APP.exec()
+
+
+if __name__ == "__main__":
+    # Profilers and the diagnostics dump, if asked for. (See instrumentation.py)
+    start_from_environment()
+
+    # Any arguments mean a command, e.g. "taskman.py add 'Buy milk'".
+    if len(sys.argv) > 1:
+        from cli import main
+
+        sys.exit(main())
+
+    run_window()
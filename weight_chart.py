@@ -0,0 +1,317 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QMouseEvent, QPainter, QPaintEvent, QPen, QPolygonF, QWheelEvent
+from PySide6.QtWidgets import QWidget
+
+from db_workers import run_in_background
+from instrumentation import timed
+from store import Weight, WeightStore
+from weight_series import WeightSeries
+
+"""This file contains the weight trend chart.
+
+Years of daily weights are far more points than the chart is wide, so the
+visible part of the series is downsampled to (about) one point per pixel with
+Largest-Triangle-Three-Buckets before painting. LTTB keeps the peaks and dips
+that a plain "every n-th point" would lose. Zooming (mouse wheel) and panning
+(dragging) only re-downsample the range that is on screen.
+"""
+
+# Space around the plot for the axis labels, in pixels.
+MARGIN = 40
+# The shortest span the chart zooms in to, in days.
+MIN_VIEW_DAYS = 7.0
+# How far the view may go past the first and last weight, in days.
+VIEW_MARGIN_DAYS = 7.0
+
+
+def downsample_lttb(xs: array, ys: array, start: int, stop: int, threshold: int) -> list[int]:
+    """This function will pick "threshold" points out of xs[start:stop] and
+    ys[start:stop] with the Largest-Triangle-Three-Buckets algorithm and
+    return their indexes.
+    """
+
+    count = stop - start
+    if threshold >= count or threshold < 3:
+        return list(range(start, stop))
+
+    # The first and last point are always kept, the rest is split in buckets.
+    indexes = [start]
+    bucket_size = (count - 2) / (threshold - 2)
+    previous = start
+
+    for bucket in range(threshold - 2):
+        bucket_start = start + 1 + int(bucket * bucket_size)
+        bucket_stop = start + 1 + int((bucket + 1) * bucket_size)
+
+        # The average point of the next bucket is the third corner.
+        next_start = bucket_stop
+        next_stop = min(start + 1 + int((bucket + 2) * bucket_size), stop)
+        if next_start >= next_stop:
+            average_x, average_y = xs[stop - 1], ys[stop - 1]
+        else:
+            next_count = next_stop - next_start
+            average_x = sum(xs[next_start:next_stop]) / next_count
+            average_y = sum(ys[next_start:next_stop]) / next_count
+
+        # Keep the point which makes the largest triangle with the point kept
+        # from the previous bucket and the average of the next one.
+        previous_x, previous_y = xs[previous], ys[previous]
+        largest_area = -1.0
+        chosen = bucket_start
+        for index in range(bucket_start, bucket_stop):
+            area = abs(
+                (previous_x - average_x) * (ys[index] - previous_y)
+                - (previous_x - xs[index]) * (average_y - previous_y)
+            )
+            if area > largest_area:
+                largest_area = area
+                chosen = index
+
+        indexes.append(chosen)
+        previous = chosen
+
+    indexes.append(stop - 1)
+    return indexes
+
+
+class WeightChart(QWidget):
+    def __init__(self, unit_choice: str) -> None:
+        """This initializer will create an empty chart.
+        The weight history is loaded the first time the chart is shown.
+        """
+
+        super().__init__()
+        self.setMinimumHeight(150)
+
+        self.USER_UNIT = unit_choice
+        self.weight_series: WeightSeries | None = None
+        # The dates of the series as day numbers, which are easy to plot.
+        self.days = array("d")
+
+        # The part of the series on screen, in day numbers.
+        self.view_start = 0.0
+        self.view_stop = 0.0
+
+        # The downsampled points of the visible range.
+        self.visible_indexes: list[int] = []
+
+        self.loading = False
+        self.drag_x = None
+
+    def showEvent(self, event: object) -> None:
+        """This function will load the history the first time it is needed."""
+
+        super().showEvent(event)
+        if self.weight_series is None and not self.loading:
+            self.loading = True
+            run_in_background(WeightStore().get_series, on_finished=self.series_loaded)
+
+    def series_loaded(self, weight_series: WeightSeries) -> None:
+        """This function will run on the GUI thread once the history arrived."""
+
+        self.loading = False
+        self.weight_series = weight_series
+        self.days = array(
+            "d", (date.fromisoformat(weight_date).toordinal() for weight_date in weight_series.dates)
+        )
+        self.reset_view()
+
+    def reset_view(self) -> None:
+        """This function will zoom out to show the whole history."""
+
+        if self.days:
+            self.view_start = self.days[0]
+            self.view_stop = max(self.days[-1], self.days[0] + 1)
+        self.update_visible_points()
+
+    def view_limits(self) -> tuple[float, float]:
+        """This function will return the first and last day the view may show:
+        the saved weights plus a margin, but never outside of what date can
+        hold, so the axis labels can always be painted.
+        """
+
+        first_day = max(self.days[0] - VIEW_MARGIN_DAYS, 1)
+        last_day = min(self.days[-1] + VIEW_MARGIN_DAYS, date.max.toordinal())
+        return first_day, last_day
+
+    def limit_view(self) -> None:
+        """This function will move the view back next to the weights if it
+        was zoomed out or dragged past them. Its span is kept.
+        """
+
+        first_day, last_day = self.view_limits()
+        span = min(self.view_stop - self.view_start, last_day - first_day)
+        self.view_start = min(max(self.view_start, first_day), last_day - span)
+        self.view_stop = self.view_start + span
+
+    def set_unit(self, unit_choice: str) -> None:
+        """This function will re-paint the chart in the specified unit.
+        The series converts (and remembers) all values in one go.
+        """
+
+        self.USER_UNIT = unit_choice
+        self.update()
+
+    def add_weight(self, weight: Weight) -> None:
+        """This function will insert a newly saved weight at its date."""
+
+        if self.weight_series is None:
+            # The chart hasn't been loaded yet, it will get it from the DB.
+            return
+
+        day = date.fromisoformat(weight.weight_date).toordinal()
+        index = bisect_right(self.days, day)
+        self.days.insert(index, day)
+        self.weight_series.insert(
+            index, weight.weight_ID, weight.weight_value, weight.weight_date
+        )
+
+        # Keep following the newest date if it was on screen.
+        if day > self.view_stop and index == len(self.days) - 1:
+            self.view_stop = day
+        self.update_visible_points()
+
+    @timed("chart.downsample")
+    def update_visible_points(self) -> None:
+        """This function will downsample the visible range of the series to
+        the width of the plot and re-paint.
+        """
+
+        start = bisect_left(self.days, self.view_start)
+        stop = bisect_right(self.days, self.view_stop)
+        # Include one point on each side so the line runs to the edges.
+        start = max(start - 1, 0)
+        stop = min(stop + 1, len(self.days))
+
+        if self.weight_series is not None and stop > start:
+            self.visible_indexes = downsample_lttb(
+                self.days,
+                self.weight_series.values,
+                start,
+                stop,
+                max(int(self.plot_rect().width()), 3),
+            )
+        else:
+            self.visible_indexes = []
+        self.update()
+
+    def plot_rect(self) -> QRectF:
+        """This function will return the area inside the axes."""
+
+        return QRectF(self.rect()).adjusted(MARGIN + 10, 10, -10, -MARGIN)
+
+    def resizeEvent(self, event: object) -> None:
+        super().resizeEvent(event)
+        self.update_visible_points()
+
+    def wheelEvent(self, event: QWheelEvent) -> None:
+        """This function will zoom in or out around the mouse cursor."""
+
+        if not self.days:
+            return
+
+        plot = self.plot_rect()
+        span = self.view_stop - self.view_start
+        fraction = (event.position().x() - plot.left()) / max(plot.width(), 1)
+        fraction = min(max(fraction, 0.0), 1.0)
+        anchor = self.view_start + span * fraction
+
+        # Every step of the wheel zooms by 20%. Never zoom in closer than a -
+        # week or out further than the whole history.
+        first_day, last_day = self.view_limits()
+        factor = 0.8 ** (event.angleDelta().y() / 120)
+        new_span = min(max(span * factor, MIN_VIEW_DAYS), last_day - first_day)
+        self.view_start = anchor - new_span * fraction
+        self.view_stop = self.view_start + new_span
+        self.limit_view()
+        self.update_visible_points()
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        if event.button() == Qt.LeftButton:
+            self.drag_x = event.position().x()
+
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        """This function will pan the chart while the user drags it."""
+
+        if self.drag_x is None:
+            return
+
+        span = self.view_stop - self.view_start
+        shift = (self.drag_x - event.position().x()) * span / max(self.plot_rect().width(), 1)
+        self.drag_x = event.position().x()
+        self.view_start += shift
+        self.view_stop += shift
+        self.limit_view()
+        self.update_visible_points()
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        self.drag_x = None
+
+    def mouseDoubleClickEvent(self, event: QMouseEvent) -> None:
+        self.reset_view()
+
+    @timed("chart.paint")
+    def paintEvent(self, event: QPaintEvent) -> None:
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        plot = self.plot_rect()
+
+        if self.weight_series is None:
+            painter.drawText(self.rect(), Qt.AlignCenter, "Loading...")
+            return
+        if not self.visible_indexes:
+            painter.drawText(self.rect(), Qt.AlignCenter, "No weights saved yet")
+            return
+
+        values = self.weight_series.converted(self.USER_UNIT)
+        visible_values = [values[index] for index in self.visible_indexes]
+        low = min(visible_values)
+        high = max(visible_values)
+        if high - low < 1:
+            low -= 0.5
+            high += 0.5
+        span = self.view_stop - self.view_start
+
+        # Axes and their labels.
+        painter.setPen(self.palette().text().color())
+        painter.drawLine(plot.bottomLeft(), plot.topLeft())
+        painter.drawLine(plot.bottomLeft(), plot.bottomRight())
+        painter.drawText(
+            QRectF(0, plot.top() - 5, MARGIN + 5, 20), Qt.AlignRight, f"{round(high, 1)}"
+        )
+        painter.drawText(
+            QRectF(0, plot.bottom() - 15, MARGIN + 5, 20), Qt.AlignRight, f"{round(low, 1)}"
+        )
+        painter.drawText(
+            QRectF(plot.left(), plot.bottom() + 5, plot.width(), 20),
+            Qt.AlignLeft,
+            date.fromordinal(int(self.view_start)).isoformat(),
+        )
+        painter.drawText(
+            QRectF(plot.left(), plot.bottom() + 5, plot.width(), 20),
+            Qt.AlignRight,
+            date.fromordinal(int(self.view_stop)).isoformat(),
+        )
+        painter.drawText(
+            QRectF(plot.left(), plot.bottom() + 5, plot.width(), 20),
+            Qt.AlignHCenter,
+            self.USER_UNIT,
+        )
+
+        # The line itself, clipped to the plot.
+        line = QPolygonF(
+            [
+                QPointF(
+                    plot.left() + (self.days[index] - self.view_start) / span * plot.width(),
+                    plot.bottom() - (values[index] - low) / (high - low) * plot.height(),
+                )
+                for index in self.visible_indexes
+            ]
+        )
+        painter.setClipRect(plot)
+        painter.setPen(QPen(self.palette().highlight().color(), 2))
+        painter.drawPolyline(line)
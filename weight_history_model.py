@@ -0,0 +1,188 @@
+from bisect import bisect_left
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QDate, Qt, Signal
+
+from db_workers import run_in_background
+from instrumentation import timed
+from store import Weight, WeightStore
+from weight_series import WeightSeries
+
+"""This file contains the model behind the weight history table.
+
+The history is shown newest first and is fetched page by page as the user
+scrolls (keyset pagination on the date index). Opening the Weight tab only
+ever loads the first page, no matter how many records have been saved.
+The loaded rows are kept in a WeightSeries, so switching the unit converts
+all loaded values in one go.
+"""
+
+PAGE_SIZE = 200
+
+# The columns of the table.
+VALUE_COLUMN = 0
+DATE_COLUMN = 1
+
+
+class WeightHistoryModel(QAbstractTableModel):
+    # Emitted once the newest records have been loaded.
+    first_page_loaded = Signal()
+
+    def __init__(self, unit_choice: str, store: WeightStore = None) -> None:
+        """This initializer will create an empty model and start fetching
+        the first page in the background.
+        """
+
+        super().__init__()
+
+        self.STORE = store or WeightStore()
+        self.USER_UNIT = unit_choice
+
+        # Loaded rows, newest first.
+        self.weight_series = WeightSeries()
+        # Keys are (weight_date, weight_ID) and are used to find the position -
+        # of newly added records. They are negated/reversed so they ascend.
+        self.sort_keys: list[tuple[str, int]] = []
+
+        self.fetching = False
+        self.all_fetched = False
+        self.loaded_first_page = False
+
+        self.fetchMore(QModelIndex())
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self.weight_series)
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return 2
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole) -> object:
+        if not index.isValid():
+            return None
+
+        row = index.row()
+        if role == Qt.DisplayRole:
+            if index.column() == VALUE_COLUMN:
+                weight_value = self.weight_series.converted(self.USER_UNIT)[row]
+                return str(weight_value) + " " + self.USER_UNIT
+            # Dates are stored as ISO dates but shown the same way as before.
+            return QDate.fromString(
+                self.weight_series.dates[row], Qt.ISODate
+            ).toString(Qt.RFC2822Date)
+
+        if role == Qt.TextAlignmentRole:
+            if index.column() == VALUE_COLUMN:
+                return int(Qt.AlignLeft | Qt.AlignVCenter)
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:
+        # The view asks for more rows when the user scrolls near the end.
+        # Nothing else is asked for while a page is still being loaded.
+        if parent.isValid():
+            return False
+        return not self.fetching and not self.all_fetched
+
+    def fetchMore(self, parent: QModelIndex) -> None:
+        """This function will load the next (older) page in the background."""
+
+        if not self.canFetchMore(parent):
+            return
+
+        # Continue right after the oldest record that has been loaded so far.
+        after = None
+        if self.weight_series:
+            after = (self.weight_series.dates[-1], self.weight_series.IDs[-1])
+
+        self.fetching = True
+        run_in_background(
+            self.STORE.get_page,
+            after,
+            PAGE_SIZE,
+            on_finished=self.page_loaded,
+            on_failed=self.page_failed,
+        )
+
+    @timed("weights.show_page")
+    def page_loaded(self, page: WeightSeries) -> None:
+        """This function will run on the GUI thread once a page has arrived."""
+
+        self.fetching = False
+        if len(page) < PAGE_SIZE:
+            self.all_fetched = True
+
+        if page:
+            first_row = len(self.weight_series)
+            self.beginInsertRows(QModelIndex(), first_row, first_row + len(page) - 1)
+            for index in range(len(page)):
+                self.append_row(page.IDs[index], page.values[index], page.dates[index])
+            self.endInsertRows()
+
+        if not self.loaded_first_page:
+            self.loaded_first_page = True
+            self.first_page_loaded.emit()
+
+    def page_failed(self, error: str) -> None:
+        """This function will run on the GUI thread if a page couldn't be
+        loaded. No more pages are asked for, so the view doesn't keep trying.
+        """
+
+        self.fetching = False
+        self.all_fetched = True
+        if not self.loaded_first_page:
+            self.loaded_first_page = True
+            self.first_page_loaded.emit()
+
+    def append_row(self, weight_ID: int, weight_value: float, weight_date: str) -> None:
+        """This function will add a loaded record to the end of the model."""
+
+        self.weight_series.append(weight_ID, weight_value, weight_date)
+        self.sort_keys.append(self.sort_key(weight_date, weight_ID))
+
+    @staticmethod
+    def sort_key(weight_date: str, weight_ID: int) -> tuple[str, int]:
+        """This function will return a key which ascends from the newest to
+        the oldest record, so the loaded rows can be searched with bisect.
+        """
+
+        # Flipping every digit of the ISO date reverses its order.
+        return (weight_date.translate(_REVERSE_DIGITS), -weight_ID)
+
+    def add_weight(self, weight: Weight) -> None:
+        """This function will run after the user has saved a new weight.
+        Only the new row gets inserted at its place in the history.
+        """
+
+        key = self.sort_key(weight.weight_date, weight.weight_ID)
+        row = bisect_left(self.sort_keys, key)
+
+        # Records older than anything loaded will come with a later page.
+        if row == len(self.sort_keys) and not self.all_fetched:
+            return
+
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.weight_series.insert(
+            row, weight.weight_ID, weight.weight_value, weight.weight_date
+        )
+        self.sort_keys.insert(row, key)
+        self.endInsertRows()
+
+    @timed("weights.switch_unit")
+    def set_unit(self, unit_choice: str) -> None:
+        """This function will run when the user changes the weight unit.
+        Only the value column changes, the view re-paints the visible rows.
+        """
+
+        self.USER_UNIT = unit_choice
+        if self.weight_series:
+            self.dataChanged.emit(
+                self.index(0, VALUE_COLUMN),
+                self.index(len(self.weight_series) - 1, VALUE_COLUMN),
+                [Qt.DisplayRole],
+            )
+
+
+_REVERSE_DIGITS = str.maketrans("0123456789", "9876543210")
@@ -0,0 +1,86 @@
+from array import array
+
+"""This file contains the in-memory copy of the weight history.
+
+The history is kept in compact numeric arrays (8 bytes per value) instead of
+a list of tuples. Values are always stored in KG. Converting the whole series
+to another unit is done in one batched pass over the array and the result is
+kept, so switching the unit back and forth never touches the database.
+"""
+
+KG_PER_LB = 0.45359237
+
+
+def convert_weight(weight_value: float, unit: str) -> float:
+    """This function will convert a single KG value to the specified unit."""
+
+    if unit == "lb":
+        return round(weight_value / KG_PER_LB, 2)
+    return weight_value
+
+
+class WeightSeries:
+    def __init__(self) -> None:
+        """This initializer will create an empty series."""
+
+        self.IDs = array("q")
+        self.values = array("d")  # Always in KG
+        self.dates: list[str] = []
+
+        # Already converted copies of self.values, keyed by unit.
+        self.converted_values: dict[str, array] = {"KG": self.values}
+
+    @classmethod
+    def from_rows(cls, rows: object) -> "WeightSeries":
+        """This function will build a series out of (ID, value, date) rows."""
+
+        series = cls()
+        for weight_ID, weight_value, weight_date in rows:
+            series.IDs.append(weight_ID)
+            series.values.append(weight_value)
+            series.dates.append(weight_date)
+        return series
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, weight_ID: int, weight_value: float, weight_date: str) -> None:
+        """This function will add a newly saved weight to the end of the
+        series and to every converted copy of it.
+        """
+
+        self.IDs.append(weight_ID)
+        self.values.append(weight_value)
+        self.dates.append(weight_date)
+        for unit, values in self.converted_values.items():
+            if unit != "KG":
+                values.append(convert_weight(weight_value, unit))
+
+    def insert(
+        self, index: int, weight_ID: int, weight_value: float, weight_date: str
+    ) -> None:
+        """This function will add a weight at the specified position of the
+        series and of every converted copy of it.
+        """
+
+        self.IDs.insert(index, weight_ID)
+        self.values.insert(index, weight_value)
+        self.dates.insert(index, weight_date)
+        for unit, values in self.converted_values.items():
+            if unit != "KG":
+                values.insert(index, convert_weight(weight_value, unit))
+
+    def converted(self, unit: str) -> array:
+        """This function will return all values in the specified unit.
+        The whole series is converted at once the first time a unit is asked
+        for, every call after that returns the kept copy.
+        """
+
+        values = self.converted_values.get(unit)
+        if values is None:
+            if unit == "lb":
+                values = array("d", [round(value / KG_PER_LB, 2) for value in self.values])
+            else:
+                raise ValueError(f"Unknown weight unit: {unit}")
+            self.converted_values[unit] = values
+        return values
@@ -0,0 +1,171 @@
+import atexit
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from instrumentation import get_instrumentation
+from store import get_database
+
+"""This file contains the write-behind queue of the app.
+
+Writes which don't need an answer from the database (completing tasks) are
+handed to a background writer thread instead of running on the GUI thread.
+The writer waits WRITE_DELAY seconds after the first write of a batch and then
+runs everything that arrived in the meantime in a single transaction, so
+ticking off a whole day of tasks costs one commit (and one fsync) instead of
+one per task.
+
+Anything that reads what was written has to call flush() first. (The task
+list model does this on the thread pool before every load.) The queue is also
+flushed when the window is closed and, as a last resort, when Python exits.
+"""
+
+# How long the writer collects writes before committing them, in seconds.
+WRITE_DELAY = 0.5
+# How often a batch is tried again when its transaction can't be committed -
+# (e.g. the database stayed locked for longer than the busy timeout).
+WRITE_RETRIES = 3
+RETRY_DELAY = 1.0
+
+logger = logging.getLogger("taskman.writes")
+
+
+class WriteQueue:
+    def __init__(self, write_delay: float = WRITE_DELAY) -> None:
+        """This initializer will create an empty queue.
+        The writer thread is only started with the first write.
+        """
+
+        self.WRITE_DELAY = write_delay
+
+        self._pending: deque[tuple[Callable, tuple]] = deque()
+        # Guards _pending & _unwritten and wakes up the writer and flush().
+        self._condition = threading.Condition()
+        # Writes which were submitted but haven't been committed yet.
+        self._unwritten = 0
+        # Set by flush() so the writer commits without waiting for more writes.
+        self._flushing = False
+        self._writer = None
+        self._closed = False
+
+    def submit(self, function: Callable, *args: object) -> None:
+        """This function will run function(*args) on the writer thread as part
+        of the next batch. It returns right away.
+        """
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The write queue has been closed")
+            self._pending.append((function, args))
+            self._unwritten += 1
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._write_batches, name="TaskMan writer", daemon=True
+                )
+                self._writer.start()
+                atexit.register(self.close)
+            self._condition.notify_all()
+
+    def flush(self) -> None:
+        """This function will wait until every submitted write is committed.
+        It returns right away if nothing is waiting to be written.
+        """
+
+        with self._condition:
+            if not self._unwritten:
+                return
+            self._flushing = True
+            self._condition.notify_all()
+            self._condition.wait_for(lambda: not self._unwritten)
+
+    def close(self) -> None:
+        """This function will write everything that is still queued and stop
+        the writer thread. Nothing can be submitted after this.
+        """
+
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._writer is not None:
+            self._writer.join()
+
+    def _write_batches(self) -> None:
+        """This function runs on the writer thread until the queue is closed."""
+
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return
+
+                # Give more writes a chance to join this batch, unless -
+                # someone is waiting for them (or the app is closing).
+                deadline = time.monotonic() + self.WRITE_DELAY
+                self._condition.wait_for(
+                    lambda: self._flushing or self._closed,
+                    timeout=max(deadline - time.monotonic(), 0),
+                )
+                batch = list(self._pending)
+                self._pending.clear()
+                self._flushing = False
+
+            # Whatever happens to the batch, flush() must not wait for it forever.
+            try:
+                self._write_with_retries(batch)
+            finally:
+                with self._condition:
+                    self._unwritten -= len(batch)
+                    self._condition.notify_all()
+
+    def _write_with_retries(self, batch: list[tuple[Callable, tuple]]) -> None:
+        """This function will write a batch and try again if its transaction
+        fails. A batch that still fails after WRITE_RETRIES tries is logged
+        and dropped.
+        """
+
+        for attempt in range(1, WRITE_RETRIES + 1):
+            try:
+                self._write(batch)
+                return
+            except Exception:
+                if attempt == WRITE_RETRIES:
+                    logger.exception("Dropped a batch of %d writes", len(batch))
+                    return
+                logger.warning("Writing a batch failed, trying again (%d/%d)", attempt, WRITE_RETRIES)
+                time.sleep(RETRY_DELAY)
+
+    def _write(self, batch: list[tuple[Callable, tuple]]) -> None:
+        """This function will run a batch of writes in one transaction.
+        A write that fails is logged and the others are still committed.
+        """
+
+        # The writes go through the stores of the app, which all share its -
+        # database. The writer thread has its own connection to it.
+        connection = get_database().connection
+        started_at = time.perf_counter()
+        with connection:
+            connection.execute("BEGIN IMMEDIATE")
+            for function, args in batch:
+                try:
+                    function(*args)
+                except Exception:
+                    logger.exception("Write failed: %s%r", function.__name__, args)
+        get_instrumentation().record_operation("writes.batch", time.perf_counter() - started_at)
+
+
+# The write queue the whole app shares.
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue() -> WriteQueue:
+    """This function will return the shared WriteQueue object."""
+
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = WriteQueue()
+        return _write_queue